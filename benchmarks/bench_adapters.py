@@ -0,0 +1,51 @@
+"""Holidays and prices adapters benchmark, backed by a temporary SQLite file
+
+Run with `python -m benchmarks.bench_adapters`
+"""
+
+from datetime import date
+
+import src.adapters.reference as reference
+from src.adapters.holidays import is_holiday
+from src.adapters.prices import find_price
+from src.commons.drivers.sqlite import reset_pool
+from src.config import load
+from benchmarks.common import measure, report
+from benchmarks.stubs import temp_sqlite
+
+CONFIG = load()
+
+HOLIDAY = date(2019, 2, 18)
+WORKING_DAY = date(2019, 2, 19)
+
+
+def run():
+    """Execute benchmark cases"""
+
+    previous = {key: CONFIG.get(key) for key in ("SQLITE_FILE", "SQLITE_COMMIT", "REFERENCE_CACHE")}
+    results = {}
+
+    with temp_sqlite() as sqlite_file:
+        CONFIG.update({"SQLITE_FILE": sqlite_file, "SQLITE_COMMIT": "false"})
+        reset_pool()
+
+        try:
+            for mode in ("false", "true"):
+                CONFIG["REFERENCE_CACHE"] = mode
+                reference.invalidate()
+                label = "reference index" if mode == "true" else "sqlite"
+
+                results[f"is_holiday {label}"] = measure(lambda: is_holiday(HOLIDAY), iterations=2000)
+                results[f"is_holiday miss {label}"] = measure(lambda: is_holiday(WORKING_DAY), iterations=2000)
+                results[f"find_price {label}"] = measure(lambda: find_price("1jour"), iterations=2000)
+        finally:
+            reset_pool()
+            CONFIG.update(previous)
+
+    report("adapters", results)
+
+    return results
+
+
+if __name__ == '__main__':
+    run()
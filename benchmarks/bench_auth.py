@@ -0,0 +1,74 @@
+"""Authorization middleware benchmark
+
+Run with `python -m benchmarks.bench_auth`
+"""
+
+import time
+
+from flask import Flask
+
+import src.middlewares.auth as auth
+from src.config import load
+from benchmarks.common import measure, report
+
+APP = Flask(__name__)
+
+CONFIG = load()
+
+SECRET = "bench-secret"
+
+
+@auth.bearer_api_key()
+def protected():
+    """Authorized handler"""
+    return "ok"
+
+
+def request_only():
+    """Request context creation without the middleware, the baseline of the other cases"""
+
+    with APP.test_request_context("/", headers={"Authorization": "Bearer baseline"}):
+        pass
+
+
+def authorize(header: str):
+    """
+    Run the middleware for a request with the given Authorization header
+    :param header: Authorization header value
+    :return: Function without arguments that executes the middleware
+    """
+
+    def call():
+        with APP.test_request_context("/", headers={"Authorization": header}):
+            protected()
+
+    return call
+
+
+def run():
+    """Execute benchmark cases"""
+
+    CONFIG["API_TOKEN_SECRETS"] = SECRET
+    auth.load_keys()
+
+    api_key = f"Bearer {CONFIG['API_KEY']}"
+    signed = f"Bearer {auth.sign_token('bench', int(time.time()) + 3600, SECRET)}"
+
+    results = {
+        "request context only": measure(request_only),
+        "api key cached": measure(authorize(api_key)),
+        "signed token cached": measure(authorize(signed)),
+        "invalid token": measure(authorize("Bearer invalid")),
+        "verify_header uncached": measure(
+            lambda: (auth.load_keys(), auth.verify_header(signed)),
+            iterations=2000,
+        ),
+    }
+
+    report("bearer_api_key", results)
+
+    return results
+
+
+if __name__ == '__main__':
+    run()
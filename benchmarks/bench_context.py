@@ -0,0 +1,40 @@
+"""Request context benchmark
+
+Run with `python -m benchmarks.bench_context`
+"""
+
+import src.commons.context as context
+from benchmarks.common import measure, report
+
+
+def request_cycle():
+    """Context usage of a request: scope creation, trace id store and read, and teardown"""
+
+    token = context.begin()
+    context.set_value("trace_id", "5f0c8a52-7d4e-4c55-9f0e-1d0a6b1c2e3f")
+    context.get_value("trace_id")
+    context.end(token)
+
+
+def lookup():
+    """Single value read inside a scope"""
+    context.get_value("trace_id")
+
+
+def run():
+    """Execute benchmark cases"""
+
+    results = {"begin, set, get, end": measure(request_cycle, iterations=100000)}
+
+    token = context.begin()
+    context.set_value("trace_id", "5f0c8a52-7d4e-4c55-9f0e-1d0a6b1c2e3f")
+    results["get_value"] = measure(lookup, iterations=100000)
+    context.end(token)
+
+    report("request context", results)
+
+    return results
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,41 @@
+"""HTTP JSON responses benchmark
+
+Run with `python -m benchmarks.bench_http`
+"""
+
+from flask import Flask
+
+import src.commons.http as http
+from src.commons.errors import HandlerError
+from benchmarks.common import measure, report
+
+APP = Flask(__name__)
+
+SMALL = {"data": "pong"}
+
+COLLECTION = {"data": [{"type": "1jour", "cost": 35, "position": i} for i in range(1000)]}
+
+ERROR = HandlerError(code=400, message="bad-request", description="Invalid data", root_causes=[{"error": "type"}])
+
+
+def run():
+    """Execute benchmark cases"""
+
+    with APP.test_request_context("/", headers={"If-None-Match": '"outdated"'}):
+        results = {
+            "json small": measure(lambda: http.json(body=dict(SMALL))),
+            "json 1000 records": measure(lambda: http.json(body=dict(COLLECTION)), iterations=200),
+            "json etag": measure(lambda: http.json(body=dict(SMALL), etag=True)),
+            "json_error": measure(lambda: http.json_error(ERROR)),
+        }
+
+    with APP.test_request_context("/", headers={"If-None-Match": f'"{http.etag_for("v1")}"'}):
+        results["json version not modified"] = measure(lambda: http.json(body=dict(SMALL), version="v1"))
+
+    report("http.json", results)
+
+    return results
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,47 @@
+"""JSON response encoders benchmark
+
+Run with `python -m benchmarks.bench_json`
+"""
+
+import datetime
+import decimal
+import uuid
+
+from src.commons.http import encoders
+from benchmarks.common import measure, report
+
+SMALL = {"data": "pong"}
+
+PRICE = {
+    "id": uuid.uuid4(),
+    "type": "1jour",
+    "cost": decimal.Decimal("35.50"),
+    "date": datetime.date(2021, 3, 1),
+    "updated_at": datetime.datetime(2021, 3, 1, 10, 30),
+}
+
+COLLECTION = {"data": [dict(PRICE, position=i) for i in range(1000)]}
+
+
+def run():
+    """Execute benchmark cases"""
+
+    available = [encoders.StdlibEncoder]
+
+    if encoders.orjson is not None:
+        available.append(encoders.OrjsonEncoder)
+
+    results = {}
+
+    for encoder in available:
+        results[f"{encoder.name} small"] = measure(lambda enc=encoder: enc.dumps(SMALL))
+        results[f"{encoder.name} record"] = measure(lambda enc=encoder: enc.dumps(PRICE))
+        results[f"{encoder.name} 1000 records"] = measure(lambda enc=encoder: enc.dumps(COLLECTION), iterations=50)
+
+    report("JSON encoders", results)
+
+    return results
+
+
+if __name__ == '__main__':
+    run()
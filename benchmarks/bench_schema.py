@@ -0,0 +1,63 @@
+"""JSON schema validation benchmark
+
+Run with `python -m benchmarks.bench_schema`
+"""
+
+import functools
+
+import fastjsonschema
+
+import src.commons.utils as utils
+from benchmarks.common import measure, report
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "type": {"type": "string", "enum": ["1jour", "night"]},
+        "age": {"type": "integer", "minimum": 0},
+        "date": {"type": "string", "format": "date"},
+    },
+    "required": ["type"],
+    "additionalProperties": False,
+}
+
+PAYLOAD = {"type": "1jour", "age": 30, "date": "2021-03-01"}
+
+
+def compile_per_request():
+    """Validation as done before the compiled schema cache"""
+    fastjsonschema.compile(SCHEMA)(PAYLOAD)
+
+
+def cached_fingerprint():
+    """Validation resolving the compiled schema from the cache"""
+    utils.validate_json_schema(data=PAYLOAD, schema=SCHEMA)
+
+
+def precompiled(validate):
+    """Validation with a schema compiled at route declaration"""
+    utils.validate_json_schema(data=PAYLOAD, schema=validate)
+
+
+def run():
+    """Execute benchmark cases"""
+
+    # Nothing is compiled on import, so the cache starts cold and its stats only count this run
+    utils.clear_schema_cache()
+
+    results = {
+        "compile per request": measure(compile_per_request, iterations=200),
+        "cached by fingerprint": measure(cached_fingerprint),
+    }
+
+    validate = utils.compile_schema(SCHEMA)
+    results["precompiled validator"] = measure(functools.partial(precompiled, validate))
+
+    report("validate_json_schema", results)
+    print(utils.schema_cache_stats())
+
+    return results
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,34 @@
+"""Outbound service calls benchmark against a local HTTP stub
+
+Run with `python -m benchmarks.bench_service`
+"""
+
+import src.commons.utils as utils
+from benchmarks.common import measure, report
+from benchmarks.stubs import HttpStub
+
+
+def run():
+    """Execute benchmark cases"""
+
+    with HttpStub(body={"data": {"type": "1jour", "cost": 35}}) as stub:
+        resource = f"{stub.url}/prices"
+        calls = [{"method": "GET", "resource": resource, "service_name": "stub"} for _ in range(10)]
+
+        results = {
+            "call_service": measure(
+                lambda: utils.call_service("GET", resource, service_name="stub"),
+                iterations=500,
+            ),
+            "call_service_many x10": measure(lambda: utils.call_service_many(calls), iterations=100),
+        }
+
+    utils.reset_sessions()
+
+    report("call_service", results)
+
+    return results
+
+
+if __name__ == '__main__':
+    run()
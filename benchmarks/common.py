@@ -0,0 +1,108 @@
+"""Benchmark helpers"""
+
+import json
+import os
+import pathlib
+import statistics
+import time
+
+
+def measure(func, iterations: int = 10000, repeat: int = 5):
+    """
+    Execute a function several times and return timing statistics per call
+    :param func: Callable without arguments to measure
+    :param iterations: Calls per round
+    :param repeat: Number of rounds
+    :return: dict with best, median and mean time per call in microseconds
+    """
+
+    rounds = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+
+        for _ in range(iterations):
+            func()
+
+        rounds.append((time.perf_counter() - start) / iterations * 1e6)
+
+    return {
+        "iterations": iterations,
+        "best_us": min(rounds),
+        "median_us": statistics.median(rounds),
+        "mean_us": statistics.mean(rounds),
+    }
+
+
+def report(name: str, results: dict):
+    """
+    Print benchmark results as a table
+    :param name: Benchmark name
+    :param results: dict of case name and measure() result
+    """
+
+    print(f"\n{name}")
+    print("-" * len(name))
+
+    for case, stats in results.items():
+        print(f"{case:<40} best {stats['best_us']:>10.2f} us   median {stats['median_us']:>10.2f} us")
+
+
+def save_results(path: str, results: dict):
+    """
+    Store benchmark results as JSON
+    :param path: Destination file
+    :param results: dict of benchmark name and its cases results
+    """
+
+    pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def load_results(path: str):
+    """
+    Read stored benchmark results
+    :param path: Results file
+    :return: dict or None if the file does not exist
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25, metric: str = "median_us"):
+    """
+    Compare results with a baseline, cases slower than the baseline by more than the tolerance are regressions
+    :param results: Current results
+    :param baseline: Stored baseline results
+    :param tolerance: Allowed slowdown ratio, 0.25 allows cases to be up to 25% slower
+    :param metric: Compared statistic, lower is better
+    :return: list of dict with the compared cases
+    """
+
+    comparison = []
+
+    for name, cases in results.items():
+        for case, stats in cases.items():
+            previous = baseline.get(name, {}).get(case, None)
+
+            if previous is None or metric not in stats or not previous.get(metric):
+                continue
+
+            ratio = stats[metric] / previous[metric]
+
+            comparison.append({
+                "benchmark": name,
+                "case": case,
+                "baseline": previous[metric],
+                "current": stats[metric],
+                "ratio": ratio,
+                "regression": ratio > 1 + tolerance,
+            })
+
+    return comparison
@@ -0,0 +1,143 @@
+"""Boot cost of the app by imported module, and cold start budget check
+
+The app is imported in a fresh interpreter with `python -X importtime`. Self import times are grouped by top level
+package (or by the first `--depth` parts of the app modules) to show where boot time goes.
+
+Run with `python -m benchmarks.importtime`, add `--budget-ms 1500` to fail when the cold start is slower.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.stubs import ROOT
+
+# Minimal configuration to import the app without external services, connections are opened lazily
+DEFAULT_CONFIG = {"REDIS_HOST": "127.0.0.1", "REDIS_PASS": ""}
+
+APP_MODULE = "benchmarks.load_app"
+
+_COLD_START = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+
+
+def import_times(module: str = APP_MODULE):
+    """
+    Import a module in a new interpreter and collect the `-X importtime` records
+    :param module: Imported module
+    :return: list of (module name, self microseconds, cumulative microseconds)
+    """
+
+    result = _python(["-X", "importtime", "-c", f"import {module}"])
+    records = []
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        records.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    return records
+
+
+def group(records: list, depth: int = 3):
+    """
+    Sum self import times by package
+    :param records: `import_times` result
+    :param depth: Name parts used to group app modules (src.*), other packages are grouped by top level name
+    :return: list of (package, self microseconds, modules count) sorted by time
+    """
+
+    groups = {}
+
+    for name, self_us, _ in records:
+        parts = name.split(".")
+        key = ".".join(parts[:depth]) if parts[0] == "src" else parts[0]
+        total, count = groups.get(key, (0, 0))
+        groups[key] = (total + self_us, count + 1)
+
+    return sorted(((key, total, count) for key, (total, count) in groups.items()), key=lambda item: -item[1])
+
+
+def cold_start(module: str = APP_MODULE, runs: int = 3):
+    """
+    Measure the import time of a module in new interpreters
+    :param module: Imported module
+    :param runs: Number of measures
+    :return: Best time in milliseconds
+    """
+
+    times = []
+
+    for _ in range(runs):
+        result = _python(["-c", _COLD_START.format(module=module)])
+        times.append(float(result.stdout.strip().splitlines()[-1]) * 1000)
+
+    return min(times)
+
+
+def _python(args: list):
+    """
+    Execute the current interpreter from the project root with the benchmark configuration
+    :param args: Interpreter arguments
+    :return: subprocess.CompletedProcess
+    :raise: RuntimeError if the import fails
+    """
+
+    config = dict(DEFAULT_CONFIG, **json.loads(os.getenv("BENCH_CONFIG", "{}")))
+    env = dict(os.environ, BENCH_CONFIG=json.dumps(config), STAGE=os.getenv("STAGE", "dev"))
+
+    result = subprocess.run(
+        [sys.executable, *args],
+        cwd=str(ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(f"import failed:\n{result.stderr[-2000:]}")
+
+    return result
+
+
+def main():
+    """Print the import time report and check the cold start budget"""
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--module", default=APP_MODULE, help="Imported module")
+    parser.add_argument("--top", type=int, default=25, help="Number of packages shown")
+    parser.add_argument("--depth", type=int, default=3, help="Name parts used to group app modules")
+    parser.add_argument("--runs", type=int, default=3, help="Cold start measures, the best one is compared")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Max cold start milliseconds")
+    args = parser.parse_args()
+
+    records = import_times(args.module)
+    groups = group(records, args.depth)
+    total = sum(self_us for _, self_us, _ in records)
+
+    title = f"import time of {args.module} by package"
+
+    print(f"\n{title}")
+    print("-" * len(title))
+
+    for name, self_us, count in groups[:args.top]:
+        print(f"{name:<40} {self_us / 1000:>9.1f} ms  {self_us / total:>6.1%}  {count:>4} modules")
+
+    print(f"{'total':<40} {total / 1000:>9.1f} ms          {len(records):>4} modules")
+
+    elapsed = cold_start(args.module, args.runs)
+    print(f"\ncold start {elapsed:.1f} ms (best of {args.runs})")
+
+    if args.budget_ms is not None and elapsed > args.budget_ms:
+        print(f"cold start over budget of {args.budget_ms:.0f} ms")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
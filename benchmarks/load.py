@@ -0,0 +1,226 @@
+"""End to end load test of the app served by gunicorn with gevent workers
+
+The app runs against a temporary SQLite file and a fake Redis server, so no external service is needed.
+
+Run with `python -m benchmarks.load --duration 10 --concurrency 20 --path /ping`
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.common import report
+from benchmarks.stubs import ROOT, FakeRedis, temp_sqlite
+
+DEFAULT_PATHS = ["/ping"]
+
+
+def run(
+    paths: list = None,
+    duration: float = 10,
+    concurrency: int = 20,
+    workers: int = 2,
+    headers: dict = None,
+):
+    """
+    Start the app with gunicorn and send requests to the given paths during the given seconds
+    :param paths: Requested paths, requested in round robin by every client
+    :param duration: Seconds of load after the warm up
+    :param concurrency: Concurrent clients
+    :param workers: Gunicorn gevent workers
+    :param headers: Extra headers of every request, like Authorization for protected routes
+    :return: dict of `GET <path>` and its latency and throughput statistics
+    """
+
+    paths = paths or DEFAULT_PATHS
+
+    with temp_sqlite() as sqlite_file, FakeRedis() as fake_redis:
+        config = {
+            "SQLITE_FILE": sqlite_file,
+            "SQLITE_COMMIT": "false",
+            "REDIS_HOST": "127.0.0.1",
+            "REDIS_PORT": fake_redis.port,
+            "REDIS_PASS": "",
+            "DRIVERS": "sqlite,redis",
+            "LOG_LEVEL": "ERROR",
+        }
+
+        port = _free_port()
+        server = _start_server(port, workers, config)
+
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            _wait_ready(f"{base_url}{paths[0]}", server)
+            samples = _load(base_url, paths, duration, concurrency, headers or {})
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    results = {f"GET {path}": _summary(samples[path], duration) for path in paths}
+
+    report(f"load {concurrency} clients, {workers} workers, {duration}s", results)
+
+    return results
+
+
+def _start_server(port: int, workers: int, config: dict):
+    """
+    Start gunicorn in a subprocess with the shipped configuration
+    :param port: Listening port
+    :param workers: Number of gevent workers
+    :param config: Configuration overrides of the app
+    :return: subprocess.Popen
+    """
+
+    env = dict(os.environ, BENCH_CONFIG=json.dumps(config), STAGE="dev")
+
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "benchmarks.load_app:app",
+            "--config", "benchmarks/load_config.py",
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        cwd=str(ROOT),
+        env=env,
+    )
+
+
+def _wait_ready(url: str, server: subprocess.Popen, timeout: float = 30):
+    """
+    Wait until the server answers
+    :param url: Probed URL
+    :param server: Server process
+    :param timeout: Max seconds to wait
+    :raise: RuntimeError if the server exits or does not answer in time
+    """
+
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+
+        try:
+            requests.get(url, timeout=5)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+
+    raise RuntimeError(f"server not ready after {timeout} seconds")
+
+
+def _load(base_url: str, paths: list, duration: float, concurrency: int, headers: dict):
+    """
+    Send requests from concurrent clients with keep-alive connections
+    :return: dict of path and list of (latency seconds, failed) samples
+    """
+
+    deadline = time.monotonic() + duration
+
+    def client(offset: int):
+        samples = []
+
+        with requests.Session() as session:
+            position = offset
+
+            while time.monotonic() < deadline:
+                path = paths[position % len(paths)]
+                position += 1
+                start = time.perf_counter()
+
+                try:
+                    failed = session.get(f"{base_url}{path}", headers=headers, timeout=10).status_code >= 500
+                except requests.exceptions.RequestException:
+                    failed = True
+
+                samples.append((path, time.perf_counter() - start, failed))
+
+        return samples
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        batches = list(executor.map(client, range(concurrency)))
+
+    by_path = {path: [] for path in paths}
+
+    for batch in batches:
+        for path, latency, failed in batch:
+            by_path[path].append((latency, failed))
+
+    return by_path
+
+
+def _summary(samples: list, duration: float):
+    """
+    Build latency percentiles and throughput of a path
+    :param samples: list of (latency seconds, failed)
+    :param duration: Seconds of load
+    :return: dict
+    """
+
+    latencies = sorted(latency * 1e6 for latency, _ in samples)
+
+    if not latencies:
+        return {"requests": 0, "errors": 0}
+
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for _, failed in samples if failed),
+        "rps": len(latencies) / duration,
+        "best_us": latencies[0],
+        "median_us": statistics.median(latencies),
+        "p90_us": _percentile(latencies, 0.90),
+        "p99_us": _percentile(latencies, 0.99),
+        "max_us": latencies[-1],
+    }
+
+
+def _percentile(values: list, rank: float):
+    """
+    Nearest rank percentile of sorted values
+    :param values: Sorted values
+    :param rank: Percentile between 0 and 1
+    :return: float
+    """
+
+    return values[min(len(values) - 1, int(rank * len(values)))]
+
+
+def _free_port():
+    """
+    Get a free local TCP port
+    :return: int
+    """
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    """Parse command arguments and run the load test"""
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--path", action="append", dest="paths", help="Requested path, can be repeated")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--header", action="append", default=[], help="Extra header as `Name: value`")
+    args = parser.parse_args()
+
+    headers = dict(header.split(": ", 1) for header in args.header)
+
+    run(args.paths, args.duration, args.concurrency, args.workers, headers)
+
+
+if __name__ == '__main__':
+    main()
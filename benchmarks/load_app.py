@@ -0,0 +1,13 @@
+"""App entry point of the load and import time benchmarks, applies the BENCH_CONFIG JSON overrides before the app is
+imported"""
+
+# pylint: disable=wrong-import-position
+
+import json
+import os
+
+from src.config import load
+
+load().update(json.loads(os.getenv("BENCH_CONFIG", "{}")))
+
+from src.server import app  # noqa: E402,F401
@@ -0,0 +1,19 @@
+"""Gunicorn configuration of the load test: the shipped gunicorn.conf.py with the BENCH_CONFIG JSON overrides
+applied before it imports the app modules"""
+
+# pylint: disable=wrong-import-position
+
+import json
+import os
+import runpy
+
+if os.getenv("GUNICORN_WORKER_CLASS", "gevent") == "gevent":
+    from gevent import monkey
+
+    monkey.patch_all()
+
+from src.config import load
+
+load().update(json.loads(os.getenv("BENCH_CONFIG", "{}")))
+
+globals().update(runpy.run_path(os.path.join(os.path.dirname(os.path.dirname(__file__)), "gunicorn.conf.py")))
@@ -0,0 +1,121 @@
+"""Run the benchmark suite, store its results and compare them with the baseline
+
+Run with `python -m benchmarks.run`. Results are written to benchmarks/results/latest.json and compared with
+benchmarks/baseline.json, the command fails if any case is slower than the baseline by more than the tolerance.
+Store the current results as baseline with `--update-baseline`.
+"""
+
+import argparse
+import importlib
+import logging
+import pathlib
+import sys
+
+from benchmarks.common import compare, load_results, save_results
+
+PATH = pathlib.Path(__file__).parent.absolute()
+
+BENCHMARKS = [
+    "bench_http",
+    "bench_json",
+    "bench_schema",
+    "bench_auth",
+    "bench_context",
+    "bench_adapters",
+    "bench_service",
+]
+
+
+def run_suite(names: list = None, load: bool = False, load_options: dict = None):
+    """
+    Execute benchmark modules, modules that can not be imported are skipped
+    :param names: Benchmark module names, defaults to all of them
+    :param load: Include the end to end load test
+    :param load_options: Arguments of `benchmarks.load.run`
+    :return: dict of benchmark name and its cases results
+    """
+
+    results = {}
+
+    for name in names or BENCHMARKS:
+        try:
+            module = importlib.import_module(f"benchmarks.{name}")
+        except ImportError as error:
+            print(f"\n{name} skipped: {error}")
+            continue
+
+        results[name] = module.run()
+
+    if load:
+        from benchmarks import load as load_test  # pylint: disable=import-outside-toplevel
+
+        results["load"] = load_test.run(**(load_options or {}))
+
+    return results
+
+
+def print_comparison(comparison: list, tolerance: float):
+    """
+    Print the comparison with the baseline
+    :param comparison: `common.compare` result
+    :param tolerance: Allowed slowdown ratio
+    """
+
+    title = f"comparison with baseline (tolerance {tolerance:.0%})"
+
+    print(f"\n{title}")
+    print("-" * len(title))
+
+    for item in comparison:
+        status = "REGRESSION" if item["regression"] else "ok"
+        case = f"{item['benchmark']}: {item['case']}"
+        print(f"{case:<60} {item['baseline']:>10.2f} -> {item['current']:>10.2f} us  x{item['ratio']:.2f}  {status}")
+
+
+def main():
+    """Parse command arguments and run the suite"""
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--only", action="append", choices=BENCHMARKS, help="Run only this benchmark, can be repeated")
+    parser.add_argument("--load", action="store_true", help="Include the end to end load test")
+    parser.add_argument("--load-duration", type=float, default=10)
+    parser.add_argument("--load-concurrency", type=int, default=20)
+    parser.add_argument("--output", default=str(PATH / "results" / "latest.json"))
+    parser.add_argument("--baseline", default=str(PATH / "baseline.json"))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown ratio against the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--log-level", default="WARNING", help="App log level while benchmarks run")
+    args = parser.parse_args()
+
+    from src.commons.logging import logger  # pylint: disable=import-outside-toplevel
+
+    logger.logger.setLevel(getattr(logging, args.log_level.upper()))
+
+    results = run_suite(
+        names=args.only,
+        load=args.load,
+        load_options={"duration": args.load_duration, "concurrency": args.load_concurrency},
+    )
+
+    save_results(args.output, results)
+    print(f"\nresults saved to {args.output}")
+
+    if args.update_baseline:
+        save_results(args.baseline, results)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_results(args.baseline)
+
+    if baseline is None:
+        print(f"no baseline found at {args.baseline}, store one with --update-baseline")
+        return 0
+
+    comparison = compare(results, baseline, tolerance=args.tolerance)
+    print_comparison(comparison, args.tolerance)
+
+    return 1 if any(item["regression"] for item in comparison) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
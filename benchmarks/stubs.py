@@ -0,0 +1,252 @@
+"""Local stand-ins of the app dependencies, so benchmarks do not need external services"""
+
+import json
+import os
+import pathlib
+import socketserver
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = pathlib.Path(__file__).parent.parent.absolute()
+
+LIFT_PASS_SCHEMA = """
+CREATE TABLE base_price (pass_id INTEGER PRIMARY KEY, type VARCHAR(255) NOT NULL UNIQUE, cost INTEGER NOT NULL);
+CREATE TABLE holidays (holiday DATE NOT NULL, description VARCHAR(255));
+"""
+
+PRICES = [("1jour", 35), ("night", 19)]
+
+HOLIDAYS = [("2019-02-18", "winter"), ("2019-02-25", "winter"), ("2019-03-04", "winter")]
+
+
+@contextmanager
+def temp_sqlite():
+    """
+    Create a temporary SQLite file with the lift pass tables and reference data
+    :return: Path of the file relative to the project root, as expected by SQLITE_FILE
+    """
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as directory:
+        path = os.path.join(directory, "lift_pass.db")
+
+        with sqlite3.connect(path) as connection:
+            connection.executescript(LIFT_PASS_SCHEMA)
+            connection.executemany("INSERT INTO base_price (type, cost) VALUES (?, ?)", PRICES)
+            connection.executemany("INSERT INTO holidays (holiday, description) VALUES (?, ?)", HOLIDAYS)
+
+        connection.close()
+
+        yield os.path.relpath(path, ROOT)
+
+
+class _Server:
+    """Base of servers executed in a background thread"""
+
+    def __init__(self, server):
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def port(self):
+        """Listening port"""
+        return self._server.server_address[1]
+
+    def start(self):
+        """Start serving in background"""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class FakeRedis(_Server):
+    """
+    In memory server speaking the subset of the Redis protocol used by the app drivers:
+    PING, AUTH, SELECT, CLIENT, GET, SET (with EX), SETEX, MGET, MSET, DEL, EXISTS, EXPIRE and FLUSHDB
+    """
+
+    def __init__(self, port: int = 0):
+        self.data = {}
+        self.lock = threading.Lock()
+
+        store = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            """Connection handler"""
+
+            def handle(self):
+                while True:
+                    command = _read_command(self.rfile)
+
+                    if command is None:
+                        return
+
+                    self.wfile.write(store.execute(command))
+
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler)
+        server.daemon_threads = True
+
+        super().__init__(server)
+
+    def execute(self, command: list):
+        """
+        Execute a command against the in memory data
+        :param command: Command name and its arguments as bytes
+        :return: bytes RESP reply
+        """
+
+        name = command[0].decode().upper()
+        args = command[1:]
+
+        with self.lock:
+            self._expire()
+
+            if name == "PING":
+                return b"+PONG\r\n"
+
+            if name in ("AUTH", "SELECT", "CLIENT"):
+                return b"+OK\r\n"
+
+            if name == "GET":
+                return _bulk(self._get(args[0]))
+
+            if name == "MGET":
+                return b"*%d\r\n" % len(args) + b"".join(_bulk(self._get(key)) for key in args)
+
+            if name == "SET":
+                ttl = int(args[args.index(b"EX") + 1]) if b"EX" in args[2:] else None
+                self._set(args[0], args[1], ttl)
+                return b"+OK\r\n"
+
+            if name == "SETEX":
+                self._set(args[0], args[2], int(args[1]))
+                return b"+OK\r\n"
+
+            if name == "MSET":
+                for index in range(0, len(args), 2):
+                    self._set(args[index], args[index + 1], None)
+                return b"+OK\r\n"
+
+            if name == "DEL":
+                return b":%d\r\n" % sum(self.data.pop(key, None) is not None for key in args)
+
+            if name == "EXISTS":
+                return b":%d\r\n" % sum(key in self.data for key in args)
+
+            if name == "EXPIRE":
+                if args[0] not in self.data:
+                    return b":0\r\n"
+                self.data[args[0]] = (self.data[args[0]][0], time.monotonic() + int(args[1]))
+                return b":1\r\n"
+
+            if name == "FLUSHDB":
+                self.data.clear()
+                return b"+OK\r\n"
+
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+    def _get(self, key: bytes):
+        item = self.data.get(key, None)
+        return None if item is None else item[0]
+
+    def _set(self, key: bytes, value: bytes, ttl: int = None):
+        self.data[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    def _expire(self):
+        now = time.monotonic()
+
+        for key in [key for key, (_, expires_at) in self.data.items() if expires_at and expires_at <= now]:
+            del self.data[key]
+
+
+class HttpStub(_Server):
+    """JSON HTTP server answering any path, used as the external service of `utils.call_service`"""
+
+    def __init__(self, body: dict = None, status: int = 200, delay: float = 0.0, port: int = 0):
+        payload = json.dumps(body if body is not None else {"data": "ok"}).encode("utf-8")
+
+        class Handler(BaseHTTPRequestHandler):
+            """Request handler"""
+
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+
+                if length:
+                    self.rfile.read(length)
+
+                if delay:
+                    time.sleep(delay)
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+            def log_message(self, *args):
+                """Silence request logs"""
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        server.daemon_threads = True
+
+        super().__init__(server)
+
+    @property
+    def url(self):
+        """Base URL of the stub"""
+        return f"http://127.0.0.1:{self.port}"
+
+
+def _read_command(stream):
+    """
+    Read a RESP array command
+    :param stream: Connection input stream
+    :return: list of bytes or None when the connection is closed
+    """
+
+    header = stream.readline()
+
+    if not header:
+        return None
+
+    if not header.startswith(b"*"):
+        return header.split()
+
+    command = []
+
+    for _ in range(int(header[1:])):
+        length = int(stream.readline()[1:])
+        command.append(stream.read(length + 2)[:-2])
+
+    return command
+
+
+def _bulk(value: bytes):
+    """
+    Encode a RESP bulk string
+    :param value: bytes or None
+    :return: bytes
+    """
+
+    if value is None:
+        return b"$-1\r\n"
+
+    return b"$%d\r\n%s\r\n" % (len(value), value)
@@ -0,0 +1,57 @@
+"""Gunicorn configuration
+
+The app is preloaded in the master and shared by the forked workers, see `src.lifecycle` for the process hooks.
+Settings can be overridden from the command line, like `gunicorn -c gunicorn.conf.py --workers 2 app:app`.
+"""
+
+# pylint: disable=invalid-name
+# pylint: disable=wrong-import-position
+
+import os
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+
+# The master imports the app before forking, so gevent must patch the standard library before anything else is
+# imported. Otherwise locks and sockets created at import time would block the whole worker instead of a greenlet.
+if worker_class == "gevent":
+    from gevent import monkey
+
+    monkey.patch_all()
+
+import src.lifecycle as lifecycle
+from src.config import load
+
+CONFIG = load()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = lifecycle.worker_count()
+worker_connections = int(CONFIG.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+timeout = int(CONFIG.get("GUNICORN_TIMEOUT", 90))
+graceful_timeout = int(CONFIG.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(CONFIG.get("GUNICORN_KEEPALIVE", 5))
+preload_app = True
+
+
+def when_ready(server):
+    """Master is ready and the app is loaded"""
+    lifecycle.prepare()
+
+
+def pre_fork(server, worker):
+    """Master is about to fork a worker"""
+    lifecycle.before_fork()
+
+
+def post_fork(server, worker):
+    """New worker process, before the app is used"""
+    lifecycle.after_fork()
+
+
+def post_worker_init(worker):
+    """Worker initialized, before it accepts requests"""
+    lifecycle.warm_up()
+
+
+def child_exit(server, worker):
+    """Worker exited, in the master"""
+    lifecycle.worker_exit(worker.pid)
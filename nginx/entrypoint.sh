@@ -17,12 +17,13 @@ tail -n 0 -f /app/logs/*.log &
 
 cd /app
 
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+
 exec gunicorn app:app \
+    --config gunicorn.conf.py \
     --name flaskapp \
-    --bind 0.0.0.0:5000 \
-    --worker-class gevent \
-    --workers 5 \
-    --timeout 90 \
     --log-level=info \
     --log-file=/app/logs/gunicorn.log \
     --access-logfile=/app/logs/access.log &
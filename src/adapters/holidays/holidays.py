@@ -2,6 +2,7 @@
 
 from datetime import date
 
+import src.adapters.reference as reference
 from src.commons.drivers.sqlite import SQLite
 from src.repositories import HolidaysRepository
 
@@ -13,6 +14,9 @@ def is_holiday(lift_date: date):
     :return boolean: assertion
     """
 
+    if reference.enabled():
+        return lift_date.toordinal() in reference.holiday_ordinals()
+
     with SQLite() as database:
         holiday = HolidaysRepository.find_by_date(database=database, date=lift_date)
 
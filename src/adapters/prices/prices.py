@@ -1,5 +1,6 @@
 """Prices adapter actions"""
 
+import src.adapters.reference as reference
 from src.commons.drivers.sqlite import SQLite
 from src.commons.errors import InvalidPriceTypeError
 from src.repositories import PricesRepository
@@ -12,8 +13,11 @@ def find_price(lift_type: str):
     :return Price: Price model
     """
 
-    with SQLite() as database:
-        price = PricesRepository.find_one_by_lift_type(database=database, lift_type=lift_type)
+    if reference.enabled():
+        price = reference.price_by_lift_type().get(lift_type, None)
+    else:
+        with SQLite() as database:
+            price = PricesRepository.find_one_by_lift_type(database=database, lift_type=lift_type)
 
     if price is None:
         raise InvalidPriceTypeError(root_causes=[{"lift_type": lift_type}])
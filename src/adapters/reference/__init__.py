@@ -0,0 +1,3 @@
+"""Export resources"""
+
+from .reference import enabled, holiday_ordinals, price_by_lift_type, invalidate, index_stats
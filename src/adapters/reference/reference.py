@@ -0,0 +1,181 @@
+"""In memory index of holidays and prices reference tables"""
+
+# pylint: disable=global-statement
+
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime
+
+from src.commons.drivers.sqlite import SQLite
+from src.commons.logging import logger
+from src.config import load
+
+CONFIG = load()
+
+Snapshot = namedtuple("Snapshot", ["mtime", "holidays", "prices", "loaded_at"])
+Price = namedtuple("Price", ["pass_id", "lift_type", "cost"])
+
+HOLIDAYS_QUERY = "SELECT holiday FROM holidays"
+PRICES_QUERY = "SELECT pass_id, type, cost FROM base_price"
+
+_LOCK = threading.Lock()
+_SNAPSHOT = None
+_NEXT_CHECK = 0.0
+_STATS = {"loads": 0, "invalidations": 0, "last_load_seconds": None}
+
+
+def enabled():
+    """
+    Check if reference tables should be served from memory
+    :return: bool
+    """
+
+    return str(CONFIG.get("REFERENCE_CACHE", "false")).lower() == "true"
+
+
+def holiday_ordinals():
+    """
+    Return the set of holiday dates as ordinals
+    :return: frozenset of int
+    """
+
+    return _snapshot().holidays
+
+
+def price_by_lift_type():
+    """
+    Return prices indexed by lift type
+    :return: dict of lift type and Price, with pass_id, lift_type and cost fields
+    """
+
+    return _snapshot().prices
+
+
+def invalidate():
+    """Drop loaded tables so next lookup loads them again"""
+
+    global _SNAPSHOT
+
+    with _LOCK:
+        _SNAPSHOT = None
+        _STATS["invalidations"] += 1
+
+
+def index_stats():
+    """
+    Return reference index metrics
+    :return: dict with load counters and current table sizes
+    """
+
+    return _stats(_SNAPSHOT)
+
+
+def _stats(snapshot):
+    """
+    Build reference index metrics of a snapshot
+    :param snapshot: Snapshot or None if tables are not loaded
+    :return: dict with load counters and the snapshot table sizes
+    """
+
+    stats = dict(_STATS)
+
+    if snapshot is not None:
+        stats.update({
+            "holidays": len(snapshot.holidays),
+            "prices": len(snapshot.prices),
+            "loaded_at": snapshot.loaded_at,
+        })
+
+    return stats
+
+
+def _snapshot():
+    """
+    Get current snapshot, loading it again if it was invalidated or the database file changed.
+    File modification time is checked at most once every REFERENCE_CACHE_CHECK_INTERVAL seconds.
+    :return: Snapshot
+    """
+
+    global _SNAPSHOT, _NEXT_CHECK
+
+    snapshot = _SNAPSHOT
+    now = time.monotonic()
+
+    if snapshot is not None and now < _NEXT_CHECK:
+        return snapshot
+
+    with _LOCK:
+        snapshot = _SNAPSHOT
+        mtime = _database_mtime()
+
+        if snapshot is None or snapshot.mtime != mtime:
+            snapshot = _load(mtime)
+            _SNAPSHOT = snapshot
+
+        _NEXT_CHECK = now + float(CONFIG.get("REFERENCE_CACHE_CHECK_INTERVAL", 5))
+
+    return snapshot
+
+
+def _load(mtime: int):
+    """
+    Read holidays and prices tables and build their indexes
+    :param mtime: Database files modification time at load
+    :return: Snapshot
+    """
+
+    start = time.perf_counter()
+
+    with SQLite() as database:
+        holidays = database.query(HOLIDAYS_QUERY)
+        prices = database.query(PRICES_QUERY)
+
+    snapshot = Snapshot(
+        mtime=mtime,
+        holidays=frozenset(_to_date(holiday).toordinal() for holiday, in holidays),
+        prices={row[1]: Price(*row) for row in prices},
+        loaded_at=time.time(),
+    )
+
+    _STATS["loads"] += 1
+    _STATS["last_load_seconds"] = time.perf_counter() - start
+
+    logger.fields(_stats(snapshot)).info("reference tables loaded")
+
+    return snapshot
+
+
+def _database_mtime():
+    """
+    Get SQLite file modification time, including its WAL file when the database runs in WAL mode
+    :return: int timestamp in nanoseconds or None if file can not be read
+    """
+
+    path = SQLite.database_path()
+    mtime = None
+
+    for file in (path, f"{path}-wal"):
+        try:
+            mtime = max(mtime or 0, os.stat(file).st_mtime_ns)
+        except OSError:
+            continue
+
+    return mtime
+
+
+def _to_date(value):
+    """
+    Normalize stored holiday values into date objects
+    :param value: date, datetime or ISO formatted string
+    :return: date
+    """
+
+    if isinstance(value, datetime):
+        return value.date()
+
+    if isinstance(value, date):
+        return value
+
+    return date.fromisoformat(str(value)[:10])
@@ -1,3 +1,3 @@
 """Export resources"""
 
-from .context import set_value, get_value, reset, delete
+from .context import set_value, get_value, reset, delete, begin, end
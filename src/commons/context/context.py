@@ -1,11 +1,41 @@
-"""Global app context"""
+"""Request scoped app context"""
 
 # pylint: disable=invalid-name
 # pylint: disable=global-statement
 
+from contextvars import ContextVar
+
+_scope = ContextVar("context_scope", default=None)
+
+# Values stored outside of a request scope, like app bootstrapping resources, visible from every scope
 context = {}
 
 
+def begin():
+    """
+    Start a new empty context scope for the current request, thread or greenlet
+    :return: Token to restore the previous scope with `end`
+    """
+
+    return _scope.set({})
+
+
+def end(token=None):
+    """
+    Finish the current context scope
+    :param token: Token returned by `begin`, if omitted the scope is just cleared
+    """
+
+    if token is None:
+        _scope.set(None)
+        return
+
+    try:
+        _scope.reset(token)
+    except ValueError:
+        _scope.set(None)
+
+
 def set_value(key, value):
     """
     set Key value to the context var
@@ -14,18 +44,26 @@ def set_value(key, value):
     :return: None
     """
 
-    global context
-    context.update({key: value})
+    scope = _scope.get()
+
+    if scope is None:
+        context[key] = value
+    else:
+        scope[key] = value
 
 
 def get_value(key):
     """
-    Return a stored value in the global context
+    Return a stored value in the current scope or in the global context
     :param key: Name of the key
     :return: Stored value
     """
 
-    global context
+    scope = _scope.get()
+
+    if scope is not None and key in scope:
+        return scope[key]
+
     return context.get(key, None)
 
 
@@ -34,13 +72,20 @@ def delete(key):
     Delete some context key
     :param key:
     """
-    global context
 
-    if key in context:
-        del context[key]
+    scope = _scope.get()
+    values = context if scope is None else scope
+
+    if key in values:
+        del values[key]
 
 
 def reset():
-    """Reset the global context values"""
-    global context
-    context.clear()
+    """Reset the current scope values, or the global context values outside of a scope"""
+
+    scope = _scope.get()
+
+    if scope is None:
+        context.clear()
+    else:
+        scope.clear()
@@ -1,6 +1,44 @@
-"""Export resources"""
+"""Export resources
 
-from .postgres import Postgres
-from .mongo import Mongo
-from .redis import Redis
-from .sqlite import SQLite
+Driver modules are imported on first use, so deployments only pay for the client libraries they use. Accessing
+`Postgres`, `Mongo`, `Redis` or `SQLite` from this package imports its module through the registry.
+"""
+
+from typing import TYPE_CHECKING
+
+from .registry import DRIVERS, get_driver, load_driver, configured_drivers, preload, loaded_drivers
+
+# Static imports for linters and type checkers only, at runtime classes are imported by `__getattr__`
+if TYPE_CHECKING:
+    from .postgres import Postgres
+    from .mongo import Mongo
+    from .redis import Redis
+    from .sqlite import SQLite
+
+__all__ = [
+    "DRIVERS", "get_driver", "load_driver", "configured_drivers", "preload", "loaded_drivers",
+    "Postgres", "Mongo", "Redis", "SQLite",
+]
+
+_CLASSES = {class_name: name for name, (_, class_name) in DRIVERS.items()}
+
+
+def __getattr__(name: str):
+    """
+    Import driver classes on first access
+    :param name: Attribute name
+    :return: Driver class
+    """
+
+    if name not in _CLASSES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    driver = get_driver(_CLASSES[name])
+    globals()[name] = driver
+
+    return driver
+
+
+def __dir__():
+    """List package attributes including the not yet imported driver classes"""
+    return sorted(set(globals()) | set(__all__))
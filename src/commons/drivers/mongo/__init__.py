@@ -1,3 +1,3 @@
 """Export resources"""
 
-from .mongo import Mongo
+from .mongo import Mongo, get_client, reset_client
@@ -1,32 +1,43 @@
 
 """Mongo Client creation"""
 
+# pylint: disable=global-statement
+
+import os
 import re
+import threading
+import time
 from contextlib import ContextDecorator
 
 import pymongo
 from pymongo.errors import ConnectionFailure
 
+import src.commons.metrics as metrics
 from src.commons.logging import logger
 from src.commons.errors import DuplicationError
-from src.config import load
+from src.config import load, on_change
 
 CONFIG = load()
 
+_CLIENT = None
+_CLIENT_PID = None
+_CLIENT_LOCK = threading.Lock()
+_PINGS = {}
+
+POOL_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+}
+
 
 class Mongo(ContextDecorator):
     """Mongo connection Class"""
 
     def __init__(self):
         self._database = CONFIG["MONGO_DB"]
-        self._url = CONFIG["MONGO_URL"]
-
-        logger.fields({
-            "url": self._url,
-            "database": self._database
-        }).debug("connect mongo _database")
-
-        self._connection = pymongo.MongoClient(self._url)
+        self._connection = get_client()
         self.ping()
 
     def __enter__(self):
@@ -34,16 +45,28 @@ class Mongo(ContextDecorator):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Closing context"""
-        self._connection.close()
+        """Closing context, shared client keeps its connections open"""
+
+    def ping(self, force: bool = False):
+        """
+        Check database Connection. Successful results are reused for MONGO_PING_INTERVAL seconds.
+        :param force: Ignore cached result
+        """
+
+        now = time.monotonic()
+        last_ping = _PINGS.get(self._database, None)
+
+        if not force and last_ping is not None and now - last_ping < float(CONFIG.get("MONGO_PING_INTERVAL", 30)):
+            return
 
-    def ping(self):
-        """Check database Connection"""
         res = self._connection[self._database].command("ping")
 
         if res["ok"] != 1.0:
+            _PINGS.pop(self._database, None)
             raise ConnectionFailure("unhealthy database connection")
 
+        _PINGS[self._database] = now
+
     def use_database(self, database: str):
         """
         Set database or change for other
@@ -63,10 +86,11 @@ class Mongo(ContextDecorator):
         try:
             search = self._connection[self._database][collection]
 
-            if filters:
-                total = search.find(filters).count()
-            else:
-                total = search.find().count()
+            with metrics.timed("mongo", "count"):
+                if filters:
+                    total = search.find(filters).count()
+                else:
+                    total = search.find().count()
 
             return total
         except Exception as error:
@@ -80,7 +104,8 @@ class Mongo(ContextDecorator):
         :return: Found document or None
         """
 
-        return self._connection[self._database][collection].find_one(filters)
+        with metrics.timed("mongo", "find_one"):
+            return self._connection[self._database][collection].find_one(filters)
 
     def find_many(
         self,
@@ -121,6 +146,67 @@ class Mongo(ContextDecorator):
         except Exception as error:
             raise self._process_errors(error)
 
+    def stream(
+        self,
+        collection: str,
+        filters: dict = None,
+        projection: (list, dict) = None,
+        order_by: str = None,
+        order: int = None,
+        limit: int = None,
+        after=None,
+        batch_size: int = None,
+        max_time_ms: int = None,
+        hint: (str, list) = None,
+    ):
+        """
+        Iterate over documents fetching them from the server in batches, so the whole result never needs to be held
+        in memory. Use `after` with the last `_id` received instead of offsets to paginate.
+        :param collection: Mongo collection name
+        :param filters: Mongo query to be executed
+        :param projection: Fields to include or exclude from documents
+        :param order_by: Order data by a specific field, defaults to `_id` when paginating with `after`
+        :param order: order type ascending (1) or descending (-1)
+        :param limit: Max number of documents
+        :param after: Return only documents with `_id` greater than this value (lower if order is descending)
+        :param batch_size: Number of documents per server round trip, defaults to MONGO_BATCH_SIZE
+        :param max_time_ms: Max server execution time for the query
+        :param hint: Index to use for the query
+        :return: Generator of documents
+        """
+
+        filters = dict(filters or {})
+
+        if after is not None:
+            order_by = order_by or "_id"
+            filters["_id"] = {"$lt" if order == pymongo.DESCENDING else "$gt": after}
+
+        if batch_size is None and CONFIG.get("MONGO_BATCH_SIZE") not in (None, ""):
+            batch_size = int(CONFIG["MONGO_BATCH_SIZE"])
+
+        try:
+            cursor = self._connection[self._database][collection].find(filters, projection=projection)
+
+            if order_by:
+                cursor = cursor.sort(order_by, order or pymongo.ASCENDING)
+
+            if limit:
+                cursor = cursor.limit(limit)
+
+            if batch_size:
+                cursor = cursor.batch_size(batch_size)
+
+            if max_time_ms:
+                cursor = cursor.max_time_ms(max_time_ms)
+
+            if hint:
+                cursor = cursor.hint(hint)
+
+            with cursor:
+                yield from cursor
+        except Exception as error:
+            raise self._process_errors(error)
+
     def insert_one(self, collection: str, data: dict):
         """
         Insert a document into a collection
@@ -130,7 +216,8 @@ class Mongo(ContextDecorator):
         """
 
         try:
-            return self._connection[self._database][collection].insert(data)
+            with metrics.timed("mongo", "insert_one"):
+                return self._connection[self._database][collection].insert(data)
         except Exception as error:
             raise self._process_errors(error)
 
@@ -143,7 +230,8 @@ class Mongo(ContextDecorator):
         """
 
         try:
-            return self._connection[self._database][collection].insert_many(data).inserted_ids
+            with metrics.timed("mongo", "insert_many"):
+                return self._connection[self._database][collection].insert_many(data).inserted_ids
         except Exception as error:
             raise self._process_errors(error)
 
@@ -156,8 +244,9 @@ class Mongo(ContextDecorator):
         """
 
         try:
-            return self._connection[self._database][collection] \
-                .update_many(filters, new_data).modified_count
+            with metrics.timed("mongo", "update_many"):
+                return self._connection[self._database][collection] \
+                    .update_many(filters, new_data).modified_count
         except Exception as error:
             raise self._process_errors(error)
 
@@ -170,8 +259,9 @@ class Mongo(ContextDecorator):
         """
 
         try:
-            return self._connection[self._database][collection] \
-                .update_one(filters, new_data).modified_count
+            with metrics.timed("mongo", "update_one"):
+                return self._connection[self._database][collection] \
+                    .update_one(filters, new_data).modified_count
         except Exception as error:
             raise self._process_errors(error)
 
@@ -182,7 +272,8 @@ class Mongo(ContextDecorator):
         :param filters: Mongo query to match document
         """
         try:
-            deletes = self._connection[self._database][collection].delete_many(filters)
+            with metrics.timed("mongo", "delete_many"):
+                deletes = self._connection[self._database][collection].delete_many(filters)
             return deletes.deleted_count
         except Exception as error:
             raise self._process_errors(error)
@@ -194,7 +285,8 @@ class Mongo(ContextDecorator):
         :param filters: Mongo query to be executed
         """
 
-        self._connection[self._database][collection].delete_one(filters)
+        with metrics.timed("mongo", "delete_one"):
+            self._connection[self._database][collection].delete_one(filters)
 
     @staticmethod
     def _process_errors(error: Exception):
@@ -208,3 +300,63 @@ class Mongo(ContextDecorator):
             raise DuplicationError()
 
         raise error
+
+
+def get_client():
+    """
+    Return the process shared MongoClient. A new client is created after a fork, since pymongo clients must not be
+    shared between processes.
+    :return: pymongo.MongoClient
+    """
+
+    global _CLIENT, _CLIENT_PID
+
+    pid = os.getpid()
+
+    if _CLIENT is not None and _CLIENT_PID == pid:
+        return _CLIENT
+
+    with _CLIENT_LOCK:
+        if _CLIENT is None or _CLIENT_PID != pid:
+            logger.fields({"database": CONFIG["MONGO_DB"], "pid": pid}).debug("connect mongo client")
+
+            _CLIENT = pymongo.MongoClient(CONFIG["MONGO_URL"], **_pool_options())
+            _CLIENT_PID = pid
+            _PINGS.clear()
+
+    return _CLIENT
+
+
+def reset_client():
+    """Close shared client so next usage opens a new one"""
+
+    global _CLIENT, _CLIENT_PID
+
+    with _CLIENT_LOCK:
+        client, pid = _CLIENT, _CLIENT_PID
+        _CLIENT, _CLIENT_PID = None, None
+        _PINGS.clear()
+
+    if client is not None and pid == os.getpid():
+        client.close()
+
+
+@on_change
+def _on_config_change(changed: set, config: dict):
+    """
+    Open a new client if connection settings were rotated
+    :param changed: Changed configuration keys
+    :param config: Current configuration
+    """
+
+    if changed & {"MONGO_URL", *POOL_OPTIONS}:
+        reset_client()
+
+
+def _pool_options():
+    """
+    Build MongoClient pool options from configuration
+    :return: dict of client options
+    """
+
+    return {option: int(CONFIG[key]) for key, option in POOL_OPTIONS.items() if CONFIG.get(key) not in (None, "")}
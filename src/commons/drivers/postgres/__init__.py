@@ -1,3 +1,3 @@
 """Export resources"""
 
-from .postgres import Postgres
+from .postgres import Postgres, get_pool, pool_stats, reset_pool
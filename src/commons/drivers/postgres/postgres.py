@@ -1,21 +1,47 @@
 """Postgres database connection class"""
 
+# pylint: disable=global-statement
+
+import os
+import threading
+import time
 from contextlib import ContextDecorator
 
 import psycopg2
+from psycopg2 import extensions
 
-from src.config import load
+import src.commons.metrics as metrics
+import src.commons.querylog as querylog
+from src.commons.pool import ConnectionPool
+from src.config import load, on_change
 
 CONFIG = load()
 
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+
+# Pools inherited from a parent process. They are kept referenced, since closing their connections from a child,
+# even by garbage collection, would terminate the sessions of the parent.
+_INHERITED = []
+
 
 class Postgres(ContextDecorator):
     """Postgres connection manager"""
 
     def __init__(self):
-        self._conn = psycopg2.connect(CONFIG["DATABASE_URL"])
-        self._conn.autocommit = str(CONFIG["DATABASE_COMMIT"]).lower() == "true"
-        self._cursor = self._conn.cursor()
+        self._pool = get_pool()
+        self._conn = self._pool.acquire()
+
+        try:
+            self._conn.autocommit = str(CONFIG["DATABASE_COMMIT"]).lower() == "true"
+            self._cursor = self._conn.cursor()
+        except Exception:
+            self._pool.release(self._conn, discard=self._conn.closed != 0)
+            self._conn = None
+            raise
+        finally:
+            metrics.observe_pool("postgres", self._pool.stats())
 
     def __enter__(self):
         """
@@ -35,8 +61,9 @@ class Postgres(ContextDecorator):
         :return: list
         """
 
-        self._cursor.execute(query)
-        return self._cursor.fetchall()
+        with metrics.timed("postgres", "query"), querylog.timed("postgres", query, lambda: self._explain(query)):
+            self._cursor.execute(query)
+            return self._cursor.fetchall()
 
     def query_one(self, query: str):
         """
@@ -45,8 +72,9 @@ class Postgres(ContextDecorator):
         :return: list
         """
 
-        self._cursor.execute(query)
-        return self._cursor.fetchone()
+        with metrics.timed("postgres", "query_one"), querylog.timed("postgres", query, lambda: self._explain(query)):
+            self._cursor.execute(query)
+            return self._cursor.fetchone()
 
     def query_none(self, query: str):
         """
@@ -54,9 +82,181 @@ class Postgres(ContextDecorator):
         :param query: SQL query statement
         """
 
-        self._cursor.execute(query)
+        with metrics.timed("postgres", "query_none"), querylog.timed("postgres", query, lambda: self._explain(query)):
+            self._cursor.execute(query)
+
+    def _explain(self, query: str):
+        """
+        Return the query plan of a statement. Inside a transaction the plan is obtained under a savepoint, so a
+        failed EXPLAIN does not abort the current transaction.
+        :param query: SQL query statement
+        :return: list of str plan lines
+        """
+
+        savepoint = not self._conn.autocommit
+
+        with self._conn.cursor() as cursor:
+            if savepoint:
+                cursor.execute("SAVEPOINT query_plan")
+
+            try:
+                cursor.execute(f"EXPLAIN {query}")
+                plan = [row[0] for row in cursor.fetchall()]
+            except psycopg2.Error:
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT query_plan")
+                raise
+
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT query_plan")
+
+        return plan
 
     def close(self):
-        """Close database connection"""
+        """Close cursor and return the connection to the pool"""
+
+        if self._conn is None:
+            return
+
         self._cursor.close()
-        self._conn.close()
+        self._pool.release(self._conn, discard=self._conn.closed != 0)
+        self._conn = None
+
+        metrics.observe_pool("postgres", self._pool.stats())
+
+
+def get_pool():
+    """
+    Return the process connection pool, creating it on first use. A new pool is created after a fork, since
+    connections must not be shared between processes.
+    :return: ConnectionPool
+    """
+
+    global _POOL, _POOL_PID
+
+    pid = os.getpid()
+
+    if _POOL is not None and _POOL_PID == pid:
+        return _POOL
+
+    with _POOL_LOCK:
+        if _POOL is not None and _POOL_PID != pid:
+            _INHERITED.append(_POOL)
+            _POOL = None
+
+        if _POOL is None:
+            timeout = CONFIG.get("POSTGRES_POOL_TIMEOUT", 10)
+
+            _POOL = ConnectionPool(
+                factory=_connect,
+                min_size=int(CONFIG.get("POSTGRES_POOL_MIN", 0)),
+                max_size=int(CONFIG.get("POSTGRES_POOL_MAX", 10)),
+                timeout=float(timeout) if timeout not in (None, "") else None,
+                check=_check,
+                reset=_reset,
+            )
+            _POOL_PID = pid
+            _POOL.fill()
+
+    return _POOL
+
+
+def pool_stats():
+    """
+    Return connection pool utilization metrics
+    :return: dict
+    """
+
+    return get_pool().stats()
+
+
+def reset_pool():
+    """
+    Discard the pool so next usage creates a new one. Idle connections are closed only if they were opened by the
+    current process, connections inherited from a parent process are left to it.
+    """
+
+    global _POOL, _POOL_PID
+
+    with _POOL_LOCK:
+        pool, pid = _POOL, _POOL_PID
+        _POOL, _POOL_PID = None, None
+
+        if pool is not None and pid != os.getpid():
+            _INHERITED.append(pool)
+            return
+
+    if pool is not None:
+        pool.close_all()
+
+
+class _PooledConnection(extensions.connection):
+    """Connection that keeps the time of its last health check"""
+
+    checked_at = 0.0
+
+
+@on_change
+def _on_config_change(changed: set, config: dict):
+    """
+    Open new connections if database credentials were rotated
+    :param changed: Changed configuration keys
+    :param config: Current configuration
+    """
+
+    if "DATABASE_URL" in changed:
+        reset_pool()
+
+
+def _connect():
+    """
+    Open a new database connection
+    :return: psycopg2 connection
+    """
+
+    conn = psycopg2.connect(CONFIG["DATABASE_URL"], connection_factory=_PooledConnection)
+    conn.checked_at = time.monotonic()
+
+    return conn
+
+
+def _check(conn):
+    """
+    Validate a connection before it is borrowed. A round trip is only done if the connection has been idle for more
+    than POSTGRES_POOL_CHECK_INTERVAL seconds.
+    :param conn: Pooled connection
+    :return: bool
+    """
+
+    if conn.closed:
+        return False
+
+    now = time.monotonic()
+
+    if now - conn.checked_at < float(CONFIG.get("POSTGRES_POOL_CHECK_INTERVAL", 30)):
+        return True
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+    if not conn.autocommit:
+        conn.rollback()
+
+    conn.checked_at = now
+
+    return True
+
+
+def _reset(conn):
+    """
+    Discard not committed changes before the connection is returned to the pool
+    :param conn: Pooled connection
+    """
+
+    if conn.closed:
+        raise psycopg2.InterfaceError("connection already closed")
+
+    if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+        conn.rollback()
+
+    conn.checked_at = time.monotonic()
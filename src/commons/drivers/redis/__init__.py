@@ -1,3 +1,3 @@
 """Export resources"""
 
-from .redis import Redis
+from .redis import Redis, get_pool, reset_pool
@@ -1,26 +1,26 @@
 """Redis connection class"""
 
+# pylint: disable=global-statement
+
+import threading
 from contextlib import ContextDecorator
 
 import redis
 
-from src.config import load
+import src.commons.metrics as metrics
+from src.config import load, on_change
 
 CONFIG = load()
 
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
 
 class Redis(ContextDecorator):
     """Redis connection class context"""
 
     def __init__(self):
-        redis_db = 0
-
-        if "REDIS_DB" in CONFIG.keys():
-            redis_db = int(CONFIG["REDIS_DB"])
-
-        self._connection = redis.Redis(
-            host=CONFIG["REDIS_HOST"], password=CONFIG["REDIS_PASS"], db=redis_db
-        )
+        self._connection = redis.Redis(connection_pool=get_pool())
 
     def __enter__(self):
         """Enter as a context object"""
@@ -45,7 +45,8 @@ class Redis(ContextDecorator):
         :return: String value of the key
         """
 
-        value = self._connection.get(key)
+        with metrics.timed("redis", "get"):
+            value = self._connection.get(key)
 
         if value is None:
             return None
@@ -60,7 +61,8 @@ class Redis(ContextDecorator):
         :param expires_in: Expiration time in seconds
         """
 
-        self._connection.set(key, value, ex=expires_in)
+        with metrics.timed("redis", "set"):
+            self._connection.set(key, value, ex=expires_in)
 
     def delete_key(self, key: str):
         """
@@ -68,19 +70,185 @@ class Redis(ContextDecorator):
         :param key: Key name to be deleted
         """
 
-        self._connection.delete(key)
+        with metrics.timed("redis", "delete"):
+            self._connection.delete(key)
+
+    def get_many(self, keys: list):
+        """
+        Return the values of several keys in a single MGET round trip
+        :param keys: Redis stored keys
+        :return: dict of key and string value, missing keys are returned as None
+        """
+
+        keys = list(keys)
+
+        if not keys:
+            return {}
+
+        with metrics.timed("redis", "mget"):
+            values = self._connection.mget(keys)
+
+        return {_decode(key): _decode(value) for key, value in zip(keys, values)}
+
+    def set_many(self, values: dict, expires_in: (int, dict) = None):
+        """
+        Store several key value pairs in a single pipeline round trip
+        :param values: dict of key and value to store
+        :param expires_in: Expiration time in seconds for all keys, or dict with the expiration of each key
+        """
+
+        if not values:
+            return
 
-    def get_all_values(self):
+        if expires_in is None:
+            with metrics.timed("redis", "mset"):
+                self._connection.mset(values)
+            return
+
+        pipeline = self._connection.pipeline(transaction=False)
+
+        for key, value in values.items():
+            ttl = expires_in.get(key, None) if isinstance(expires_in, dict) else expires_in
+            pipeline.set(key, value, ex=ttl)
+
+        with metrics.timed("redis", "set_many"):
+            pipeline.execute()
+
+    def delete_many(self, keys: list, batch_size: int = 500):
+        """
+        Delete several keys sending them in batches
+        :param keys: Iterable of keys to delete
+        :param batch_size: Max keys per DEL command
+        :return: Total of deleted keys
+        """
+
+        deleted = 0
+        pipeline = self._connection.pipeline(transaction=False)
+
+        for batch in _batches(keys, batch_size):
+            pipeline.delete(*batch)
+
+        with metrics.timed("redis", "delete_many"):
+            results = pipeline.execute()
+
+        for result in results:
+            deleted += result
+
+        return deleted
+
+    def scan_keys(self, match: str = None, count: int = None):
+        """
+        Iterate over stored keys with SCAN, so the server is never blocked like with KEYS
+        :param match: Glob-style pattern to filter keys
+        :param count: Hint of keys returned per SCAN call
+        :return: Generator of string keys
+        """
+
+        for key in self._connection.scan_iter(match=match, count=count):
+            yield _decode(key)
+
+    def scan_values(self, match: str = None, count: int = None):
+        """
+        Iterate over stored key value pairs, fetching values with one MGET per SCAN batch
+        :param match: Glob-style pattern to filter keys
+        :param count: Hint of keys returned per SCAN call
+        :return: Generator of (key, value) tuples
+        """
+
+        for batch in _batches(self.scan_keys(match=match, count=count), count or 100):
+            yield from self.get_many(batch).items()
+
+    def get_all_values(self, match: str = None):
         """
         Return a dict with all key value pairs stored on redis
+        :param match: Glob-style pattern to filter keys
         :return: dict with all redis values
         """
 
-        keys = self._connection.keys("*")
+        return dict(self.scan_values(match=match))
+
+
+def get_pool():
+    """
+    Return the process connection pool shared by all Redis instances, creating it on first use
+    :return: redis.ConnectionPool
+    """
+
+    global _POOL
+
+    if _POOL is not None:
+        return _POOL
+
+    with _POOL_LOCK:
+        if _POOL is None:
+            options = {
+                "host": CONFIG["REDIS_HOST"],
+                "port": int(CONFIG.get("REDIS_PORT", 6379)),
+                "password": CONFIG["REDIS_PASS"],
+                "db": int(CONFIG.get("REDIS_DB", 0)),
+            }
+
+            if CONFIG.get("REDIS_MAX_CONNECTIONS") not in (None, ""):
+                options["max_connections"] = int(CONFIG["REDIS_MAX_CONNECTIONS"])
+
+            _POOL = redis.ConnectionPool(**options)
+
+    return _POOL
+
+
+def reset_pool():
+    """Disconnect pooled connections and discard the pool so next usage creates a new one"""
 
-        all_values = []
+    global _POOL
 
-        for key in keys:
-            all_values[key] = self.get_value(key)
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+
+    if pool is not None:
+        pool.disconnect()
+
+
+@on_change
+def _on_config_change(changed: set, config: dict):
+    """
+    Open new connections if redis settings were rotated
+    :param changed: Changed configuration keys
+    :param config: Current configuration
+    """
+
+    if changed & {"REDIS_HOST", "REDIS_PORT", "REDIS_PASS", "REDIS_DB", "REDIS_MAX_CONNECTIONS"}:
+        reset_pool()
+
+
+def _batches(items, size: int):
+    """
+    Split an iterable in lists of a max size
+    :param items: Iterable to split
+    :param size: Max length of each list
+    :return: Generator of lists
+    """
+
+    batch = []
+
+    for item in items:
+        batch.append(item)
+
+        if len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def _decode(value):
+    """
+    Decode redis bytes responses
+    :param value: bytes, str or None
+    :return: str or None
+    """
+
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
 
-        return all_values
+    return value
@@ -0,0 +1,88 @@
+"""Registry of database drivers loaded on demand"""
+
+import importlib
+import sys
+
+from src.config import load
+
+CONFIG = load()
+
+# Configuration name of each driver and its module and class
+DRIVERS = {
+    "postgres": ("src.commons.drivers.postgres", "Postgres"),
+    "mongo": ("src.commons.drivers.mongo", "Mongo"),
+    "redis": ("src.commons.drivers.redis", "Redis"),
+    "sqlite": ("src.commons.drivers.sqlite", "SQLite"),
+}
+
+
+def load_driver(name: str):
+    """
+    Import a driver module, following calls return the already imported module
+    :param name: Driver name, one of DRIVERS keys
+    :return: Driver module
+    :raise: KeyError if the driver does not exist
+    """
+
+    module, _ = DRIVERS[name]
+
+    return importlib.import_module(module)
+
+
+def get_driver(name: str):
+    """
+    Return a driver class importing its module if needed
+    :param name: Driver name, one of DRIVERS keys
+    :return: Driver class
+    """
+
+    _, class_name = DRIVERS[name]
+
+    return getattr(load_driver(name), class_name)
+
+
+def configured_drivers():
+    """
+    Return the drivers used by the deployment, from the DRIVERS config as list or comma separated string
+    :return: list of driver names, empty if it is not configured
+    """
+
+    value = CONFIG.get("DRIVERS", None)
+
+    if not value:
+        return []
+
+    if isinstance(value, str):
+        value = value.split(",")
+
+    names = [str(name).strip().lower() for name in value if str(name).strip()]
+    unknown = [name for name in names if name not in DRIVERS]
+
+    if unknown:
+        raise KeyError(f"unknown drivers {unknown}, available drivers are {sorted(DRIVERS)}")
+
+    return names
+
+
+def preload(names: list = None):
+    """
+    Import driver modules ahead of the first request, like before forking server workers
+    :param names: Driver names, defaults to the configured drivers
+    :return: list of loaded driver names
+    """
+
+    names = configured_drivers() if names is None else names
+
+    for name in names:
+        load_driver(name)
+
+    return names
+
+
+def loaded_drivers():
+    """
+    Return the drivers whose modules are already imported
+    :return: list of driver names
+    """
+
+    return [name for name, (module, _) in DRIVERS.items() if module in sys.modules]
@@ -1,3 +1,3 @@
 """Export resources"""
 
-from .sqlite import SQLite
+from .sqlite import SQLite, get_pool, pool_stats, reset_pool
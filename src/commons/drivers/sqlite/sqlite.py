@@ -1,14 +1,32 @@
 """Sqlite connection class"""
 
+# pylint: disable=global-statement
+
+import os
 import pathlib
 import sqlite3
+import threading
 from contextlib import ContextDecorator
 
+import src.commons.metrics as metrics
+import src.commons.querylog as querylog
 from src.commons.logging import logger
+from src.commons.pool import ConnectionPool
 from src.config import load
 
 CONFIG = load()
 
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+
+PRAGMAS = {
+    "SQLITE_JOURNAL_MODE": "journal_mode",
+    "SQLITE_SYNCHRONOUS": "synchronous",
+    "SQLITE_CACHE_SIZE": "cache_size",
+    "SQLITE_MMAP_SIZE": "mmap_size",
+}
+
 
 class SQLite(ContextDecorator):
     """SQLite Context class"""
@@ -16,11 +34,26 @@ class SQLite(ContextDecorator):
     DATA_PATH = pathlib.Path(__file__).parent.absolute()
 
     def __init__(self):
-        self._database = f"{self.DATA_PATH}/../../../../{CONFIG['SQLITE_FILE']}"
+        self._database = self.database_path()
         self._commit = str(CONFIG["SQLITE_COMMIT"]).lower() == "true"
 
-        self._connection = sqlite3.connect(self._database)
-        self._cursor = self._connection.cursor()
+        self._pool = get_pool()
+
+        if self._pool is None:
+            self._connection = _connect()
+            self._cursor = self._connection.cursor()
+            return
+
+        self._connection = self._pool.acquire()
+
+        try:
+            self._cursor = self._connection.cursor()
+        except Exception:
+            self._pool.release(self._connection, discard=True)
+            self._connection = None
+            raise
+        finally:
+            metrics.observe_pool("sqlite", self._pool.stats())
 
     def __enter__(self):
         """
@@ -33,6 +66,15 @@ class SQLite(ContextDecorator):
         """Terminate context object"""
         self.close()
 
+    @classmethod
+    def database_path(cls):
+        """
+        Return the absolute path of the configured SQLite file
+        :return: str path
+        """
+
+        return f"{cls.DATA_PATH}/../../../../{CONFIG['SQLITE_FILE']}"
+
     def query(self, query: str, *args):
         """
         Execute a query and return all values
@@ -42,12 +84,13 @@ class SQLite(ContextDecorator):
 
         logger.fields({"query": query, "query_args": args}).debug("executing query")
 
-        self._cursor.execute(query, args)
+        with metrics.timed("sqlite", "query"), querylog.timed("sqlite", query, lambda: self._explain(query, args)):
+            self._cursor.execute(query, args)
 
-        if self._commit:
-            self._connection.commit()
+            if self._commit:
+                self._connection.commit()
 
-        return self._cursor.fetchall()
+            return self._cursor.fetchall()
 
     def query_one(self, query: str, *args):
         """
@@ -58,12 +101,13 @@ class SQLite(ContextDecorator):
 
         logger.fields({"query": query, "query_args": args}).debug("executing query_one")
 
-        self._cursor.execute(query, args)
+        with metrics.timed("sqlite", "query_one"), querylog.timed("sqlite", query, lambda: self._explain(query, args)):
+            self._cursor.execute(query, args)
 
-        if self._commit:
-            self._connection.commit()
+            if self._commit:
+                self._connection.commit()
 
-        return self._cursor.fetchone()
+            return self._cursor.fetchone()
 
     def query_none(self, query: str, *args):
         """
@@ -73,16 +117,135 @@ class SQLite(ContextDecorator):
 
         logger.fields({"query": query, "query_args": args}).debug("executing query_none")
 
-        self._cursor.execute(query, args)
+        with metrics.timed("sqlite", "query_none"), querylog.timed("sqlite", query, lambda: self._explain(query, args)):
+            self._cursor.execute(query, args)
 
-        if self._commit:
-            self._connection.commit()
+            if self._commit:
+                self._connection.commit()
 
     def last_added_id(self):
         """return the last inserted ID by a query"""
         return self._cursor.lastrowid
 
+    def _explain(self, query: str, args: tuple):
+        """
+        Return the query plan of a statement
+        :param query: SQL query statement
+        :param args: Query arguments
+        :return: list of str plan steps
+        """
+
+        cursor = self._connection.cursor()
+
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {query}", args)
+            return [row[-1] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
     def close(self):
-        """Close current connection"""
+        """Close current cursor and release the connection to the pool"""
+
+        if self._connection is None:
+            return
+
         self._cursor.close()
-        self._connection.close()
+
+        if self._pool is None:
+            self._connection.close()
+        else:
+            self._pool.release(self._connection)
+            metrics.observe_pool("sqlite", self._pool.stats())
+
+        self._connection = None
+
+
+def get_pool():
+    """
+    Return the process connection pool, creating it on first use. A new pool is created after a fork, since
+    SQLite connections must not be shared between processes. Pooling is disabled if SQLITE_POOL_SIZE is 0.
+    :return: ConnectionPool or None
+    """
+
+    global _POOL, _POOL_PID
+
+    pid = os.getpid()
+
+    if _POOL is not None and _POOL_PID == pid:
+        return _POOL
+
+    size = int(CONFIG.get("SQLITE_POOL_SIZE", 5))
+
+    if size <= 0:
+        return None
+
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != pid:
+            _POOL = ConnectionPool(
+                factory=_connect,
+                max_size=size,
+                timeout=float(CONFIG.get("SQLITE_POOL_TIMEOUT", 30)),
+                reset=_reset,
+            )
+            _POOL_PID = pid
+
+    return _POOL
+
+
+def pool_stats():
+    """
+    Return SQLite connection pool metrics
+    :return: dict or None if pooling is disabled
+    """
+
+    pool = get_pool()
+
+    if pool is None:
+        return None
+
+    return pool.stats()
+
+
+def reset_pool():
+    """
+    Discard the pool so next usage creates a new one. Idle connections are closed only if they were opened by the
+    current process, connections inherited from a parent process are left to it.
+    """
+
+    global _POOL, _POOL_PID
+
+    with _POOL_LOCK:
+        pool, pid = _POOL, _POOL_PID
+        _POOL, _POOL_PID = None, None
+
+    if pool is not None and pid == os.getpid():
+        pool.close_all()
+
+
+def _connect():
+    """
+    Open a new connection to the configured database applying the configured pragmas
+    :return: sqlite3.Connection
+    """
+
+    connection = sqlite3.connect(
+        SQLite.database_path(),
+        check_same_thread=False,
+        cached_statements=int(CONFIG.get("SQLITE_CACHED_STATEMENTS", 256)),
+    )
+
+    for key, pragma in PRAGMAS.items():
+        if CONFIG.get(key) not in (None, ""):
+            connection.execute(f"PRAGMA {pragma} = {CONFIG[key]}")
+
+    return connection
+
+
+def _reset(connection: sqlite3.Connection):
+    """
+    Discard not committed changes before the connection is returned to the pool
+    :param connection: Pooled connection
+    """
+
+    if connection.in_transaction:
+        connection.rollback()
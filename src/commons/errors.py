@@ -50,6 +50,15 @@ class SchemaError(HandlerError):
         self.root_causes = [{"error": errors.args[0].split(":  ")[0]}]
 
 
+class MalformedBodyError(HandlerError):
+    """Request body that can not be parsed error"""
+
+    def __init__(self, errors=None, root_causes=None):
+        super().__init__(code=400, message="bad-request", errors=errors)
+        self.description = "Malformed JSON body"
+        self.root_causes = root_causes
+
+
 class InvalidPriceTypeError(HandlerError):
     """JSON Schema validation error"""
 
@@ -68,5 +77,27 @@ class DiscountFieldError(HandlerError):
         self.root_causes = root_causes
 
 
+class DuplicationError(HandlerError):
+    """Unique key violation on insert or update"""
+
+    def __init__(self, errors=None, root_causes=None):
+        super().__init__(code=409, message="duplicated-entity", errors=errors)
+        self.description = "The entity already exists"
+        self.root_causes = root_causes
+
+
+class CircuitOpenError(HandlerError):
+    """Service call rejected by an open circuit breaker"""
+
+    def __init__(self, errors=None, root_causes=None):
+        super().__init__(code=503, message="service-unavailable", errors=errors)
+        self.description = "Service temporarily unavailable"
+        self.root_causes = root_causes
+
+
 class ConfigurationError(Exception):
     """Configuration loading error"""
+
+
+class PoolTimeoutError(Exception):
+    """Connection pool checkout timeout error"""
@@ -1,3 +1,4 @@
 """Export resources"""
 
-from .http import json, json_error, response
+from .http import json, json_stream, ndjson_stream, json_error, response, not_modified, etag_for, etag_matches
+from .encoders import register_encoder, get_encoder
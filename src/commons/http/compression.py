@@ -0,0 +1,70 @@
+"""HTTP content encoding helpers"""
+
+import gzip
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+IDENTITY = "identity"
+
+SUPPORTED = (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+MAX_LEVEL = {GZIP: 9, BROTLI: 11}
+
+
+def compress(data: bytes, encoding: str, level: int = 6):
+    """
+    Compress data with a content encoding
+    :param data: Raw data
+    :param encoding: `gzip` or `br`
+    :param level: Compression level, from 1 to 9 for gzip and from 0 to 11 for brotli
+    :return: Compressed bytes
+    """
+
+    if encoding == GZIP:
+        return gzip.compress(data, compresslevel=level)
+
+    if encoding == BROTLI and brotli is not None:
+        return brotli.compress(data, quality=level)
+
+    raise ValueError(f"unsupported content encoding {encoding}")
+
+
+def negotiate(accept_encoding: str, available=SUPPORTED):
+    """
+    Choose the best content encoding accepted by the client, preferring the order of `available`
+    :param accept_encoding: Accept-Encoding header value
+    :param available: Encodings the server can produce
+    :return: Chosen encoding or IDENTITY
+    """
+
+    if not accept_encoding:
+        return IDENTITY
+
+    accepted = {}
+
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+
+        accepted[name.strip().lower()] = quality
+
+    best, best_quality = IDENTITY, 0.0
+
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
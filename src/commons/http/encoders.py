@@ -0,0 +1,147 @@
+"""JSON response encoders"""
+
+# pylint: disable=global-statement
+
+import decimal
+import json as jsonb
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from src.config import load, on_change
+
+CONFIG = load()
+
+_ENCODERS = {}
+_ACTIVE = None
+
+
+class StdlibEncoder:
+    """Encoder based on the standard library json module"""
+
+    name = "stdlib"
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        """
+        Serialize object as JSON
+        :param data: Data to be serialized
+        :return: JSON bytes
+        """
+
+        return jsonb.dumps(data, default=handle_extra_types).encode("utf-8")
+
+
+class OrjsonEncoder:
+    """
+    Encoder based on orjson. Datetimes and dataclasses are passed to `handle_extra_types`, so they are written as the
+    standard library encoder does. Unlike the standard library, NaN and Infinity floats are written as `null`, since
+    they are not valid JSON, and enums are written as their value. Data orjson can not serialize, like integers wider
+    than 64 bits, is serialized by the standard library encoder.
+    """
+
+    name = "orjson"
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+               if orjson is not None else 0)
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        """
+        Serialize object as JSON
+        :param data: Data to be serialized
+        :return: JSON bytes
+        """
+
+        try:
+            return orjson.dumps(data, default=handle_extra_types, option=OrjsonEncoder.options)
+        except orjson.JSONEncodeError:
+            return StdlibEncoder.dumps(data)
+
+
+def handle_extra_types(obj):
+    """
+    Serialize values of types not supported natively by the encoders
+    :param obj: Object data to serialize
+    :return: Serialized value
+    """
+
+    # Lambda will automatically serialize decimals so we need
+    # to support that as well.
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+
+    try:
+        return str(obj)
+    except Exception as err:
+        raise TypeError(
+            'Object of name %s is not JSON serializable' % obj.__class__.__name__
+        ) from err
+
+
+def register_encoder(encoder):
+    """
+    Register a new encoder, it must have a `name` attribute and a `dumps(data) -> bytes` method
+    :param encoder: Encoder class or instance
+    :return: Registered encoder
+    """
+
+    global _ACTIVE
+
+    _ENCODERS[encoder.name] = encoder
+    _ACTIVE = None
+
+    return encoder
+
+
+def get_encoder():
+    """
+    Return the encoder selected by HTTP_JSON_ENCODER. `auto` uses orjson when it is installed and the standard
+    library otherwise.
+    :return: Encoder
+    """
+
+    global _ACTIVE
+
+    if _ACTIVE is not None:
+        return _ACTIVE
+
+    name = str(CONFIG.get("HTTP_JSON_ENCODER", "auto")).lower()
+
+    if name == "auto":
+        name = OrjsonEncoder.name if OrjsonEncoder.name in _ENCODERS else StdlibEncoder.name
+
+    _ACTIVE = _ENCODERS.get(name, _ENCODERS[StdlibEncoder.name])
+
+    return _ACTIVE
+
+
+@on_change
+def _on_config_change(changed: set, config: dict):
+    """
+    Select the encoder again if HTTP_JSON_ENCODER changed
+    :param changed: Changed configuration keys
+    :param config: Current configuration
+    """
+
+    global _ACTIVE
+
+    if "HTTP_JSON_ENCODER" in changed:
+        _ACTIVE = None
+
+
+def dumps(data) -> bytes:
+    """
+    Serialize object as JSON with the active encoder
+    :param data: Data to be serialized
+    :return: JSON bytes
+    """
+
+    return get_encoder().dumps(data)
+
+
+register_encoder(StdlibEncoder)
+
+if orjson is not None:
+    register_encoder(OrjsonEncoder)
@@ -1,25 +1,39 @@
 """Http common functions"""
 
 import http.client
-import decimal
-import json as jsonb
+import hashlib
+import logging
+import random
+import time
 
-from flask import Response
+from flask import Response, g, has_app_context, has_request_context, request, stream_with_context
 
 from src.commons.errors import HandlerError
 from src.commons.logging import logger
 from src.config import load
+from . import encoders, compression
 
 CONFIG = load()
 
 
-def json(code: int = 200, body: dict = None, error=None, headers: dict = None):
+def json(
+    code: int = 200,
+    body: dict = None,
+    error=None,
+    headers: dict = None,
+    etag: bool = False,
+    version: str = None,
+    cache_control: str = None,
+):
     """
     Http JSON lambda response
     :param code: Http response code
     :param body: Response json body
     :param error: Possible error on response body
     :param headers: Response headers
+    :param etag: Add an ETag built from a hash of the serialized body and answer 304 if the client already has it
+    :param version: Resource version token used as ETag instead of the body hash
+    :param cache_control: Cache-Control header of conditional responses, defaults to HTTP_CACHE_CONTROL
     :return: Chalice response
     """
 
@@ -35,16 +49,117 @@ def json(code: int = 200, body: dict = None, error=None, headers: dict = None):
         body["message"] = error_message
         body["root_causes"] = root_causes
 
-    logger.field("res", body)
+    conditional = error is None and 200 <= code < 300 and (etag or version is not None)
 
-    if "error" in body and body["error"] is not None:
-        logger.error("handled request", error=body["error"])
-    else:
-        logger.info("handled request")
+    if conditional and version is not None:
+        not_modified_res = not_modified(version=version, cache_control=cache_control, headers=headers)
+
+        if not_modified_res is not None:
+            return not_modified_res
+
+    serialized = _build_json(body)
+
+    if conditional and version is None:
+        not_modified_res = not_modified(body=serialized, cache_control=cache_control, headers=headers)
+
+        if not_modified_res is not None:
+            return not_modified_res
+
+    _log_response(body, serialized)
 
     headers["Content-Type"] = "application/json"
 
-    return response(code=code, body=_build_json(body), headers=headers)
+    return response(code=code, body=serialized, headers=headers)
+
+
+def not_modified(version: str = None, body: bytes = None, cache_control: str = None, headers: dict = None):
+    """
+    Answer a conditional GET or HEAD. Handlers can call it with a cheap version token of the resource before building
+    the response body, and return its response when it is not None. Other methods are never answered with 304.
+    :param version: Resource version token
+    :param body: Serialized body, used to build the ETag if there is no version
+    :param cache_control: Cache-Control header, defaults to HTTP_CACHE_CONTROL
+    :param headers: Response headers, ETag and Cache-Control are added to them
+    :return: 304 response if the client copy is still valid, None otherwise
+    """
+
+    tag = etag_for(version=version, body=body)
+    validators = {
+        "ETag": f'"{tag}"',
+        "Cache-Control": cache_control or CONFIG.get("HTTP_CACHE_CONTROL", "no-cache"),
+    }
+
+    if headers is not None:
+        headers.update(validators)
+
+    if not has_request_context() or request.method not in ("GET", "HEAD") or not etag_matches(tag):
+        return None
+
+    logger.field("etag", tag).debug("not modified")
+
+    if headers is not None and "Vary" in headers:
+        validators["Vary"] = headers["Vary"]
+
+    return response(code=304, headers=validators)
+
+
+def etag_for(version: str = None, body: bytes = None):
+    """
+    Build an ETag value from a version token or a serialized body
+    :param version: Resource version token
+    :param body: Serialized body
+    :return: str ETag without quotes
+    """
+
+    data = str(version).encode("utf-8") if version is not None else body
+
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def etag_matches(tag: str):
+    """
+    Check if the request If-None-Match header contains an ETag, also in its compressed representations
+    :param tag: ETag without quotes
+    :return: bool
+    """
+
+    if_none_match = request.if_none_match
+
+    if not if_none_match:
+        return False
+
+    if if_none_match.contains_weak(tag):
+        return True
+
+    return any(if_none_match.contains_weak(f"{tag}-{encoding}") for encoding in compression.SUPPORTED)
+
+
+def json_stream(records, code: int = 200, headers: dict = None):
+    """
+    Http JSON array response serialized record by record while it is being sent with chunked transfer encoding.
+    If iterating the records fails once the response started, the error is logged and appended as the last array
+    element with the same format of `json_error` bodies, so the body is still valid JSON.
+    :param records: Iterable of serializable records, like the generator returned by `Mongo.stream`
+    :param code: Http response code
+    :param headers: Response headers
+    :return: Flask streamed response
+    """
+
+    return _stream(_iter_json_array(records), "application/json", code, headers)
+
+
+def ndjson_stream(records, code: int = 200, headers: dict = None):
+    """
+    Http newline delimited JSON response serialized record by record while it is being sent with chunked transfer
+    encoding. If iterating the records fails once the response started, the error is logged and sent as the last line
+    with the same format of `json_error` bodies.
+    :param records: Iterable of serializable records
+    :param code: Http response code
+    :param headers: Response headers
+    :return: Flask streamed response
+    """
+
+    return _stream(_iter_ndjson(records), "application/x-ndjson", code, headers)
 
 
 def json_error(error, headers: dict = None):
@@ -63,7 +178,7 @@ def json_error(error, headers: dict = None):
     return json(code=500, error=error, headers=headers)
 
 
-def response(code: int = 200, body: (str, dict) = None, headers: dict = None):
+def response(code: int = 200, body: (str, bytes, dict) = None, headers: dict = None):
     """
     Http lambda response formatting
     :param code: Http response code
@@ -123,31 +238,158 @@ def _process_error(status_code, error):
     return code, message, root_causes
 
 
-def _handle_extra_types(obj):
+def _log_response(body: dict, serialized: bytes):
+    """
+    Log handled request with its response body. Errors are always logged, successful responses are sampled with
+    LOG_RESPONSE_SAMPLE_RATE and bodies bigger than LOG_RESPONSE_MAX_BYTES are truncated. Both settings can be
+    overridden per route with the `log_response` middleware.
+    :param body: Response body
+    :param serialized: Serialized response body
+    """
+
+    is_error = "error" in body and body["error"] is not None
+    level = logging.ERROR if is_error else logging.INFO
+
+    if not logger.logger.isEnabledFor(level):
+        return
+
+    options = g.get("response_log", None) if has_app_context() else None
+    options = options or {}
+
+    if not is_error:
+        sample_rate = options.get("sample_rate", None)
+
+        if sample_rate is None:
+            sample_rate = float(CONFIG.get("LOG_RESPONSE_SAMPLE_RATE", 1))
+
+        if sample_rate < 1 and random.random() >= sample_rate:
+            return
+
+    max_bytes = options.get("max_bytes", None)
+
+    if max_bytes is None:
+        max_bytes = int(CONFIG.get("LOG_RESPONSE_MAX_BYTES", 0))
+
+    # The already encoded body is logged as text, so the logger does not serialize the response again
+    if 0 < max_bytes < len(serialized):
+        truncated = serialized[:max_bytes].decode("utf-8", errors="ignore")
+        logger.field("res_truncated", f"{truncated}...[truncated {len(serialized) - max_bytes} bytes]")
+    else:
+        logger.field("res", serialized.decode("utf-8", errors="replace"))
+
+    if is_error:
+        logger.error("handled request", error=body["error"])
+    else:
+        logger.info("handled request")
+
+
+def _stream(chunks, content_type: str, code: int, headers: dict = None):
+    """
+    Build a streamed response. The body is generated in the request context, so handlers can still use `request`
+    and `g` lazily and logs keep the request trace_id until the stream ends.
+    :param chunks: Generator of body bytes
+    :param content_type: Response content type
+    :param code: Http response code
+    :param headers: Response headers
+    :return: Flask streamed response
+    """
+
+    if not headers:
+        headers = {}
+
+    headers["Content-Type"] = content_type
+    headers["X-Accel-Buffering"] = "no"
+
+    logger.field("status", code).info("streaming request")
+
+    body = _buffer(chunks)
+
+    if has_request_context():
+        body = stream_with_context(body)
+
+    return response(code=code, body=body, headers=headers)
+
+
+def _iter_json_array(records):
     """
-    Monkey patch function to support json serialization response of not known types by Chalice Response object
-    :param obj: Object data to serialize
-    :return: Serialized value
+    Serialize an iterable as JSON array chunks
+    :param records: Iterable of serializable records
+    :return: Generator of JSON bytes
     """
 
-    # Lambda will automatically serialize decimals so we need
-    # to support that as well.
-    if isinstance(obj, decimal.Decimal):
-        return float(obj)
+    separator = b"["
+
+    for item in _iter_records(records):
+        yield separator + item
+        separator = b","
+
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def _iter_ndjson(records):
+    """
+    Serialize an iterable as newline delimited JSON
+    :param records: Iterable of serializable records
+    :return: Generator of JSON lines bytes
+    """
+
+    for item in _iter_records(records):
+        yield item + b"\n"
+
+
+def _iter_records(records):
+    """
+    Serialize records one by one, turning a failure while iterating into a final error record
+    :param records: Iterable of serializable records
+    :return: Generator of JSON bytes
+    """
 
     try:
-        return str(obj)
+        for record in records:
+            yield _build_json(record)
     except Exception as err:
-        raise TypeError(
-            'Object of name %s is not JSON serializable' % obj.__class__.__name__
-        ) from err
+        code = err.get_code() if isinstance(err, HandlerError) else 500
+        error_code, error_message, root_causes = _process_error(code, err)
+
+        logger.err(err).error("streaming request failed", error=error_code)
+
+        yield _build_json({"error": error_code, "message": error_message, "root_causes": root_causes})
+
+
+def _buffer(chunks):
+    """
+    Join small chunks to avoid one write per record. The first chunk is sent as soon as it is generated, next ones
+    are joined until they reach HTTP_STREAM_CHUNK_SIZE bytes or HTTP_STREAM_FLUSH_INTERVAL seconds passed since the
+    last write.
+    :param chunks: Generator of bytes
+    :return: Generator of bytes
+    """
+
+    size = int(CONFIG.get("HTTP_STREAM_CHUNK_SIZE", 8192))
+    interval = float(CONFIG.get("HTTP_STREAM_FLUSH_INTERVAL", 0.1))
+    buffer = []
+    buffered = 0
+    flushed_at = None
+
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+
+        if flushed_at is None or buffered >= size or time.monotonic() - flushed_at >= interval:
+            yield b"".join(buffer)
+            buffer = []
+            buffered = 0
+            flushed_at = time.monotonic()
+
+    if buffer:
+        yield b"".join(buffer)
 
 
 def _build_json(data):
     """
-    Serialize object as JSON string
+    Serialize object as JSON with the configured encoder
     :param data: Data to be serialized
-    :return: JSON string
+    :return: JSON bytes
     """
 
-    return jsonb.dumps(data, default=_handle_extra_types)
+    return encoders.dumps(data)
@@ -1,3 +1,3 @@
 """Export resources"""
 
-from .logging import config_logs, LOGGER as logger
+from .logging import config_logs, LOGGER as logger, SHIPPER as shipper
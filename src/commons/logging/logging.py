@@ -3,7 +3,9 @@
 import logging
 
 from elasticlogger import Logger
-from src.config import load
+import src.commons.context as context
+from src.config import load, load_stats
+from .shipper import ElasticShipper
 
 CONFIG = load()
 
@@ -21,14 +23,53 @@ else:
     else:
         LEVEL = logging.INFO
 
+
+class ContextFilter(logging.Filter):
+    """
+    Add the trace_id of the current context scope to log records. It is read when the record is emitted, so
+    concurrent requests of a worker log their own trace_id instead of sharing the logger global context.
+    """
+
+    def filter(self, record: logging.LogRecord):
+        """
+        Set the record trace_id
+        :param record: Log record
+        :return: bool, records are never filtered out
+        """
+
+        trace_id = context.get_value("trace_id")
+
+        if trace_id is not None:
+            record.trace_id = trace_id
+
+        return True
+
+
 LOGGER = Logger(CONFIG["APP_NAME"], level=LEVEL)
+LOGGER.logger.addFilter(ContextFilter())
+
+SHIPPER = None
 
 if "ELASTIC_URL" in CONFIG and "ELASTIC_INDEX" in CONFIG:
-    LOGGER.enable_elastic(url=CONFIG["ELASTIC_URL"], index=CONFIG["ELASTIC_INDEX"])
+    if str(CONFIG.get("ELASTIC_ASYNC", "false")).lower() == "true":
+        SHIPPER = ElasticShipper(
+            url=CONFIG["ELASTIC_URL"],
+            index=CONFIG["ELASTIC_INDEX"],
+            queue_size=int(CONFIG.get("ELASTIC_QUEUE_SIZE", 10000)),
+            batch_size=int(CONFIG.get("ELASTIC_BATCH_SIZE", 500)),
+            flush_interval=float(CONFIG.get("ELASTIC_FLUSH_INTERVAL", 2)),
+            block=str(CONFIG.get("ELASTIC_QUEUE_FULL", "drop")).lower() == "block",
+            level=LEVEL,
+        )
+        LOGGER.logger.addHandler(SHIPPER)
+    else:
+        LOGGER.enable_elastic(url=CONFIG["ELASTIC_URL"], index=CONFIG["ELASTIC_INDEX"])
 
 if "SENTRY_URL" in CONFIG:
     LOGGER.enable_sentry(url=CONFIG["SENTRY_URL"], level=LEVEL)
 
+LOGGER.fields(load_stats()).debug("configuration loaded")
+
 
 def config_logs():
     """Bootstrap logger configuration options"""
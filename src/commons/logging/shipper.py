@@ -0,0 +1,285 @@
+"""Asynchronous Elasticsearch log shipping"""
+
+import atexit
+import datetime
+import json
+import logging
+import queue
+import threading
+import time
+
+import requests
+
+RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({})).keys()) | {"message", "asctime"}
+
+
+class ElasticShipper(logging.Handler):
+    """
+    Logging handler that queues records in memory and sends them in background to Elasticsearch with the bulk API,
+    so logging never waits for the indexing of a record.
+    :param url: Elasticsearch base url
+    :param index: Index name
+    :param queue_size: Max queued records
+    :param batch_size: Records sent on each bulk request
+    :param flush_interval: Max seconds a record waits in the queue before being sent
+    :param block: If true, wait block_timeout seconds for space on a full queue instead of dropping the record
+    :param block_timeout: Seconds to wait for space on a full queue when blocking
+    :param timeout: Seconds for bulk requests
+    :param level: Min logging level of shipped records
+    """
+
+    def __init__(
+        self,
+        url: str,
+        index: str,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        block: bool = False,
+        block_timeout: float = 1.0,
+        timeout: float = 10.0,
+        level: int = logging.NOTSET,
+    ):
+        super().__init__(level=level)
+
+        self.url = f"{url.rstrip('/')}/_bulk"
+        self.index = index
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block = block
+        self.block_timeout = block_timeout
+        self.timeout = timeout
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._session = requests.Session()
+        self._stats_lock = threading.Lock()
+        self._stats = {"queued": 0, "sent": 0, "dropped": 0, "failed": 0, "requests": 0}
+        self._closed = False
+        self._worker = None
+
+        self.start()
+        atexit.register(self.close)
+
+    def start(self):
+        """Start background worker if it is not running, for example after a fork"""
+
+        if self._worker is not None and self._worker.is_alive():
+            return
+
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="elastic-shipper", daemon=True)
+        self._worker.start()
+
+    def after_fork(self):
+        """
+        Prepare the handler in a forked child: records queued by the parent are dropped, since the parent ships them,
+        the HTTP session is replaced to not share its sockets and the background worker is started again
+        """
+
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._session = requests.Session()
+        self._stats_lock = threading.Lock()
+        self._worker = None
+
+        self.start()
+
+    def emit(self, record: logging.LogRecord):
+        """
+        Queue a log record
+        :param record: Log record
+        """
+
+        if self._closed:
+            return
+
+        try:
+            document = self._build_document(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        try:
+            if self.block:
+                self._queue.put(document, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(document)
+        except queue.Full:
+            self._count("dropped")
+            return
+
+        self._count("queued")
+
+    def flush(self, timeout: float = None):
+        """
+        Wait until all queued records are sent
+        :param timeout: Max seconds to wait
+        :return: bool, true if the queue was drained
+        """
+
+        if self._worker is None or not self._worker.is_alive():
+            return self._queue.empty()
+
+        done = threading.Event()
+
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+
+        return done.wait(timeout)
+
+    def close(self):
+        """
+        Send pending records and stop background worker. It waits at most timeout + flush_interval seconds, records
+        that could not be sent by then are lost, so an unreachable Elasticsearch never hangs the interpreter exit.
+        """
+
+        if self._closed:
+            return
+
+        self._closed = True
+
+        if self._worker is not None and self._worker.is_alive():
+            deadline = time.monotonic() + self.timeout + self.flush_interval
+
+            try:
+                self._queue.put(None, timeout=self.timeout + self.flush_interval)
+            except queue.Full:
+                # The worker is still sending a full queue, it is a daemon thread, so it does not delay the exit
+                pass
+            else:
+                self._worker.join(max(deadline - time.monotonic(), 0))
+
+        super().close()
+
+    def stats(self):
+        """
+        Return shipping counters
+        :return: dict with queued, sent, dropped, failed and pending records and bulk requests
+        """
+
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        stats["pending"] = self._queue.qsize()
+
+        return stats
+
+    def _run(self):
+        """
+        Worker loop, collects batches until batch size or flush interval is reached. The interval is counted from the
+        first buffered record, so a partial batch is sent on time even if records keep arriving.
+        """
+
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+
+            if isinstance(item, dict):
+                batch.append(item)
+
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+                if len(batch) < self.batch_size and time.monotonic() < deadline:
+                    continue
+
+            self._send(batch)
+            batch = []
+            deadline = None
+
+            if isinstance(item, threading.Event):
+                item.set()
+
+            if item is None:
+                return
+
+    def _send(self, batch: list):
+        """
+        Send a batch of documents with the bulk API
+        :param batch: List of documents
+        """
+
+        if not batch:
+            return
+
+        action = json.dumps({"index": {"_index": self.index}})
+        lines = []
+
+        for document in batch:
+            lines.append(action)
+            lines.append(json.dumps(document, default=str))
+
+        body = "\n".join(lines) + "\n"
+
+        try:
+            res = self._session.post(
+                self.url,
+                data=body.encode("utf-8"),
+                headers={"Content-Type": "application/x-ndjson"},
+                timeout=self.timeout,
+            )
+            res.raise_for_status()
+            failed = _failed_items(res)
+        except Exception:
+            failed = len(batch)
+
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["sent"] += len(batch) - failed
+            self._stats["failed"] += failed
+
+    def _build_document(self, record: logging.LogRecord):
+        """
+        Transform a log record into an Elasticsearch document
+        :param record: Log record
+        :return: dict document
+        """
+
+        document = {
+            key: value
+            for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES and not key.startswith("_")
+        }
+
+        document.update({
+            "@timestamp": datetime.datetime.utcfromtimestamp(record.created).isoformat() + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        })
+
+        if record.exc_info:
+            document["exception"] = logging.Formatter().formatException(record.exc_info)
+
+        return document
+
+    def _count(self, counter: str):
+        """
+        Increment a stats counter
+        :param counter: Counter name
+        """
+
+        with self._stats_lock:
+            self._stats[counter] += 1
+
+
+def _failed_items(res: requests.Response):
+    """
+    Count items rejected in a bulk response
+    :param res: Bulk API response
+    :return: int
+    """
+
+    data = res.json()
+
+    if not data.get("errors", False):
+        return 0
+
+    return sum(1 for item in data.get("items", []) if item.get("index", {}).get("status", 200) >= 300)
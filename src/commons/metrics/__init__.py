@@ -0,0 +1,3 @@
+"""Export resources"""
+
+from .metrics import setup_metrics, timed, observe_pool, observe_cache, observe_compression, render, mark_process_dead, CONTENT_TYPE
@@ -0,0 +1,204 @@
+"""Prometheus metrics
+
+When the app runs with several gunicorn workers, set the PROMETHEUS_MULTIPROC_DIR env var to an empty directory before
+starting the server, so every worker writes its samples there and `render` aggregates all of them.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from flask import Flask, g, request
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+from prometheus_client import CONTENT_TYPE_LATEST as CONTENT_TYPE
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by endpoint",
+    ["endpoint", "method", "status"],
+)
+
+DEPENDENCY_LATENCY = Histogram(
+    "dependency_duration_seconds",
+    "Latency of calls to databases and external services",
+    ["dependency", "operation"],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+
+DEPENDENCY_ERRORS = Counter(
+    "dependency_errors_total",
+    "Failed calls to databases and external services",
+    ["dependency", "operation"],
+)
+
+RESPONSE_CACHE_EVENTS = Counter(
+    "response_cache_events_total",
+    "Response cache lookups by result (hit, stale or miss), stored responses and cache errors",
+    ["endpoint", "event"],
+)
+
+RESPONSE_CACHE_LATENCY = Histogram(
+    "response_cache_duration_seconds",
+    "Latency of cached routes by response cache result",
+    ["endpoint", "result"],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+
+COMPRESSED_RESPONSES = Counter(
+    "http_compressed_responses_total",
+    "Responses eligible for compression by negotiated content encoding, identity when sent uncompressed",
+    ["encoding"],
+)
+
+COMPRESSION_INPUT_BYTES = Counter(
+    "http_compression_input_bytes_total",
+    "Bytes of response bodies before compression",
+    ["encoding"],
+)
+
+COMPRESSION_OUTPUT_BYTES = Counter(
+    "http_compression_output_bytes_total",
+    "Bytes of response bodies after compression",
+    ["encoding"],
+)
+
+COMPRESSION_SECONDS = Counter(
+    "http_compression_seconds_total",
+    "Seconds spent compressing response bodies",
+    ["encoding"],
+)
+
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Connections of database pools by state, summed over live workers",
+    ["pool", "state"],
+    multiprocess_mode="livesum",
+)
+
+POOL_MAX_CONNECTIONS = Gauge(
+    "db_pool_max_connections",
+    "Max connections of database pools, summed over live workers",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+
+def setup_metrics(app: Flask):
+    """
+    Measure latency of every request by its blueprint endpoint
+    :param app: Flask base application
+    """
+
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+
+
+@contextmanager
+def timed(dependency: str, operation: str):
+    """
+    Measure the latency of a dependency call, failed calls are also counted as errors
+    :param dependency: Dependency name like sqlite, postgres, mongo, redis or the called service name
+    :param operation: Executed operation
+    """
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    except Exception:
+        DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+        raise
+    finally:
+        DEPENDENCY_LATENCY.labels(dependency, operation).observe(time.perf_counter() - start)
+
+
+def observe_pool(pool: str, stats: dict):
+    """
+    Publish connection pool utilization, drivers call it when connections are borrowed and returned
+    :param pool: Pool name like postgres or sqlite
+    :param stats: ConnectionPool.stats() result
+    """
+
+    POOL_CONNECTIONS.labels(pool, "idle").set(stats["idle"])
+    POOL_CONNECTIONS.labels(pool, "in_use").set(stats["in_use"])
+    POOL_MAX_CONNECTIONS.labels(pool).set(stats["max_size"])
+
+
+def observe_cache(endpoint: str, event: str, elapsed: float = None):
+    """
+    Count a response cache event, lookups also record the latency of the request by their result
+    :param endpoint: Cached route endpoint
+    :param event: hit, stale, miss, store or error
+    :param elapsed: Seconds spent answering the request, only for lookups
+    """
+
+    RESPONSE_CACHE_EVENTS.labels(endpoint, event).inc()
+
+    if elapsed is not None:
+        RESPONSE_CACHE_LATENCY.labels(endpoint, event).observe(elapsed)
+
+
+def observe_compression(encoding: str, bytes_in: int = 0, bytes_out: int = 0, elapsed: float = 0.0):
+    """
+    Count a response eligible for compression, with the size of its body before and after being compressed
+    :param encoding: Negotiated content encoding, identity if the body was not compressed
+    :param bytes_in: Body bytes before compression
+    :param bytes_out: Body bytes after compression
+    :param elapsed: Seconds spent compressing
+    """
+
+    COMPRESSED_RESPONSES.labels(encoding).inc()
+
+    if bytes_in:
+        COMPRESSION_INPUT_BYTES.labels(encoding).inc(bytes_in)
+        COMPRESSION_OUTPUT_BYTES.labels(encoding).inc(bytes_out)
+        COMPRESSION_SECONDS.labels(encoding).inc(elapsed)
+
+
+def render():
+    """
+    Render collected metrics in Prometheus text format, aggregating all workers in multiprocess mode
+    :return: bytes
+    """
+
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+
+    return generate_latest(registry)
+
+
+def mark_process_dead(pid: int):
+    """
+    Clean up live samples of a finished worker in multiprocess mode
+    :param pid: Worker process ID
+    """
+
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+def _start_timer():
+    """Store request start time"""
+    g.metrics_start = time.perf_counter()
+
+
+def _observe_request(res):
+    """
+    Record request latency
+    :param res: Flask response
+    :return: Flask response
+    """
+
+    start = g.pop("metrics_start", None)
+
+    if start is not None:
+        REQUEST_LATENCY.labels(
+            request.endpoint or "unmatched",
+            request.method,
+            str(res.status_code),
+        ).observe(time.perf_counter() - start)
+
+    return res
@@ -0,0 +1,3 @@
+"""Export resources"""
+
+from .pool import ConnectionPool
@@ -0,0 +1,223 @@
+"""Generic thread safe connection pool"""
+
+import threading
+import time
+
+from src.commons.errors import PoolTimeoutError
+
+
+class ConnectionPool:
+    """
+    Bounded LIFO pool of reusable connections. Works for threads and for gevent greenlets once threading is
+    monkey patched by the gevent worker.
+    :param factory: Callable that opens a new connection
+    :param max_size: Max number of open connections, 0 means unbounded
+    :param min_size: Connections opened when the pool is filled
+    :param timeout: Seconds to wait for a free connection before raising PoolTimeoutError, None waits forever
+    :param check: Callable that receives a connection and returns False if it is not usable anymore
+    :param reset: Callable executed with a connection before returning it to the pool
+    :param close: Callable that closes a connection, defaults to connection.close()
+    """
+
+    def __init__(
+        self,
+        factory,
+        max_size: int = 5,
+        min_size: int = 0,
+        timeout: float = None,
+        check=None,
+        reset=None,
+        close=None,
+    ):
+        self._factory = factory
+        self._check = check
+        self._reset = reset
+        self._close = close if close is not None else lambda conn: conn.close()
+
+        self.max_size = max_size
+        self.min_size = min_size
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "reused": 0,
+            "unhealthy": 0,
+            "waits": 0,
+            "timeouts": 0,
+        }
+
+    def fill(self):
+        """Open connections until min_size idle connections are available"""
+
+        while True:
+            with self._condition:
+                if self._size >= self.min_size:
+                    return
+
+                self._size += 1
+
+            # One slot is reserved at a time, so a failed connection only gives back its own slot
+            self.release(self._create())
+
+    def acquire(self):
+        """
+        Borrow a connection from the pool, opening a new one if there is room for it
+        :return: Connection
+        :raise: PoolTimeoutError if no connection gets free before timeout
+        """
+
+        conn = self._take()
+
+        if conn is None:
+            return self._create()
+
+        if self._check is not None and not self._is_healthy(conn):
+            self._close_quietly(conn)
+
+            with self._condition:
+                self._stats["unhealthy"] += 1
+
+            return self._create()
+
+        with self._condition:
+            self._stats["reused"] += 1
+
+        return conn
+
+    def release(self, conn, discard: bool = False):
+        """
+        Return a borrowed connection to the pool
+        :param conn: Connection to return
+        :param discard: Close the connection instead of keeping it
+        """
+
+        if not discard and self._reset is not None:
+            try:
+                self._reset(conn)
+            except Exception:
+                discard = True
+
+        if not discard:
+            with self._condition:
+                if not self._closed:
+                    self._idle.append(conn)
+                    self._condition.notify()
+                    return
+
+        self._discard(conn)
+
+    def close_all(self):
+        """Close all idle connections, borrowed ones will be closed when released"""
+
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """
+        Return pool utilization metrics
+        :return: dict with pool counters and current size
+        """
+
+        with self._condition:
+            stats = dict(self._stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._size - len(self._idle)
+            stats["max_size"] = self.max_size
+
+        return stats
+
+    def _take(self):
+        """
+        Get an idle connection or reserve room for a new one
+        :return: Idle connection or None if a new one must be created
+        """
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        with self._condition:
+            self._stats["checkouts"] += 1
+
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+
+                if not self.max_size or self._size < self.max_size:
+                    self._size += 1
+                    return None
+
+                self._stats["waits"] += 1
+                remaining = None if deadline is None else deadline - time.monotonic()
+
+                if remaining is not None and remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(f"no connection available after {self.timeout} seconds")
+
+                self._condition.wait(remaining)
+
+    def _create(self):
+        """
+        Open a new connection on a reserved slot
+        :return: Connection
+        """
+
+        try:
+            conn = self._factory()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._stats["created"] += 1
+
+        return conn
+
+    def _discard(self, conn):
+        """
+        Close a connection and free its slot
+        :param conn: Connection to close
+        """
+
+        self._close_quietly(conn)
+
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _close_quietly(self, conn):
+        """
+        Close a connection ignoring errors, the slot remains reserved
+        :param conn: Connection to close
+        """
+
+        try:
+            self._close(conn)
+        except Exception:
+            pass
+
+        with self._condition:
+            self._stats["closed"] += 1
+
+    def _is_healthy(self, conn):
+        """
+        Execute health check over a connection
+        :param conn: Connection to check
+        :return: bool
+        """
+
+        try:
+            return bool(self._check(conn))
+        except Exception:
+            return False
@@ -0,0 +1,3 @@
+"""Export resources"""
+
+from .querylog import timed, normalize, query_stats, reset_stats
@@ -0,0 +1,230 @@
+"""SQL statements timing, slow query log and aggregated statistics by statement shape"""
+
+# pylint: disable=global-statement
+
+import functools
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from src.commons.logging import logger
+from src.config import load
+
+CONFIG = load()
+
+_STATS = {}
+_STATS_LOCK = threading.Lock()
+_DROPPED = 0
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|%\(\w+\)s|(?<!:):\w+|\$\d+|\?")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with", "replace")
+
+
+@contextmanager
+def timed(driver: str, statement: str, explain=None):
+    """
+    Measure a statement execution and aggregate it by its normalized shape. Statements slower than SLOW_QUERY_MS
+    milliseconds are logged, with their query plan if SLOW_QUERY_EXPLAIN is enabled. Failed statements, like the
+    ones that time out or wait for a lock, are measured and counted as errors too.
+    :param driver: Driver name like sqlite or postgres
+    :param statement: Executed SQL statement
+    :param explain: Function that returns the statement query plan as a list of str
+    """
+
+    start = time.perf_counter()
+    failed = False
+
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        _observe(driver, statement, explain, (time.perf_counter() - start) * 1000, failed)
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize(statement: str):
+    """
+    Reduce a statement to its shape replacing literals and placeholders by `?`, so executions of the same query
+    with different values are aggregated together
+    :param statement: SQL statement
+    :return: str normalized statement
+    """
+
+    shape = _STRINGS.sub("?", statement)
+    shape = _PLACEHOLDERS.sub("?", shape)
+    shape = _NUMBERS.sub("?", shape)
+    shape = _LISTS.sub("(?)", shape)
+
+    return _SPACES.sub(" ", shape).strip()
+
+
+def query_stats(order_by: str = "total_ms", limit: int = 50):
+    """
+    Return aggregated statistics of the executed statements
+    :param order_by: Sort field, one of count, total_ms, max_ms, avg_ms, slow or errors
+    :param limit: Max statements to return
+    :return: dict with the statements list and the number of shapes not tracked because the table was full
+    """
+
+    with _STATS_LOCK:
+        statements = [
+            {
+                "driver": driver,
+                "statement": shape,
+                "count": entry["count"],
+                "slow": entry["slow"],
+                "errors": entry["errors"],
+                "total_ms": round(entry["total_ms"], 3),
+                "max_ms": round(entry["max_ms"], 3),
+                "avg_ms": round(entry["total_ms"] / entry["count"], 3),
+                "query_plan": entry["query_plan"],
+            }
+            for (driver, shape), entry in _STATS.items()
+        ]
+        dropped = _DROPPED
+
+    statements.sort(key=lambda item: item[order_by], reverse=True)
+
+    return {"statements": statements[:limit], "dropped": dropped}
+
+
+def reset_stats():
+    """Discard all aggregated statistics"""
+
+    global _DROPPED
+
+    with _STATS_LOCK:
+        _STATS.clear()
+        _DROPPED = 0
+
+
+def _observe(driver: str, statement: str, explain, elapsed: float, failed: bool):
+    """
+    Aggregate a measured execution and log it if it is slow. Plans of failed statements are not captured, since
+    their connection can be unusable until the transaction is rolled back.
+    :param driver: Driver name
+    :param statement: Executed SQL statement
+    :param explain: Function that returns the statement query plan or None
+    :param elapsed: Execution time in milliseconds
+    :param failed: Whether the statement raised an error
+    """
+
+    if str(CONFIG.get("QUERY_LOG", "true")).lower() != "true":
+        return
+
+    shape = normalize(statement)
+    slow = elapsed >= float(CONFIG.get("SLOW_QUERY_MS", 100))
+    entry = _record(driver, shape, elapsed, slow, failed)
+
+    if not slow:
+        return
+
+    plan = None
+
+    if explain is not None and not failed and _should_explain(shape, entry):
+        plan = _capture_plan(entry, explain)
+
+    logger.fields({
+        "driver": driver,
+        "statement": shape,
+        "elapsed_ms": round(elapsed, 3),
+        "failed": failed,
+        "query_plan": plan,
+    }).info("slow query")
+
+
+def _record(driver: str, shape: str, elapsed: float, slow: bool, failed: bool = False):
+    """
+    Aggregate one execution, new shapes are ignored when QUERY_LOG_MAX_STATEMENTS are already tracked
+    :param driver: Driver name
+    :param shape: Normalized statement
+    :param elapsed: Execution time in milliseconds
+    :param slow: Whether the execution exceeded the slow query threshold
+    :param failed: Whether the statement raised an error
+    :return: dict aggregated entry or None if it is not tracked
+    """
+
+    global _DROPPED
+
+    key = (driver, shape)
+
+    with _STATS_LOCK:
+        entry = _STATS.get(key, None)
+
+        if entry is None:
+            if len(_STATS) >= int(CONFIG.get("QUERY_LOG_MAX_STATEMENTS", 500)):
+                _DROPPED += 1
+                return None
+
+            entry = _STATS[key] = {
+                "count": 0,
+                "slow": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "query_plan": None,
+                "explained_at": None,
+            }
+
+        entry["count"] += 1
+        entry["total_ms"] += elapsed
+        entry["max_ms"] = max(entry["max_ms"], elapsed)
+
+        if slow:
+            entry["slow"] += 1
+
+        if failed:
+            entry["errors"] += 1
+
+    return entry
+
+
+def _should_explain(shape: str, entry: dict):
+    """
+    Check if the plan of a slow statement has to be captured. Plans are refreshed at most every
+    SLOW_QUERY_EXPLAIN_INTERVAL seconds per statement shape.
+    :param shape: Normalized statement
+    :param entry: Aggregated entry
+    :return: bool
+    """
+
+    if str(CONFIG.get("SLOW_QUERY_EXPLAIN", "false")).lower() != "true":
+        return False
+
+    if not shape.lower().startswith(_EXPLAINABLE):
+        return False
+
+    if entry is None or entry["explained_at"] is None:
+        return True
+
+    return time.monotonic() - entry["explained_at"] >= float(CONFIG.get("SLOW_QUERY_EXPLAIN_INTERVAL", 300))
+
+
+def _capture_plan(entry: dict, explain):
+    """
+    Run the explain function without letting its errors reach the caller
+    :param entry: Aggregated entry where the plan is stored
+    :param explain: Function that returns the statement query plan
+    :return: list of str or None
+    """
+
+    try:
+        plan = explain()
+    except Exception as error:
+        logger.err(error).error("query plan capture failed")
+        return None
+
+    if entry is not None:
+        with _STATS_LOCK:
+            entry["query_plan"] = plan
+            entry["explained_at"] = time.monotonic()
+
+    return plan
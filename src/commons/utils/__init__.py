@@ -1,6 +1,8 @@
 """Export resources"""
 
 from .utils import (
-    validate_json_schema, call_service, store_trace_id, prepare_request_data, build_payload, build_xml_root_causes,
-    error_xml, prettify_xml
+    validate_json_schema, call_service, call_service_many, ServiceResult, reset_executor, store_trace_id,
+    prepare_request_data, build_xml_root_causes, error_xml, prettify_xml, compile_schema, schema_fingerprint,
+    schema_cache_stats, clear_schema_cache
 )
+from .service import get_session, get_breaker, reset_sessions, breaker_stats
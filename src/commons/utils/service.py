@@ -0,0 +1,331 @@
+"""Outbound HTTP sessions and circuit breakers"""
+
+import contextvars
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.timeout import Timeout
+
+from src.commons.errors import CircuitOpenError
+from src.config import load, on_change
+
+CONFIG = load()
+
+IDEMPOTENT_METHODS = frozenset({"GET", "PUT", "DELETE"})
+
+_LOCK = threading.Lock()
+_SESSIONS = {}
+_BREAKERS = {}
+
+# time.monotonic() deadline of the calls executed in the current context, set by `call_service_many`
+_DEADLINE = contextvars.ContextVar("service_deadline", default=None)
+
+
+def get_session(url: str):
+    """
+    Return the keep-alive session used to call the host of an URL
+    :param url: Requested URL
+    :return: requests.Session
+    """
+
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+
+    session = _SESSIONS.get(host, None)
+
+    if session is not None:
+        return session
+
+    with _LOCK:
+        if host not in _SESSIONS:
+            _SESSIONS[host] = _build_session()
+
+        return _SESSIONS[host]
+
+
+def get_timeout():
+    """
+    Return configured connect and read timeouts
+    :return: tuple of connect and read seconds
+    """
+
+    return float(CONFIG.get("HTTP_CONNECT_TIMEOUT", 3.05)), float(CONFIG.get("HTTP_READ_TIMEOUT", 30))
+
+
+def set_deadline(expires_at: float):
+    """
+    Limit the calls executed in the current context, with their retries, to end before a deadline
+    :param expires_at: time.monotonic() deadline
+    """
+
+    _DEADLINE.set(expires_at)
+
+
+def deadline_timeout(timeout: (float, tuple)):
+    """
+    Cap a request timeout to the deadline of the current context. The returned timeout is computed again for every
+    attempt of the request, so retries only get the time left.
+    :param timeout: Seconds or tuple of connect and read seconds
+    :return: The same timeout if there is no deadline, DeadlineTimeout otherwise
+    """
+
+    expires_at = _DEADLINE.get()
+
+    if expires_at is None:
+        return timeout
+
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+
+    return DeadlineTimeout(expires_at, connect, read)
+
+
+def get_breaker(service_name: str):
+    """
+    Return the circuit breaker of a service
+    :param service_name: Name of the called service
+    :return: CircuitBreaker
+    """
+
+    breaker = _BREAKERS.get(service_name, None)
+
+    if breaker is not None:
+        return breaker
+
+    with _LOCK:
+        if service_name not in _BREAKERS:
+            _BREAKERS[service_name] = CircuitBreaker(
+                name=service_name,
+                failures=int(CONFIG.get("CIRCUIT_FAILURES", 5)),
+                reset_timeout=float(CONFIG.get("CIRCUIT_RESET_TIMEOUT", 30)),
+            )
+
+        return _BREAKERS[service_name]
+
+
+def reset_sessions():
+    """Close all pooled sessions so next calls open new connections"""
+
+    with _LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+
+    for session in sessions:
+        session.close()
+
+
+def breaker_stats():
+    """
+    Return the state of all circuit breakers
+    :return: dict of service name and breaker state
+    """
+
+    with _LOCK:
+        breakers = list(_BREAKERS.values())
+
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+class CircuitBreaker:
+    """
+    Consecutive failures circuit breaker. After `failures` consecutive errors calls are rejected for `reset_timeout`
+    seconds, then a single trial call is allowed to close it again.
+    :param name: Service name
+    :param failures: Consecutive failures to open the circuit
+    :param reset_timeout: Seconds the circuit remains open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, failures: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._rejected = 0
+        self._trial = False
+
+    def before_call(self):
+        """
+        Validate if a call can be executed
+        :raise: CircuitOpenError if the circuit is open
+        """
+
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial = True
+                return
+
+            self._rejected += 1
+
+        raise CircuitOpenError(root_causes=[{"error": f"Circuit open for {self.name}"}])
+
+    def success(self):
+        """Register a successful call"""
+
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive = 0
+            self._trial = False
+
+    def failure(self):
+        """Register a failed call"""
+
+        with self._lock:
+            self._consecutive += 1
+            self._trial = False
+
+            if self._state == self.HALF_OPEN or self._consecutive >= self.failures:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """
+        End a call that was neither a success nor a failure, like a call interrupted by a worker shutdown. A pending
+        trial call is given back, so the next call of the open circuit is a trial again.
+        """
+
+        with self._lock:
+            if self._trial and self._state == self.HALF_OPEN:
+                self._state = self.OPEN
+
+            self._trial = False
+
+    def stats(self):
+        """
+        Return breaker state
+        :return: dict
+        """
+
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive,
+                "rejected": self._rejected,
+            }
+
+
+class DeadlineTimeout(Timeout):
+    """
+    urllib3 timeout whose connect and read seconds never go past a deadline. urllib3 clones the timeout of every
+    request attempt, the clone gets the time left at that moment.
+    :param expires_at: time.monotonic() deadline
+    :param connect: Max connect seconds
+    :param read: Max read seconds
+    """
+
+    MIN_SECONDS = 0.001
+
+    def __init__(self, expires_at: float, connect: float, read: float):
+        super().__init__(connect=connect, read=read)
+        self.expires_at = expires_at
+        self.connect_seconds = connect
+        self.read_seconds = read
+
+    def clone(self):
+        remaining = max(self.expires_at - time.monotonic(), self.MIN_SECONDS)
+
+        return Timeout(connect=_cap(self.connect_seconds, remaining), read=_cap(self.read_seconds, remaining))
+
+
+class DeadlineRetry(Retry):
+    """urllib3 retry policy that stops retrying and backing off at the deadline of the current context"""
+
+    def is_exhausted(self):
+        expires_at = _DEADLINE.get()
+
+        return super().is_exhausted() or (expires_at is not None and time.monotonic() >= expires_at)
+
+    def get_backoff_time(self):
+        return _cap(super().get_backoff_time(), _remaining())
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+
+        return None if retry_after is None else _cap(retry_after, _remaining())
+
+
+@on_change
+def _on_config_change(changed: set, config: dict):
+    """
+    Build sessions again if pool or retry settings changed
+    :param changed: Changed configuration keys
+    :param config: Current configuration
+    """
+
+    if changed & {"HTTP_POOL_SIZE", "HTTP_RETRIES", "HTTP_RETRY_BACKOFF"}:
+        reset_sessions()
+
+
+def _build_session():
+    """
+    Create a session with a bounded connection pool and retries for idempotent methods. Calls wait for a free
+    connection when all of them are in use, so at most HTTP_POOL_SIZE connections are opened to the host.
+    :return: requests.Session
+    """
+
+    pool_size = int(CONFIG.get("HTTP_POOL_SIZE", 10))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=_build_retry())
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def _build_retry():
+    """
+    Build retry policy with backoff for idempotent methods, limited by the deadline of the current context
+    :return: urllib3 Retry
+    """
+
+    options = {
+        "total": int(CONFIG.get("HTTP_RETRIES", 2)),
+        "backoff_factor": float(CONFIG.get("HTTP_RETRY_BACKOFF", 0.3)),
+        "status_forcelist": (502, 503, 504),
+        "raise_on_status": False,
+    }
+
+    try:
+        return DeadlineRetry(allowed_methods=IDEMPOTENT_METHODS, **options)
+    except TypeError:
+        return DeadlineRetry(method_whitelist=IDEMPOTENT_METHODS, **options)
+
+
+def _remaining():
+    """
+    Seconds left before the deadline of the current context
+    :return: float or None if there is no deadline
+    """
+
+    expires_at = _DEADLINE.get()
+
+    return None if expires_at is None else max(expires_at - time.monotonic(), 0)
+
+
+def _cap(seconds: float, limit: float):
+    """
+    Limit an amount of seconds
+    :param seconds: Seconds, None means no limit
+    :param limit: Max seconds, None means no limit
+    :return: float or None
+    """
+
+    if seconds is None:
+        return limit
+
+    return seconds if limit is None else min(seconds, limit)
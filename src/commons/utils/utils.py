@@ -1,7 +1,16 @@
 """Common utilities"""
 
+# pylint: disable=global-statement
+
 import os
 import uuid
+import hashlib
+import json as jsonb
+import threading
+import time
+import contextvars
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
 from base64 import urlsafe_b64encode
 from xml.etree import ElementTree
 from xml.etree.ElementTree import SubElement
@@ -10,15 +19,28 @@ from xml.dom import minidom
 import datetime
 import requests
 import fastjsonschema
-from flask import request
+from flask import request, g
 
 import src.commons.context as context
+import src.commons.metrics as metrics
 from src.commons.errors import SchemaError, HandlerError
 from src.commons.logging import logger
 from src.config import load
+from .service import get_session, get_timeout, get_breaker, set_deadline, deadline_timeout
 
 CONFIG = load()
 
+SCHEMA_CACHE_SIZE = int(CONFIG.get("SCHEMA_CACHE_SIZE", 128))
+
+_SCHEMA_LOCK = threading.Lock()
+_SCHEMA_CACHE = OrderedDict()
+_SCHEMA_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+
+ServiceResult = namedtuple("ServiceResult", ["status_code", "body", "error"])
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
 
 def short_id(length: int = 6):
     """
@@ -40,7 +62,7 @@ def short_id(length: int = 6):
 
 def store_trace_id(headers):
     """
-    Search for TraceId header and store it as global configuration for be used on all logs as part of the context
+    Search for TraceId header and store it in the current context scope, it is added to all logs of the scope
     :param headers: List of request headers
     """
 
@@ -49,23 +71,26 @@ def store_trace_id(headers):
     if not trace_id:
         trace_id = str(uuid.uuid4())
 
-    logger.context.field("trace_id", trace_id)
     context.set_value("trace_id", trace_id)
 
 
 def prepare_request_data(schema: dict = None):
     """
-    Process al request data, store trace_id in logger context and return request body
-    :param schema: JSON schema definition to validate body
+    Process al request data, store trace_id in the request context and return request body
+    :param schema: JSON schema definition or compiled validator to validate body
     :return: JSON request
     :raise: HandlerError if process fail
     """
 
-    body = request.json
-    query = dict(request.args)
+    if "validated_body" in g:
+        body = g.validated_body
+    else:
+        body = request.json
 
-    if schema is not None:
-        body = validate_json_schema(data=body, schema=schema)
+        if schema is not None:
+            body = validate_json_schema(data=body, schema=schema)
+
+    query = dict(request.args)
 
     store_trace_id(request.headers)
 
@@ -78,20 +103,85 @@ def prepare_request_data(schema: dict = None):
     return body, query
 
 
-def validate_json_schema(data: dict, schema: dict):
+def validate_json_schema(data: dict, schema):
     """
     Validate JSON request payload with a given JSON schema
     :param data: JSON request data
-    :param schema: JSON schema definition
+    :param schema: JSON schema definition or validator returned by compile_schema
     """
 
     try:
-        validate = fastjsonschema.compile(schema)
+        validate = schema if callable(schema) else compile_schema(schema)
         return validate(data)
     except Exception as err:
         raise SchemaError(err) from err
 
 
+def compile_schema(schema: dict):
+    """
+    Return a compiled validator for the given JSON schema. Validators are cached by the schema fingerprint in a
+    bounded LRU cache of SCHEMA_CACHE_SIZE entries, so every schema is compiled once per process.
+    :param schema: JSON schema definition
+    :return: Validation function
+    """
+
+    key = schema_fingerprint(schema)
+
+    with _SCHEMA_LOCK:
+        validate = _SCHEMA_CACHE.get(key, None)
+
+        if validate is not None:
+            _SCHEMA_CACHE.move_to_end(key)
+            _SCHEMA_STATS["hits"] += 1
+            return validate
+
+    validate = fastjsonschema.compile(schema)
+
+    with _SCHEMA_LOCK:
+        _SCHEMA_STATS["misses"] += 1
+        _SCHEMA_CACHE[key] = validate
+
+        while len(_SCHEMA_CACHE) > max(SCHEMA_CACHE_SIZE, 1):
+            _SCHEMA_CACHE.popitem(last=False)
+            _SCHEMA_STATS["evictions"] += 1
+
+    return validate
+
+
+def schema_fingerprint(schema: dict):
+    """
+    Build a stable identifier of a JSON schema independent of key ordering
+    :param schema: JSON schema definition
+    :return: Hex digest string
+    """
+
+    canonical = jsonb.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def schema_cache_stats():
+    """
+    Return compiled schema cache counters
+    :return: dict with hits, misses, evictions and current size
+    """
+
+    with _SCHEMA_LOCK:
+        stats = dict(_SCHEMA_STATS)
+        stats["size"] = len(_SCHEMA_CACHE)
+
+    return stats
+
+
+def clear_schema_cache():
+    """Remove all compiled validators and reset the cache stats"""
+
+    with _SCHEMA_LOCK:
+        _SCHEMA_CACHE.clear()
+
+        for counter in _SCHEMA_STATS:
+            _SCHEMA_STATS[counter] = 0
+
+
 def call_service(
     method: str,
     resource: str,
@@ -99,6 +189,7 @@ def call_service(
     json: dict = None,
     params: dict = None,
     service_name: str = None,
+    timeout: (float, tuple) = None,
 ):
     """
     Generic call service to avoid code duplication
@@ -108,6 +199,7 @@ def call_service(
     :param json: JSON body for the request
     :param params: URL params data on the request
     :param service_name: Name of the service that will be called
+    :param timeout: Seconds or tuple of connect and read seconds, defaults to configured HTTP timeouts
     :return: Tuple of status code and json response
     :raise: HandlerError if status code is not 200, 201 or 202
     """
@@ -116,10 +208,29 @@ def call_service(
         service_name = "External.service"
 
     options = _build_request_options(method, resource, headers, json, params)
+    options["timeout"] = deadline_timeout(timeout if timeout is not None else get_timeout())
 
     logger.field("service", service_name).fields(options).debug("calling service")
 
-    res = _execute_request(method, options)
+    breaker = get_breaker(service_name)
+    breaker.before_call()
+
+    try:
+        with metrics.timed(service_name, method.upper()):
+            res = _execute_request(method, options)
+    except Exception:
+        breaker.failure()
+        raise
+    else:
+        if res.status_code >= 500:
+            breaker.failure()
+        else:
+            breaker.success()
+    finally:
+        # Calls interrupted by GreenletExit, KeyboardInterrupt or SystemExit are not downstream failures, but a
+        # trial call of a half-open circuit must never stay pending
+        breaker.release()
+
     json_res = res.json()
 
     if res.status_code in {200, 201, 202}:
@@ -146,6 +257,116 @@ def call_service(
     )
 
 
+def call_service_many(calls: list, deadline: float = None):
+    """
+    Execute several `call_service` calls concurrently on a bounded pool of HTTP_FANOUT_WORKERS workers.
+    Every call spec is a dict with the `call_service` arguments, it can set its own `timeout`. Calls run in a copy of
+    the current context, so they forward the request Trace-Id.
+    With a deadline, calls still queued when it expires are not executed, and the timeout of every request attempt
+    and the retries backoff are capped to the time left, so calls that are late free their worker soon after the
+    deadline. Read timeouts apply to every socket read, a response body that keeps trickling can still run longer.
+    :param calls: List of call specs
+    :param deadline: Max seconds to wait for all calls
+    :return: List of ServiceResult in the same order of calls, with the raised error of failed calls
+    """
+
+    expires_at = None if deadline is None else time.monotonic() + deadline
+
+    futures = []
+
+    for spec in calls:
+        spec = dict(spec)
+        spec["headers"] = dict(spec.get("headers") or {})
+
+        futures.append(_get_executor().submit(contextvars.copy_context().run, _call_before, expires_at, spec))
+
+    wait(futures, timeout=None if expires_at is None else max(expires_at - time.monotonic(), 0))
+
+    results = []
+
+    for spec, future in zip(calls, futures):
+        if not future.done():
+            future.cancel()
+            results.append(ServiceResult(None, None, _deadline_error(spec)))
+            continue
+
+        error = future.exception()
+
+        if error is not None:
+            results.append(ServiceResult(None, None, error))
+            continue
+
+        status_code, body = future.result()
+        results.append(ServiceResult(status_code, body, None))
+
+    return results
+
+
+def _call_before(expires_at: float, spec: dict):
+    """
+    Execute a `call_service_many` call in its own context, limited by the fan out deadline
+    :param expires_at: time.monotonic() deadline or None
+    :param spec: `call_service` arguments
+    :return: Tuple of status code and json response
+    :raise: HandlerError if the deadline expired before the call started
+    """
+
+    if expires_at is not None:
+        if time.monotonic() >= expires_at:
+            raise _deadline_error(spec)
+
+        set_deadline(expires_at)
+
+    return call_service(**spec)
+
+
+def _deadline_error(spec: dict):
+    """
+    Build the error of a `call_service_many` call that did not end before the deadline
+    :param spec: `call_service` arguments
+    :return: HandlerError
+    """
+
+    service_name = spec.get("service_name") or "External.service"
+
+    return HandlerError(
+        code=504,
+        message="gateway-timeout",
+        description="Service call deadline exceeded",
+        root_causes=[{"error": f"Deadline exceeded calling {service_name}"}],
+    )
+
+
+def _get_executor():
+    """
+    Return the process pool used to fan out service calls. Under the gevent worker its threads are greenlets.
+    :return: ThreadPoolExecutor
+    """
+
+    global _EXECUTOR
+
+    if _EXECUTOR is not None:
+        return _EXECUTOR
+
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=int(CONFIG.get("HTTP_FANOUT_WORKERS", 20)),
+                thread_name_prefix="call-service",
+            )
+
+    return _EXECUTOR
+
+
+def reset_executor():
+    """Discard the fan out pool so next `call_service_many` creates a new one, its threads do not survive a fork"""
+
+    global _EXECUTOR
+
+    with _EXECUTOR_LOCK:
+        _EXECUTOR = None
+
+
 def _build_request_options(
     method: str, resource: str, headers: dict = None, json: dict = None, params: dict = None
 ):
@@ -185,25 +406,26 @@ def _build_request_options(
 
 def _execute_request(method: str, options: dict):
     """
-    Execute requests library call to any REST service configured
+    Execute requests library call to any REST service configured using the keep-alive session of the target host
     :param method: HTTP request method to execute call
     :param options: Configured options for the call
     :return: requests library response
     """
 
     method = method.upper()
+    session = get_session(options["url"])
 
     if method == "GET":
-        return requests.get(**options)
+        return session.get(**options)
 
     if method == "POST":
-        return requests.post(**options)
+        return session.post(**options)
 
     if method == "PUT":
-        return requests.put(**options)
+        return session.put(**options)
 
     if method == "DELETE":
-        return requests.delete(**options)
+        return session.delete(**options)
 
     raise requests.exceptions.RequestException("invalid request method")
 
@@ -1,3 +1,3 @@
 """Export resources"""
 
-from .config import load
+from .config import load, reload, on_change, remove_callback, start_refresh, stop_refresh, restart_refresh, load_stats
@@ -1,30 +1,248 @@
 """Configuration methods"""
 
+# pylint: disable=global-statement
+
 import os
 import pathlib
 import json
+import threading
+import time
 
 import yaml
-import boto3
 
 NAMESPACE = os.getenv("APP_NAME")
 
+_LOCK = threading.RLock()
+_CONFIG = {}
+_CALLBACKS = []
+_STATS = {
+    "loads": 0,
+    "hits": 0,
+    "refreshes": 0,
+    "errors": 0,
+    "last_load_seconds": None,
+    "total_load_seconds": 0.0,
+    "loaded_at": None,
+}
+
+_LOADED = False
+_REFRESHER = None
+
 
-def load():
+def load(refresh: bool = False):
     """
     Load app configuration depending of STAGE env var.
     If STAGE is equals to `dev`, will attempt to load from local config.yml file.
     If STAGE is equals to `staging` or prod will attempt to load from AWS SecretsManager resource
     named as `<namespace>/<stage>`
+
+    The configuration is resolved only once per process and the same dict instance is returned on every call, so
+    values updated by a refresh are visible to all the modules that keep a reference to it.
+    :param refresh: Force to resolve the configuration again from its source
+    :return: Configuration dict
+    """
+
+    global _LOADED
+
+    if _LOADED and not refresh:
+        _STATS["hits"] += 1
+        return _CONFIG
+
+    with _LOCK:
+        if _LOADED and not refresh:
+            _STATS["hits"] += 1
+            return _CONFIG
+
+        new_config = _resolve()
+        changed = _changed_keys(_CONFIG, new_config)
+
+        # Updated in place, readers do not take the lock and must never see a partially filled dict
+        _CONFIG.update(new_config)
+
+        for key in set(_CONFIG) - set(new_config):
+            _CONFIG.pop(key, None)
+
+        first_load = not _LOADED
+        _LOADED = True
+
+    if changed and not first_load:
+        _notify(changed)
+
+    if first_load:
+        _start_configured_refresh()
+
+    return _CONFIG
+
+
+def reload():
+    """
+    Resolve configuration again from its source and notify registered callbacks if any value changed
+    :return: Configuration dict
+    """
+
+    try:
+        config = load(refresh=True)
+        _STATS["refreshes"] += 1
+        return config
+    except Exception:
+        _STATS["errors"] += 1
+        raise
+
+
+def on_change(callback):
+    """
+    Register a callback to be executed when a refresh changes configuration values.
+    Callback receives the set of changed keys and the current configuration dict.
+    Can be used as decorator.
+    :param callback: Callable with signature callback(changed_keys: set, config: dict)
+    :return: Registered callback
+    """
+
+    with _LOCK:
+        if callback not in _CALLBACKS:
+            _CALLBACKS.append(callback)
+
+    return callback
+
+
+def remove_callback(callback):
+    """
+    Unregister a change callback
+    :param callback: Previously registered callback
+    """
+
+    with _LOCK:
+        if callback in _CALLBACKS:
+            _CALLBACKS.remove(callback)
+
+
+def start_refresh(ttl: float):
+    """
+    Start a daemon thread that reloads the configuration every `ttl` seconds
+    :param ttl: Seconds between refreshes
+    :return: Refresher thread
+    """
+
+    global _REFRESHER
+
+    with _LOCK:
+        if _REFRESHER is not None and _REFRESHER.is_alive():
+            _REFRESHER.ttl = ttl
+            return _REFRESHER
+
+        _REFRESHER = _Refresher(ttl)
+        _REFRESHER.start()
+
+    return _REFRESHER
+
+
+def stop_refresh():
+    """Stop background configuration refresh if running"""
+
+    global _REFRESHER
+
+    with _LOCK:
+        refresher = _REFRESHER
+        _REFRESHER = None
+
+    if refresher is not None:
+        refresher.stop()
+
+
+def restart_refresh():
+    """Start again the configured background refresh, for example in a forked process where threads do not survive"""
+    _start_configured_refresh()
+
+
+def load_stats():
+    """
+    Return configuration resolution metrics
+    :return: dict with load counters and timings in seconds
+    """
+
+    return dict(_STATS)
+
+
+class _Refresher(threading.Thread):
+    """Background configuration refresh worker"""
+
+    def __init__(self, ttl: float):
+        super().__init__(name="config-refresh", daemon=True)
+        self.ttl = ttl
+        self._stop_event = threading.Event()
+
+    def run(self):
+        """Reload configuration until stopped"""
+
+        while not self._stop_event.wait(self.ttl):
+            try:
+                reload()
+            except Exception:
+                continue
+
+    def stop(self):
+        """Signal worker to finish"""
+        self._stop_event.set()
+
+
+def _resolve():
+    """
+    Resolve configuration from the source that corresponds to the current stage and record its timing
     :return: Configuration dict
     """
 
     stage = os.getenv("STAGE", "dev")
+    start = time.perf_counter()
 
     if stage in ("staging", "prod"):
-        return _load_aws(stage)
+        config = _load_aws(stage)
+    else:
+        config = _load_local()
+
+    elapsed = time.perf_counter() - start
+
+    _STATS["loads"] += 1
+    _STATS["last_load_seconds"] = elapsed
+    _STATS["total_load_seconds"] += elapsed
+    _STATS["loaded_at"] = time.time()
+
+    return config or {}
+
+
+def _changed_keys(old: dict, new: dict):
+    """
+    Get the keys that differ between two configuration dicts
+    :param old: Previous configuration
+    :param new: New configuration
+    :return: set of changed keys
+    """
+
+    return {key for key in set(old) | set(new) if old.get(key) != new.get(key)}
+
+
+def _notify(changed: set):
+    """
+    Execute registered change callbacks
+    :param changed: Set of changed keys
+    """
+
+    with _LOCK:
+        callbacks = list(_CALLBACKS)
+
+    for callback in callbacks:
+        try:
+            callback(changed, _CONFIG)
+        except Exception:
+            _STATS["errors"] += 1
 
-    return _load_local()
+
+def _start_configured_refresh():
+    """Start background refresh if CONFIG_REFRESH_TTL is set"""
+
+    ttl = _CONFIG.get("CONFIG_REFRESH_TTL", os.getenv("CONFIG_REFRESH_TTL"))
+
+    if ttl and float(ttl) > 0:
+        start_refresh(float(ttl))
 
 
 def _load_local():
@@ -36,20 +254,22 @@ def _load_local():
     path = pathlib.Path(__file__).parent.absolute()
     file = f"{path}/config.yml"
 
-    config = open(file)
-
-    data = yaml.load(config, Loader=yaml.FullLoader)
+    with open(file) as config:
+        data = yaml.load(config, Loader=yaml.FullLoader)
 
     return data
 
 
 def _load_aws(stage):
     """
-    Load config from AWS SecretsManager resource according STAGE
+    Load config from AWS SecretsManager resource according STAGE. boto3 is imported here, so local stages do not
+    pay for its import.
     :param stage: Stage config to find
     :returns: Configuration dict
     """
 
+    import boto3  # pylint: disable=import-outside-toplevel
+
     secret_name = f"{NAMESPACE}/{stage}"
     region_name = "us-east-1"
 
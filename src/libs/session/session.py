@@ -1,7 +1,7 @@
 """Session configuration"""
 
 from flask import Flask, session
-from flask.ext.session import Session
+from flask_session import Session
 
 import src.commons.context as context
 from src.commons.drivers import Redis
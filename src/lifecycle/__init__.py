@@ -0,0 +1,3 @@
+"""Export resources"""
+
+from .lifecycle import worker_count, prepare, before_fork, after_fork, warm_up, worker_exit
@@ -0,0 +1,199 @@
+"""Server process lifecycle
+
+Hooks executed by gunicorn (see gunicorn.conf.py) to share as much as possible between workers and keep each worker
+away from resources opened by other processes:
+
+- `prepare` runs in the master after the app is preloaded, it imports the configured drivers and compiles schemas, so
+  workers inherit them instead of repeating the work.
+- `after_fork` runs in each new worker, it discards pools, clients, sessions and threads inherited from the master.
+- `warm_up` runs in each worker before it accepts requests, it opens connections and primes in memory caches.
+"""
+
+import importlib
+import os
+import pkgutil
+import time
+
+import src.commons.drivers as drivers
+import src.commons.metrics as metrics
+import src.commons.utils as utils
+from src.commons.logging import logger, shipper
+from src.config import load, restart_refresh
+
+CONFIG = load()
+
+
+def worker_count():
+    """
+    Number of server workers, GUNICORN_WORKERS if configured (config or env var), otherwise the available CPUs by
+    GUNICORN_WORKERS_PER_CPU. Gevent workers handle concurrency in their event loop, so one per CPU is enough.
+    :return: int
+    """
+
+    configured = CONFIG.get("GUNICORN_WORKERS", os.getenv("GUNICORN_WORKERS"))
+
+    if configured not in (None, ""):
+        return max(1, int(configured))
+
+    return max(1, _cpu_count() * int(CONFIG.get("GUNICORN_WORKERS_PER_CPU", 1)))
+
+
+def prepare():
+    """Import configured drivers and compile schemas before forking workers"""
+
+    timings = {}
+
+    _timed(timings, "drivers", drivers.preload)
+    _timed(timings, "schemas", _compile_schemas)
+
+    logger.fields(timings).info("app prepared")
+
+
+def before_fork():
+    """Ship queued logs of the master, so they are not lost or duplicated by the forked worker"""
+
+    if shipper is not None:
+        shipper.flush(timeout=1)
+
+
+def after_fork():
+    """Discard resources inherited from the master that can not be shared between processes"""
+
+    for name in drivers.loaded_drivers():
+        module = drivers.load_driver(name)
+
+        if name == "mongo":
+            module.reset_client()
+        else:
+            module.reset_pool()
+
+    utils.reset_sessions()
+    utils.reset_executor()
+
+    if shipper is not None:
+        shipper.after_fork()
+
+    restart_refresh()
+
+
+def warm_up():
+    """
+    Prepare a worker before it accepts requests: open connections of the configured drivers, compile schemas and
+    prime the reference data index. Failed steps are logged, the worker is started anyway.
+    """
+
+    timings = {}
+
+    try:
+        names = drivers.configured_drivers()
+    except KeyError as error:
+        logger.err(error).error("invalid DRIVERS configuration")
+        names = []
+
+    for name in names:
+        _timed(timings, name, _WARM_UPS[name])
+
+    _timed(timings, "schemas", _compile_schemas)
+    _timed(timings, "reference", _prime_reference)
+
+    logger.fields(timings).field("pid", os.getpid()).info("worker warmed up")
+
+
+def worker_exit(pid: int):
+    """
+    Clean up state of a finished worker
+    :param pid: Worker process ID
+    """
+
+    metrics.mark_process_dead(pid)
+
+
+def _timed(timings: dict, name: str, func):
+    """
+    Execute a step recording its duration, errors are logged and not raised
+    :param timings: dict where `<name>_ms` is stored
+    :param name: Step name
+    :param func: Step function
+    """
+
+    start = time.perf_counter()
+
+    try:
+        func()
+    except Exception as error:
+        logger.err(error).field("step", name).error("lifecycle step failed")
+
+    timings[f"{name}_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+
+def _warm_sqlite():
+    """Open a pooled SQLite connection"""
+
+    pool = drivers.load_driver("sqlite").get_pool()
+
+    if pool is not None:
+        pool.release(pool.acquire())
+
+
+def _warm_postgres():
+    """Open the Postgres pool min connections"""
+    drivers.load_driver("postgres").get_pool()
+
+
+def _warm_redis():
+    """Open a pooled Redis connection"""
+    drivers.get_driver("redis")().get_connection().ping()
+
+
+def _warm_mongo():
+    """Connect the shared Mongo client"""
+
+    with drivers.get_driver("mongo")() as database:
+        database.ping(force=True)
+
+
+_WARM_UPS = {
+    "sqlite": _warm_sqlite,
+    "postgres": _warm_postgres,
+    "redis": _warm_redis,
+    "mongo": _warm_mongo,
+}
+
+
+def _compile_schemas():
+    """
+    Compile the JSON schemas declared in the modules of `src.schemas`: module level dicts with a `$schema` key or
+    with `type` and `properties` keys
+    """
+
+    package = importlib.import_module("src.schemas")
+
+    for module_info in pkgutil.iter_modules(package.__path__, f"{package.__name__}."):
+        module = importlib.import_module(module_info.name)
+
+        for value in vars(module).values():
+            if isinstance(value, dict) and ("$schema" in value or {"type", "properties"} <= set(value)):
+                utils.compile_schema(value)
+
+
+def _prime_reference():
+    """Load the reference data index if REFERENCE_CACHE is enabled"""
+
+    if str(CONFIG.get("REFERENCE_CACHE", "false")).lower() != "true":
+        return
+
+    reference = importlib.import_module("src.adapters.reference")
+    reference.holiday_ordinals()
+    reference.price_by_lift_type()
+
+
+def _cpu_count():
+    """
+    Number of CPUs the process can run on
+    :return: int
+    """
+
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
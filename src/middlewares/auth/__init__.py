@@ -1,3 +1,3 @@
 """Export resources"""
 
-from .auth import bearer_api_key
+from .auth import bearer_api_key, verify_header, sign_token, hash_api_key, load_keys
@@ -1,22 +1,52 @@
 """HTTP API authorizer middleware"""
 
-import re
+# pylint: disable=global-statement
+
 import functools
+import hashlib
+import hmac
+import re
+import threading
+import time
+from collections import OrderedDict
 
 from flask import request
 
 import src.commons.utils as utils
 import src.commons.http as http
-from src.config import load
-from src.commons.logging import logger
-from src.commons.errors import HandlerError
+from src.config import load, on_change
+from src.commons.errors import ConfigurationError, HandlerError
 
 CONFIG = load()
 
+PREFIX = "Bearer "
+
+INVALID_TYPE = -1.0
+INVALID_TOKEN = -2.0
+NO_EXPIRATION = float("inf")
+
+_ROOT_CAUSES = {
+    INVALID_TYPE: [{"error": "Invalid type of Authorization token"}],
+    INVALID_TOKEN: [{"error": "Invalid token"}],
+}
+
+_EXPIRATION = re.compile(r"[0-9]{1,18}")
+_SIGNATURE = re.compile(r"[0-9a-f]{64}")
+
+_KEY_DIGESTS = ()
+_TOKEN_SECRETS = ()
+
+# Successful verifications by Authorization header. The generation changes when keys are loaded, so a verification
+# that started with the previous keys is not cached.
+_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+_GENERATION = 0
+
 
 def bearer_api_key():
     """
-    Authorize raw token from Authorization header
+    Authorize raw token from Authorization header. Tokens can be any of the configured API keys or HMAC signed
+    tokens built with `sign_token`. Verification results are cached, so valid requests only pay for a cache lookup.
     :return: Function response
     """
 
@@ -29,30 +59,233 @@ def bearer_api_key():
             utils.store_trace_id(request.headers)
 
             auth_header = request.headers.get("Authorization", None)
-            logger.field("auth_header", auth_header).debug("getting authorization header")
-
-            unauthorized = HandlerError(
-                code=401,
-                message="invalid-credentials",
-                description="Invalid authorization credentials",
-            )
 
             if not auth_header:
-                unauthorized.root_causes = [{"error": "Empty Authorization header"}]
-                return http.json_error(error=unauthorized)
+                return _unauthorized([{"error": "Empty Authorization header"}])
 
-            if re.search("^Bearer", auth_header) is None:
-                unauthorized.root_causes = [{"error": "Invalid type of Authorization token"}]
-                return http.json_error(error=unauthorized)
+            expires_at = verify_header(auth_header)
 
-            api_key = auth_header.split(" ")[1]
+            if expires_at > time.time():
+                return func(*args, **kwargs)
 
-            if api_key != CONFIG["API_KEY"]:
-                unauthorized.root_causes = [{"error": "Invalid token"}]
-                return http.json_error(error=unauthorized)
+            if expires_at > 0:
+                return _unauthorized([{"error": "Expired token"}])
 
-            return func(*args, **kwargs)
+            return _unauthorized(list(_ROOT_CAUSES[expires_at]))
 
         return wrapper
 
     return inner
+
+
+def verify_header(auth_header: str):
+    """
+    Verify an Authorization header value. Successful verifications are kept in a LRU cache of AUTH_CACHE_SIZE
+    entries, invalid headers are never cached, so they can not evict the valid ones.
+    :param auth_header: Authorization header value
+    :return: Token expiration timestamp, NO_EXPIRATION, INVALID_TYPE or INVALID_TOKEN
+    """
+
+    with _CACHE_LOCK:
+        expires_at = _CACHE.get(auth_header, None)
+
+        if expires_at is not None:
+            _CACHE.move_to_end(auth_header)
+            return expires_at
+
+        generation = _GENERATION
+
+    expires_at = _verify(auth_header)
+
+    if expires_at > 0:
+        _remember(auth_header, expires_at, generation)
+
+    return expires_at
+
+
+def sign_token(key_id: str, expires_at: int = 0, secret: str = None):
+    """
+    Build an HMAC signed token with the format `<key_id>.<expires_at>.<signature>`
+    :param key_id: Identifier of the token owner, can not contain dots
+    :param expires_at: Unix timestamp of expiration, 0 for tokens that do not expire
+    :param secret: Signing secret, defaults to the first of API_TOKEN_SECRETS
+    :return: str token
+    :raise: ConfigurationError if no secret is given and API_TOKEN_SECRETS is not configured
+    """
+
+    if secret is None:
+        if not _TOKEN_SECRETS:
+            raise ConfigurationError("API_TOKEN_SECRETS is not configured, a secret is required to sign tokens")
+
+        secret = _TOKEN_SECRETS[0]
+
+    payload = f"{key_id}.{int(expires_at)}"
+
+    return f"{payload}.{_signature(secret, payload)}"
+
+
+def hash_api_key(api_key: str):
+    """
+    Return the digest to configure an API key in API_KEY_HASHES
+    :param api_key: Raw API key
+    :return: str sha256 hex digest
+    """
+
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def load_keys():
+    """Load API keys and token secrets from configuration and drop cached verifications"""
+
+    global _KEY_DIGESTS, _TOKEN_SECRETS, _GENERATION
+
+    digests = [hash_api_key(CONFIG["API_KEY"])] if CONFIG.get("API_KEY") else []
+    digests.extend(digest.lower() for digest in _config_list("API_KEY_HASHES"))
+
+    _KEY_DIGESTS = tuple(digests)
+    _TOKEN_SECRETS = tuple(_config_list("API_TOKEN_SECRETS"))
+
+    with _CACHE_LOCK:
+        _GENERATION += 1
+        _CACHE.clear()
+
+
+@on_change
+def _on_config_change(changed: set, config: dict):
+    """
+    Reload keys when they are rotated
+    :param changed: Changed configuration keys
+    :param config: Current configuration
+    """
+
+    if changed & {"API_KEY", "API_KEY_HASHES", "API_TOKEN_SECRETS"}:
+        load_keys()
+
+
+def _verify(auth_header: str):
+    """
+    Verify an Authorization header value
+    :param auth_header: Authorization header value
+    :return: Token expiration timestamp, NO_EXPIRATION, INVALID_TYPE or INVALID_TOKEN
+    """
+
+    if not auth_header.startswith(PREFIX):
+        return INVALID_TYPE
+
+    token = auth_header[len(PREFIX):]
+
+    if _match_api_key(token):
+        return NO_EXPIRATION
+
+    return _verify_signed_token(token)
+
+
+def _match_api_key(token: str):
+    """
+    Compare a token with all configured key digests in constant time
+    :param token: Raw token
+    :return: bool
+    """
+
+    digest = hash_api_key(token)
+    matched = False
+
+    for key_digest in _KEY_DIGESTS:
+        matched |= hmac.compare_digest(digest, key_digest)
+
+    return matched
+
+
+def _verify_signed_token(token: str):
+    """
+    Verify an HMAC signed token against all configured secrets in constant time
+    :param token: Token with format `<key_id>.<expires_at>.<signature>`
+    :return: Token expiration timestamp, NO_EXPIRATION or INVALID_TOKEN
+    """
+
+    parts = token.split(".")
+
+    # Header values can hold any latin-1 character, only ASCII digits and hex signatures are compared
+    if len(parts) != 3 or not _EXPIRATION.fullmatch(parts[1]) or not _SIGNATURE.fullmatch(parts[2]):
+        return INVALID_TOKEN
+
+    payload = f"{parts[0]}.{parts[1]}"
+    matched = False
+
+    for secret in _TOKEN_SECRETS:
+        matched |= hmac.compare_digest(_signature(secret, payload), parts[2])
+
+    if not matched:
+        return INVALID_TOKEN
+
+    expires_at = int(parts[1])
+
+    return float(expires_at) if expires_at else NO_EXPIRATION
+
+
+def _remember(auth_header: str, expires_at: float, generation: int):
+    """
+    Cache a successful verification unless keys were loaded again while it was verified
+    :param auth_header: Authorization header value
+    :param expires_at: Verification result
+    :param generation: Keys generation when the verification started
+    """
+
+    with _CACHE_LOCK:
+        if generation != _GENERATION:
+            return
+
+        _CACHE[auth_header] = expires_at
+        _CACHE.move_to_end(auth_header)
+
+        while len(_CACHE) > max(int(CONFIG.get("AUTH_CACHE_SIZE", 1024)), 1):
+            _CACHE.popitem(last=False)
+
+
+def _signature(secret: str, payload: str):
+    """
+    Sign a token payload
+    :param secret: Signing secret
+    :param payload: Token payload
+    :return: str hex HMAC-SHA256 signature
+    """
+
+    return hmac.new(secret.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _config_list(key: str):
+    """
+    Read a configuration value as list, it can be a YAML/JSON list or a comma separated string
+    :param key: Configuration key
+    :return: list of str
+    """
+
+    value = CONFIG.get(key, None)
+
+    if not value:
+        return []
+
+    if isinstance(value, str):
+        value = value.split(",")
+
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def _unauthorized(root_causes: list):
+    """
+    Build unauthorized response
+    :param root_causes: Error root causes
+    :return: Error response
+    """
+
+    unauthorized = HandlerError(
+        code=401,
+        message="invalid-credentials",
+        description="Invalid authorization credentials",
+        root_causes=root_causes,
+    )
+
+    return http.json_error(error=unauthorized)
+
+
+load_keys()
@@ -0,0 +1,276 @@
+"""Redis backed HTTP response cache middleware"""
+
+import base64
+import functools
+import hashlib
+import json
+import threading
+import time
+
+from flask import request, Response, copy_current_request_context, make_response
+from werkzeug.datastructures import Headers
+from werkzeug.http import unquote_etag
+
+import src.commons.context as context
+import src.commons.metrics as metrics
+from src.commons.drivers.redis import Redis
+from src.commons.http import etag_matches
+from src.commons.logging import logger
+
+PREFIX = "response-cache"
+
+
+def cached_response(ttl: int = 60, stale_ttl: int = 0, tags: list = None):
+    """
+    Cache successful route responses in Redis. Responses are keyed by endpoint, path, normalized query args and a
+    hash of the request body. Cached responses with an ETag are answered with 304 if the client already has them.
+    :param ttl: Seconds a cached response is fresh
+    :param stale_ttl: Extra seconds a stale response can be served while it is refreshed in background
+    :param tags: Tags to invalidate cached responses of the route with `invalidate`
+    :return: Function response
+    """
+
+    tags = list(tags or [])
+
+    def inner(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            """Middleware function"""
+
+            start = time.perf_counter()
+            key = _cache_key()
+            entry = _read(key)
+
+            if entry is not None:
+                age = time.time() - entry["stored_at"]
+
+                if age < ttl:
+                    return _cached(entry, "HIT", start)
+
+                if age < ttl + stale_ttl:
+                    _revalidate(key, ttl, stale_ttl, tags, func, args, kwargs)
+                    return _cached(entry, "STALE", start)
+
+            res = make_response(func(*args, **kwargs))
+            _store(key, res, ttl, stale_ttl, tags)
+            _record("miss", start)
+
+            res.headers["X-Cache"] = "MISS"
+
+            return res
+
+        return wrapper
+
+    return inner
+
+
+def invalidate(*tags: str):
+    """
+    Delete all cached responses marked with any of the given tags
+    :param tags: Tag names
+    :return: Total of deleted responses
+    """
+
+    with Redis() as redis:
+        tag_keys = [_tag_key(tag) for tag in tags]
+        keys = set()
+
+        for tag_key in tag_keys:
+            keys.update(redis.get_connection().smembers(tag_key))
+
+        deleted = redis.delete_many(list(keys)) if keys else 0
+        redis.delete_many(tag_keys)
+
+    logger.fields({"tags": list(tags), "deleted": deleted}).debug("response cache invalidated")
+
+    return deleted
+
+
+def _cache_key():
+    """
+    Build the cache key of the current request
+    :return: str key
+    """
+
+    query = sorted((key, value) for key, values in request.args.lists() for value in values)
+    body = hashlib.sha1(request.get_data(cache=True)).hexdigest()
+
+    raw = json.dumps([request.method, request.path, query, body], separators=(",", ":"))
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    return f"{PREFIX}:{request.endpoint}:{digest}"
+
+
+def _tag_key(tag: str):
+    """
+    Build the key of the set that indexes the responses of a tag
+    :param tag: Tag name
+    :return: str key
+    """
+
+    return f"{PREFIX}:tag:{tag}"
+
+
+def _read(key: str):
+    """
+    Get a cached response entry, cache failures are treated as misses
+    :param key: Cache key
+    :return: dict entry or None
+    """
+
+    try:
+        with Redis() as redis:
+            value = redis.get_value(key)
+
+        return json.loads(value) if value is not None else None
+    except Exception as err:
+        _count("error")
+        logger.err(err).warning("response cache read error")
+        return None
+
+
+def _store(key: str, res: Response, ttl: int, stale_ttl: int, tags: list):
+    """
+    Save a response into the cache if it is successful and not streamed
+    :param key: Cache key
+    :param res: Route response
+    :param ttl: Fresh seconds
+    :param stale_ttl: Stale seconds
+    :param tags: Tag names
+    """
+
+    if res.status_code != 200 or res.is_streamed:
+        return
+
+    entry = {
+        "body": base64.b64encode(res.get_data()).decode("ascii"),
+        "status": res.status_code,
+        "headers": [[name, value] for name, value in res.headers if name.lower() != "content-length"],
+        "stored_at": time.time(),
+    }
+
+    expires = int(ttl + stale_ttl)
+
+    try:
+        with Redis() as redis:
+            pipeline = redis.get_connection().pipeline(transaction=False)
+            pipeline.set(key, json.dumps(entry), ex=expires)
+
+            for tag in tags:
+                pipeline.sadd(_tag_key(tag), key)
+                pipeline.expire(_tag_key(tag), expires)
+
+            pipeline.execute()
+
+        _count("store")
+    except Exception as err:
+        _count("error")
+        logger.err(err).warning("response cache write error")
+
+
+def _revalidate(key: str, ttl: int, stale_ttl: int, tags: list, func, args, kwargs):
+    """
+    Execute the route in background to refresh a stale response. A lock avoids several workers refreshing the same
+    key, it is released once the refresh ends and expires by itself if the worker dies meanwhile.
+    :param key: Cache key
+    :param ttl: Fresh seconds
+    :param stale_ttl: Stale seconds
+    :param tags: Tag names
+    :param func: Route function
+    :param args: Route positional arguments
+    :param kwargs: Route keyword arguments
+    """
+
+    lock = f"{key}:lock"
+
+    try:
+        with Redis() as redis:
+            locked = redis.get_connection().set(lock, "1", nx=True, ex=max(int(ttl), 1))
+    except Exception:
+        locked = False
+
+    if not locked:
+        return
+
+    trace_id = context.get_value("trace_id")
+
+    @copy_current_request_context
+    def refresh():
+        """Store a fresh route response in its own context scope, keeping the trace_id of the request"""
+
+        token = context.begin()
+        context.set_value("trace_id", trace_id)
+
+        try:
+            _store(key, make_response(func(*args, **kwargs)), ttl, stale_ttl, tags)
+        except Exception as err:
+            _count("error")
+            logger.err(err).warning("response cache refresh error")
+        finally:
+            _unlock(lock)
+            context.end(token)
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def _unlock(lock: str):
+    """
+    Release a revalidation lock, failures are left to the lock expiration
+    :param lock: Lock key
+    """
+
+    try:
+        with Redis() as redis:
+            redis.delete_key(lock)
+    except Exception as err:
+        _count("error")
+        logger.err(err).warning("response cache unlock error")
+
+
+def _cached(entry: dict, status: str, start: float):
+    """
+    Build a response from a cache entry, or a 304 response if the request If-None-Match has the entry ETag
+    :param entry: Cached entry
+    :param status: X-Cache header value
+    :param start: Request start time
+    :return: Flask response
+    """
+
+    headers = Headers(entry["headers"])
+    etag = headers.get("ETag")
+
+    if etag and request.method in ("GET", "HEAD") and etag_matches(unquote_etag(etag)[0]):
+        res = Response(status=304, headers=[
+            (name, value) for name, value in headers if name.lower() in ("etag", "cache-control", "vary")
+        ])
+    else:
+        res = Response(response=base64.b64decode(entry["body"]), status=entry["status"], headers=headers)
+
+    res.headers["X-Cache"] = status
+
+    _record(status.lower(), start)
+
+    return res
+
+
+def _record(result: str, start: float):
+    """
+    Record the result of a cache lookup
+    :param result: hit, stale or miss
+    :param start: Request start time
+    """
+
+    elapsed = time.perf_counter() - start
+
+    metrics.observe_cache(request.endpoint, result, elapsed)
+    logger.fields({"cache": result, "latency": elapsed}).debug("response cache")
+
+
+def _count(event: str):
+    """
+    Count a response cache event
+    :param event: store or error
+    """
+
+    metrics.observe_cache(request.endpoint, event)
@@ -0,0 +1,3 @@
+"""Export resources"""
+
+from .compression import setup_compression
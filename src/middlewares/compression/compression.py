@@ -0,0 +1,109 @@
+"""Response compression middleware"""
+
+import time
+
+from flask import Flask, Response, request
+
+import src.commons.http.compression as compression
+import src.commons.metrics as metrics
+from src.config import load
+
+CONFIG = load()
+
+
+def setup_compression(app: Flask):
+    """
+    Compress responses according to the client Accept-Encoding header. Only bodies of COMPRESSION_MIMETYPES bigger
+    than COMPRESSION_MIN_SIZE bytes are compressed, streamed responses are sent untouched. Compressed bytes and time
+    are published as Prometheus metrics.
+    :param app: Flask base application
+    """
+
+    if str(CONFIG.get("COMPRESSION", "true")).lower() != "true":
+        return
+
+    app.after_request(compress_response)
+
+
+def compress_response(res: Response):
+    """
+    Compress a response body if it is eligible. Eligible responses vary by Accept-Encoding even when they are sent
+    uncompressed, so shared caches keep a copy per encoding.
+    :param res: Flask response
+    :return: Flask response
+    """
+
+    if not _is_compressible(res):
+        return res
+
+    res.vary.add("Accept-Encoding")
+    encoding = compression.negotiate(request.headers.get("Accept-Encoding", ""))
+
+    if encoding == compression.IDENTITY:
+        metrics.observe_compression(encoding)
+        return res
+
+    data = res.get_data()
+
+    # Compression runs without yielding to other greenlets, so its wall time is the CPU time it takes
+    start = time.perf_counter()
+    compressed = compression.compress(data, encoding, level=_level(encoding))
+    elapsed = time.perf_counter() - start
+
+    res.set_data(compressed)
+    res.headers["Content-Encoding"] = encoding
+
+    etag, weak = res.get_etag()
+
+    if etag and not weak:
+        res.set_etag(f"{etag}-{encoding}")
+
+    metrics.observe_compression(encoding, len(data), len(compressed), elapsed)
+
+    return res
+
+
+def _is_compressible(res: Response):
+    """
+    Check if a response can be compressed
+    :param res: Flask response
+    :return: bool
+    """
+
+    if res.direct_passthrough or res.is_streamed or "Content-Encoding" in res.headers:
+        return False
+
+    if res.status_code < 200 or res.status_code in (204, 206, 304):
+        return False
+
+    if res.mimetype not in _mimetypes():
+        return False
+
+    return (res.content_length or 0) >= int(CONFIG.get("COMPRESSION_MIN_SIZE", 1024))
+
+
+def _mimetypes():
+    """
+    Return mimetypes that can be compressed
+    :return: list of str
+    """
+
+    mimetypes = CONFIG.get("COMPRESSION_MIMETYPES", "application/json")
+
+    if isinstance(mimetypes, str):
+        mimetypes = mimetypes.split(",")
+
+    return [mimetype.strip() for mimetype in mimetypes]
+
+
+def _level(encoding: str):
+    """
+    Get configured compression level for an encoding
+    :param encoding: Content encoding
+    :return: int
+    """
+
+    if encoding == compression.BROTLI:
+        return int(CONFIG.get("COMPRESSION_BROTLI_LEVEL", 4))
+
+    return int(CONFIG.get("COMPRESSION_LEVEL", 6))
@@ -0,0 +1,3 @@
+"""Export resources"""
+
+from .response_log import log_response
@@ -0,0 +1,35 @@
+"""Response logging options middleware"""
+
+import functools
+
+from flask import g
+
+
+def log_response(sample_rate: float = None, max_bytes: int = None):
+    """
+    Override response logging settings of a route
+    :param sample_rate: Fraction of successful responses to log, between 0 and 1
+    :param max_bytes: Max logged bytes of the response body, 0 logs the whole body
+    :return: Function response
+    """
+
+    options = {}
+
+    if sample_rate is not None:
+        options["sample_rate"] = float(sample_rate)
+
+    if max_bytes is not None:
+        options["max_bytes"] = int(max_bytes)
+
+    def inner(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            """Middleware function"""
+
+            g.response_log = options
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return inner
@@ -0,0 +1,3 @@
+"""Export resources"""
+
+from .schema import json_schema
@@ -0,0 +1,46 @@
+"""JSON schema validation middleware"""
+
+import functools
+
+from flask import request, g
+from werkzeug.exceptions import BadRequest
+
+import src.commons.utils as utils
+import src.commons.http as http
+from src.commons.errors import MalformedBodyError
+
+
+def json_schema(schema: dict):
+    """
+    Validate request body against a JSON schema before executing the route. The schema is compiled once when the
+    route is declared, so requests only pay for the validation itself. Validated body is returned afterwards by
+    `utils.prepare_request_data`.
+    :param schema: JSON schema definition
+    :return: Function response
+    """
+
+    validate = utils.compile_schema(schema)
+
+    def inner(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            """Middleware function"""
+
+            utils.store_trace_id(request.headers)
+
+            try:
+                body = request.json
+            except BadRequest as err:
+                return http.json_error(MalformedBodyError(err))
+
+            try:
+                g.validated_body = utils.validate_json_schema(data=body, schema=validate)
+            except Exception as err:
+                return http.json_error(err)
+
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return inner
@@ -1,3 +1,5 @@
 """Export resources"""
 
 from .ping import router as ping_router
+from .metrics import router as metrics_router
+from .debug import router as debug_router
@@ -0,0 +1,50 @@
+"""Debug routes"""
+
+from flask import Blueprint
+
+import src.commons.utils as utils
+import src.commons.http as http
+import src.commons.querylog as querylog
+from src.commons.errors import HandlerError
+from src.middlewares.auth import bearer_api_key
+
+router = Blueprint("debug", __name__)
+
+ORDER_FIELDS = {"count", "slow", "errors", "total_ms", "max_ms", "avg_ms"}
+
+
+@router.route("/.debug/queries", methods=["GET"])
+@bearer_api_key()
+def get_queries():
+    """Obtain executed SQL statements aggregated by shape, sorted by order_by and limited by limit query params"""
+
+    try:
+        _, query = utils.prepare_request_data()
+
+        order_by = query.get("order_by", "total_ms")
+        limit = query.get("limit", "50")
+
+        if order_by not in ORDER_FIELDS or not limit.isdigit():
+            raise HandlerError(
+                code=400,
+                message="bad-request",
+                description="Invalid query params",
+                root_causes=[{"error": f"order_by must be one of {sorted(ORDER_FIELDS)} and limit a positive number"}],
+            )
+
+        return http.json(body={"data": querylog.query_stats(order_by=order_by, limit=int(limit))})
+    except Exception as err:
+        return http.json_error(err)
+
+
+@router.route("/.debug/queries", methods=["DELETE"])
+@bearer_api_key()
+def delete_queries():
+    """Reset SQL statements statistics"""
+
+    try:
+        utils.prepare_request_data()
+        querylog.reset_stats()
+        return http.json(body={"data": "reset"})
+    except Exception as err:
+        return http.json_error(err)
@@ -0,0 +1,14 @@
+"""Metrics routes"""
+
+from flask import Blueprint, Response
+
+import src.commons.metrics as metrics
+
+router = Blueprint("metrics", __name__)
+
+
+@router.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Expose metrics in Prometheus text format"""
+
+    return Response(response=metrics.render(), headers={"Content-Type": metrics.CONTENT_TYPE}, status=200)
@@ -2,16 +2,36 @@
 
 import pathlib
 
-from flask import Flask
+from flask import Flask, g
 
+import src.commons.context as context
+import src.commons.metrics as metrics
 import src.routes as routes
 import src.libs.session as session
+from src.middlewares.compression import setup_compression
 from src.swagger import swagger_router
 
 PATH = pathlib.Path(__file__).parent.absolute()
 
 app = Flask(__name__, static_folder=f"{PATH}/static")
 session.setup_session(app)
+metrics.setup_metrics(app)
+setup_compression(app)
+
+
+@app.before_request
+def begin_context():
+    """Start request scoped context"""
+    g.context_token = context.begin()
+
+
+@app.teardown_request
+def end_context(_):
+    """Finish request scoped context"""
+    context.end(g.pop("context_token", None))
+
 
 app.register_blueprint(swagger_router)
 app.register_blueprint(routes.ping_router)
+app.register_blueprint(routes.metrics_router)
+app.register_blueprint(routes.debug_router)
@@ -1,12 +1,21 @@
 """Swagger path configuration"""
 
-import os
+import hashlib
 import pathlib
+from collections import namedtuple
 
-from flask import Blueprint, render_template, Response
+from flask import Blueprint, render_template, Response, request
 from jinja2 import TemplateNotFound
 
+import src.commons.http.compression as compression
 from src.commons.logging import logger
+from src.config import load
+
+CONFIG = load()
+
+OPENAPI_PATH = pathlib.Path(__file__).parent.absolute() / "openapi"
+
+Asset = namedtuple("Asset", ["content_type", "variants", "etags"])
 
 router = Blueprint('swagger', __name__, template_folder='templates')
 
@@ -26,13 +35,58 @@ def swagger():
 def swagger_file(file: str):
     """Return Swagger JSON specification"""
 
-    path = pathlib.Path(__file__).parent.absolute()
-    full_path = f"{path}/openapi/{file}"
+    asset = ASSETS.get(file, None)
+
+    if asset is None:
+        return Response(status=404)
+
+    encoding = compression.negotiate(request.headers.get("Accept-Encoding", ""))
+    etag = asset.etags[encoding]
+
+    headers = {
+        "ETag": f'"{etag}"',
+        "Vary": "Accept-Encoding",
+        "Cache-Control": CONFIG.get("SWAGGER_CACHE_CONTROL", "no-cache"),
+    }
+
+    if any(request.if_none_match.contains_weak(tag) for tag in asset.etags.values()):
+        return Response(status=304, headers=headers)
+
+    headers["Content-Type"] = asset.content_type
+
+    if encoding != compression.IDENTITY:
+        headers["Content-Encoding"] = encoding
+
+    return Response(response=asset.variants[encoding], headers=headers, status=200)
+
+
+def load_assets(path: pathlib.Path = OPENAPI_PATH):
+    """
+    Read OpenAPI documents once with their compressed variants and strong ETags
+    :param path: Directory of the documents
+    :return: dict of file name and Asset
+    """
+
+    assets = {}
+
+    for file in sorted(path.iterdir()):
+        if not file.is_file() or file.suffix not in (".json", ".yml", ".yaml"):
+            continue
+
+        data = file.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:32]
+
+        variants = {compression.IDENTITY: data}
+        etags = {compression.IDENTITY: digest}
+
+        for encoding in compression.SUPPORTED:
+            variants[encoding] = compression.compress(data, encoding, level=compression.MAX_LEVEL[encoding])
+            etags[encoding] = f"{digest}-{encoding}"
+
+        content_type = "application/json" if file.suffix == ".json" else "application/yaml"
+        assets[file.name] = Asset(content_type=content_type, variants=variants, etags=etags)
 
-    if not os.path.exists(full_path):
-        Response(status=404)
+    return assets
 
-    with open(full_path) as file_open:
-        swagger_data = file_open.read()
 
-    return Response(response=swagger_data, headers={"Content-Type": "application/json"}, status=200)
+ASSETS = load_assets()
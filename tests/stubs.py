@@ -0,0 +1,85 @@
+"""Local stand-ins of external services used by the tests"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ElasticBulkStub:
+    """
+    Elasticsearch bulk API stand-in for the log shipper, served in a background thread. Documents of every received
+    request are kept in `batches`, all of them are answered as indexed unless an error status is set.
+    :param status: Response status code
+    :param delay: Seconds to wait before answering
+    """
+
+    def __init__(self, status: int = 200, delay: float = 0.0):
+        self.batches = []
+        self.received = threading.Condition()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Bulk request handler"""
+
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                """Receive a bulk request, every other line is an indexed document"""
+
+                lines = self.rfile.read(int(self.headers.get("Content-Length") or 0)).splitlines()
+                documents = [json.loads(line) for line in lines[1::2]]
+
+                if delay:
+                    time.sleep(delay)
+
+                with stub.received:
+                    stub.batches.append(documents)
+                    stub.received.notify_all()
+
+                items = [{"index": {"status": 201}} for _ in documents]
+                payload = json.dumps({"took": 1, "errors": False, "items": items}).encode("utf-8")
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                """Silence request logs"""
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def url(self):
+        """Base URL of the stub"""
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def documents(self):
+        """All received documents"""
+        return [document for batch in self.batches for document in batch]
+
+    def wait(self, count: int, timeout: float = 5.0):
+        """
+        Wait until a number of documents is received
+        :param count: Expected documents
+        :param timeout: Max seconds to wait
+        :return: bool, true if they were received
+        """
+
+        with self.received:
+            return self.received.wait_for(lambda: len(self.documents) >= count, timeout)
@@ -0,0 +1,136 @@
+"""Bearer API key authorization tests"""
+
+import time
+
+import pytest
+from flask import Flask
+
+from src.commons.errors import ConfigurationError
+from src.middlewares.auth import auth
+
+API_KEY = "test-api-key"
+SECRET = "test-secret"
+
+
+@pytest.fixture(name="keys", autouse=True)
+def fixture_keys(monkeypatch):
+    """Configure one API key, a hashed API key and a token secret"""
+
+    monkeypatch.setitem(auth.CONFIG, "API_KEY", API_KEY)
+    monkeypatch.setitem(auth.CONFIG, "API_KEY_HASHES", auth.hash_api_key("rotated-key"))
+    monkeypatch.setitem(auth.CONFIG, "API_TOKEN_SECRETS", f"{SECRET},previous-secret")
+    auth.load_keys()
+
+    yield
+
+    monkeypatch.undo()
+    auth.load_keys()
+
+
+def test_configured_api_keys_are_accepted():
+    """The raw API key and the hashed ones never expire"""
+
+    assert auth.verify_header(f"Bearer {API_KEY}") == auth.NO_EXPIRATION
+    assert auth.verify_header("Bearer rotated-key") == auth.NO_EXPIRATION
+
+
+def test_invalid_headers_are_rejected():
+    """Unknown tokens and other authorization schemes are rejected"""
+
+    assert auth.verify_header("Bearer unknown") == auth.INVALID_TOKEN
+    assert auth.verify_header(f"Basic {API_KEY}") == auth.INVALID_TYPE
+
+
+def test_signed_tokens():
+    """Tokens signed with any configured secret are valid until their expiration"""
+
+    expires_at = int(time.time()) + 60
+
+    assert auth.verify_header(f"Bearer {auth.sign_token('client', expires_at)}") == expires_at
+    assert auth.verify_header(f"Bearer {auth.sign_token('client', secret='previous-secret')}") == auth.NO_EXPIRATION
+    assert auth.verify_header(f"Bearer {auth.sign_token('client', secret='other')}") == auth.INVALID_TOKEN
+
+
+def test_tampered_tokens_are_rejected():
+    """Changing the signed payload invalidates the token"""
+
+    key_id, _, signature = auth.sign_token("client", 100).split(".")
+
+    assert auth.verify_header(f"Bearer {key_id}.200.{signature}") == auth.INVALID_TOKEN
+    assert auth.verify_header(f"Bearer other.100.{signature}") == auth.INVALID_TOKEN
+
+
+@pytest.mark.parametrize("token", [
+    "a.1.é",
+    "a.1.é" + "0" * 63,
+    "a.²." + "0" * 64,
+    "a.1." + "A" * 64,
+    "a." + "9" * 400 + "." + "0" * 64,
+])
+def test_malformed_tokens_are_rejected(token):
+    """Non ASCII signatures and expirations, or not hex signatures, are invalid instead of failing"""
+
+    assert auth.verify_header(f"Bearer {token}") == auth.INVALID_TOKEN
+
+
+def test_invalid_headers_are_not_cached():
+    """A flood of invalid tokens does not evict cached valid ones"""
+
+    valid = f"Bearer {API_KEY}"
+    auth.verify_header(valid)
+
+    for index in range(2000):
+        auth.verify_header(f"Bearer invalid-{index}")
+
+    assert list(auth._CACHE) == [valid]
+
+
+def test_rotated_keys_are_not_cached_by_inflight_verifications(monkeypatch):
+    """A verification that runs while keys are rotated does not cache its result"""
+
+    match_api_key = auth._match_api_key
+
+    def rotate_while_matching(token):
+        matched = match_api_key(token)
+        monkeypatch.setitem(auth.CONFIG, "API_KEY", "new-api-key")
+        auth.load_keys()
+        return matched
+
+    monkeypatch.setattr(auth, "_match_api_key", rotate_while_matching)
+
+    assert auth.verify_header(f"Bearer {API_KEY}") == auth.NO_EXPIRATION
+
+    monkeypatch.setattr(auth, "_match_api_key", match_api_key)
+
+    assert auth.verify_header(f"Bearer {API_KEY}") == auth.INVALID_TOKEN
+
+
+def test_sign_token_requires_a_secret(monkeypatch):
+    """Signing without a configured secret fails with a clear error"""
+
+    monkeypatch.setitem(auth.CONFIG, "API_TOKEN_SECRETS", "")
+    auth.load_keys()
+
+    with pytest.raises(ConfigurationError):
+        auth.sign_token("client")
+
+
+@pytest.mark.parametrize("header, status", [
+    (f"Bearer {API_KEY}", 200),
+    ("Bearer a.1.é", 401),
+    (f"Bearer {auth.sign_token('client', 1, secret=SECRET)}", 401),
+    (None, 401),
+])
+def test_middleware(header, status):
+    """Protected routes answer 401 to any invalid or expired Authorization header"""
+
+    app = Flask(__name__)
+
+    @app.route("/protected")
+    @auth.bearer_api_key()
+    def protected():
+        return "ok"
+
+    headers = {"Authorization": header.encode("latin-1")} if header else {}
+
+    assert app.test_client().get("/protected", headers=headers).status_code == status
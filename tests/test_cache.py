@@ -0,0 +1,167 @@
+"""Redis backed response cache middleware tests"""
+
+import json
+import time
+
+import pytest
+from flask import Flask, Response
+from prometheus_client import REGISTRY
+
+from src.middlewares.cache import cache
+
+
+class FakeRedis:
+    """In memory stand-in of the Redis driver and of the client methods used by the cache"""
+
+    def __init__(self, values: dict):
+        self.values = values
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def get_connection(self):
+        return self
+
+    def get_value(self, key: str):
+        return self.values.get(key)
+
+    def delete_key(self, key: str):
+        self.values.pop(key, None)
+
+    def set(self, key: str, value: str, nx: bool = False, ex: int = None):
+        if nx and key in self.values:
+            return None
+
+        self.values[key] = value
+        return True
+
+    def sadd(self, key: str, member: str):
+        self.values.setdefault(key, set()).add(member)
+
+    def expire(self, key: str, seconds: int):
+        pass
+
+    def pipeline(self, transaction: bool = True):
+        return self
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture(name="values")
+def fixture_values(monkeypatch):
+    """Values stored in the fake Redis"""
+
+    values = {}
+    monkeypatch.setattr(cache, "Redis", lambda: FakeRedis(values))
+
+    return values
+
+
+@pytest.fixture(name="client")
+def fixture_client(values):
+    """Test client of an app with cached routes that count their executions"""
+
+    app = Flask(__name__)
+    app.calls = 0
+
+    @app.route("/text")
+    @cache.cached_response(ttl=60)
+    def text():
+        app.calls += 1
+        return f"call {app.calls}", 200
+
+    @app.route("/tagged")
+    @cache.cached_response(ttl=60, stale_ttl=60)
+    def tagged():
+        app.calls += 1
+        return Response(f"call {app.calls}", headers={"ETag": '"v1"', "Vary": "Authorization"})
+
+    return app.test_client()
+
+
+def events(endpoint: str, event: str):
+    """
+    Read a response cache counter
+    :param endpoint: Route endpoint
+    :param event: Counted event
+    :return: float
+    """
+
+    return REGISTRY.get_sample_value("response_cache_events_total", {"endpoint": endpoint, "event": event}) or 0
+
+
+def age(values: dict, seconds: float):
+    """
+    Make every cached response older
+    :param values: Fake Redis values
+    :param seconds: Seconds to add to the responses age
+    """
+
+    for key, value in values.items():
+        if isinstance(value, str) and value.startswith("{"):
+            entry = json.loads(value)
+            entry["stored_at"] -= seconds
+            values[key] = json.dumps(entry)
+
+
+def test_route_results_are_cached(client):
+    """Routes returning tuples are stored on the first request and served from the cache later"""
+
+    hits, misses = events("text", "hit"), events("text", "miss")
+
+    first = client.get("/text")
+    second = client.get("/text")
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.data == first.data == b"call 1"
+    assert events("text", "miss") == misses + 1
+    assert events("text", "hit") == hits + 1
+    assert REGISTRY.get_sample_value("response_cache_duration_seconds_count", {"endpoint": "text", "result": "hit"})
+
+
+def test_cached_hits_answer_conditional_requests(client):
+    """A cached response whose ETag is in If-None-Match is answered with 304 and its validators"""
+
+    client.get("/tagged")
+
+    res = client.get("/tagged", headers={"If-None-Match": '"v1"'})
+
+    assert res.status_code == 304
+    assert res.data == b""
+    assert res.headers["ETag"] == '"v1"'
+    assert res.headers["Vary"] == "Authorization"
+    assert res.headers["X-Cache"] == "HIT"
+
+    assert client.get("/tagged", headers={"If-None-Match": '"v0"'}).status_code == 200
+
+
+def test_stale_responses_release_the_revalidation_lock(client, values):
+    """The lock is deleted once the background refresh ends, so next stale response is refreshed again"""
+
+    client.get("/tagged")
+    age(values, 61)
+
+    assert client.get("/tagged").headers["X-Cache"] == "STALE"
+
+    deadline = time.monotonic() + 5
+
+    while any(key.endswith(":lock") for key in values) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not any(key.endswith(":lock") for key in values)
+    assert client.get("/tagged").data == b"call 2"
+
+    age(values, 61)
+    client.get("/tagged")
+
+    deadline = time.monotonic() + 5
+
+    while client.application.calls < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert client.application.calls == 3
@@ -0,0 +1,117 @@
+"""Response compression middleware tests"""
+
+import gzip
+import json
+
+import pytest
+from flask import Flask, Response
+from prometheus_client import REGISTRY
+
+from src.middlewares.compression import compression
+
+BODY = json.dumps({"records": [{"index": index, "name": "record"} for index in range(200)]})
+
+
+@pytest.fixture(name="client")
+def fixture_client(monkeypatch):
+    """Test client of an app that compresses its responses"""
+
+    monkeypatch.setitem(compression.CONFIG, "COMPRESSION_MIN_SIZE", "1024")
+    monkeypatch.setitem(compression.CONFIG, "COMPRESSION_MIMETYPES", "application/json")
+
+    app = Flask(__name__)
+    app.after_request(compression.compress_response)
+
+    @app.route("/large")
+    def large():
+        res = Response(BODY, mimetype="application/json")
+        res.set_etag("v1")
+        return res
+
+    @app.route("/weak")
+    def weak():
+        res = Response(BODY, mimetype="application/json")
+        res.set_etag("v1", weak=True)
+        return res
+
+    @app.route("/small")
+    def small():
+        return Response("{}", mimetype="application/json")
+
+    @app.route("/text")
+    def text():
+        return Response(BODY, mimetype="text/plain")
+
+    @app.route("/streamed")
+    def streamed():
+        return Response((chunk for chunk in [BODY]), mimetype="application/json")
+
+    @app.route("/not-modified")
+    def not_modified():
+        return Response(status=304, headers={"ETag": '"v1"'})
+
+    return app.test_client()
+
+
+def compressed_bytes(encoding: str):
+    """
+    Read the compressed bytes counter
+    :param encoding: Content encoding
+    :return: float
+    """
+
+    return REGISTRY.get_sample_value("http_compression_output_bytes_total", {"encoding": encoding}) or 0
+
+
+def test_gzip_is_negotiated(client):
+    """Clients accepting gzip get a compressed body that varies by Accept-Encoding"""
+
+    before = compressed_bytes("gzip")
+    res = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["Vary"]
+    assert gzip.decompress(res.data).decode("utf-8") == BODY
+    assert compressed_bytes("gzip") == before + len(res.data)
+
+
+@pytest.mark.parametrize("accept_encoding", [None, "identity", "gzip;q=0", "compress"])
+def test_identity_responses_vary_by_encoding(client, accept_encoding):
+    """Eligible responses sent uncompressed still vary by Accept-Encoding"""
+
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+    res = client.get("/large", headers=headers)
+
+    assert "Content-Encoding" not in res.headers
+    assert "Accept-Encoding" in res.headers["Vary"]
+    assert res.data.decode("utf-8") == BODY
+
+
+@pytest.mark.parametrize("path", ["/small", "/text", "/streamed", "/not-modified"])
+def test_not_eligible_responses_are_untouched(client, path):
+    """Small bodies, other mimetypes, streamed and 304 responses are sent as they are"""
+
+    res = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in res.headers
+    assert "Vary" not in res.headers
+
+
+def test_min_size_is_configurable(client, monkeypatch):
+    """Bodies smaller than COMPRESSION_MIN_SIZE bytes are not compressed"""
+
+    monkeypatch.setitem(compression.CONFIG, "COMPRESSION_MIN_SIZE", str(len(BODY) + 1))
+
+    assert "Content-Encoding" not in client.get("/large", headers={"Accept-Encoding": "gzip"}).headers
+
+    monkeypatch.setitem(compression.CONFIG, "COMPRESSION_MIN_SIZE", str(len(BODY)))
+
+    assert client.get("/large", headers={"Accept-Encoding": "gzip"}).headers["Content-Encoding"] == "gzip"
+
+
+def test_strong_etags_get_the_encoding_suffix(client):
+    """Compressed representations get their own strong ETag, weak ETags are kept"""
+
+    assert client.get("/large", headers={"Accept-Encoding": "gzip"}).headers["ETag"] == '"v1-gzip"'
+    assert client.get("/large").headers["ETag"] == '"v1"'
+    assert client.get("/weak", headers={"Accept-Encoding": "gzip"}).headers["ETag"] == 'W/"v1"'
@@ -0,0 +1,85 @@
+"""Conditional GET responses tests"""
+
+import pytest
+from flask import Flask
+
+import src.commons.http.http as http
+
+BODY = {"price": 35}
+
+
+@pytest.fixture(name="app")
+def fixture_app():
+    """App with a route answered with an ETag built from its body"""
+
+    app = Flask(__name__)
+
+    @app.route("/price", methods=["GET", "HEAD", "PUT"])
+    def price():
+        return http.json(body=dict(BODY), etag=True, headers={"Vary": "Authorization"})
+
+    return app
+
+
+@pytest.fixture(name="tag")
+def fixture_tag():
+    """ETag of the route body"""
+
+    return http.etag_for(body=http._build_json(BODY))
+
+
+def test_matching_etag_is_not_modified(app, tag):
+    """A client with the current ETag gets a 304 with the validators and Vary of the full response"""
+
+    res = app.test_client().get("/price", headers={"If-None-Match": f'"{tag}"'})
+
+    assert res.status_code == 304
+    assert res.data == b""
+    assert res.headers["ETag"] == f'"{tag}"'
+    assert res.headers["Cache-Control"] == http.CONFIG.get("HTTP_CACHE_CONTROL", "no-cache")
+    assert res.headers["Vary"] == "Authorization"
+
+
+def test_mismatching_etag_gets_the_body(app, tag):
+    """A client with an old ETag gets the full response with the current ETag"""
+
+    res = app.test_client().get("/price", headers={"If-None-Match": '"old"'})
+
+    assert res.status_code == 200
+    assert res.json == BODY
+    assert res.headers["ETag"] == f'"{tag}"'
+
+
+@pytest.mark.parametrize("if_none_match", ['"{tag}-gzip"', 'W/"{tag}-gzip"', '"other", "{tag}-br"', "*"])
+def test_compressed_etags_match(app, tag, if_none_match):
+    """ETags of compressed representations, weak ETags and wildcards match the resource"""
+
+    res = app.test_client().get("/price", headers={"If-None-Match": if_none_match.format(tag=tag)})
+
+    assert res.status_code == 304
+
+
+def test_head_is_not_modified(app, tag):
+    """HEAD requests are conditional too"""
+
+    assert app.test_client().head("/price", headers={"If-None-Match": f'"{tag}"'}).status_code == 304
+
+
+def test_other_methods_are_not_conditional(app, tag):
+    """Only GET and HEAD are answered with 304"""
+
+    res = app.test_client().put("/price", headers={"If-None-Match": f'"{tag}"'})
+
+    assert res.status_code == 200
+    assert res.json == BODY
+
+
+def test_app_context_without_request(app):
+    """Responses built outside a request, like in CLI commands or background jobs, are never conditional"""
+
+    headers = {}
+
+    with app.app_context():
+        assert http.not_modified(version="v1", headers=headers) is None
+
+    assert headers["ETag"] == f'"{http.etag_for(version="v1")}"'
@@ -0,0 +1,110 @@
+"""Configuration registry tests"""
+
+import threading
+
+import pytest
+
+from src.config import config
+
+
+@pytest.fixture(name="source")
+def fixture_source(monkeypatch):
+    """Replace the configuration source by a mutable dict and restore the registry afterwards"""
+
+    source = {"APP_NAME": "test", "LOG_LEVEL": "INFO"}
+    saved = dict(config._CONFIG)
+
+    monkeypatch.setattr(config, "_resolve", lambda: dict(source))
+    monkeypatch.setattr(config, "_CALLBACKS", [])
+    config.load(refresh=True)
+
+    yield source
+
+    config.stop_refresh()
+    config._CONFIG.clear()
+    config._CONFIG.update(saved)
+
+
+def test_load_returns_the_same_instance(source):
+    """Configuration is resolved once and shared"""
+
+    first = config.load()
+    source["APP_NAME"] = "changed"
+
+    assert config.load() is first
+    assert first["APP_NAME"] == "test"
+
+
+def test_refresh_updates_the_shared_instance(source):
+    """A refresh updates values in place and removes keys that are not in the source anymore"""
+
+    shared = config.load()
+    source["APP_NAME"] = "changed"
+    del source["LOG_LEVEL"]
+
+    assert config.reload() is shared
+    assert shared == {"APP_NAME": "changed"}
+
+
+def test_refresh_never_exposes_missing_keys(monkeypatch, source):
+    """Readers do not see missing keys while the configuration is being refreshed"""
+
+    shared = config.load()
+    seen = []
+
+    class Probe:
+        """Value that checks the shared configuration when a refresh releases it"""
+
+        def __del__(self):
+            seen.append("APP_NAME" in shared)
+
+    monkeypatch.setattr(config, "_resolve", lambda: dict(source, PROBE=Probe()))
+
+    for _ in range(3):
+        config.reload()
+
+    assert seen and all(seen)
+
+
+def test_on_change_receives_changed_keys(source):
+    """Callbacks are notified only with the keys that changed"""
+
+    calls = []
+    config.on_change(lambda changed, current: calls.append((changed, current["APP_NAME"])))
+
+    config.reload()
+    source["APP_NAME"] = "changed"
+    config.reload()
+
+    assert calls == [({"APP_NAME"}, "changed")]
+
+
+def test_failing_callback_does_not_stop_others(source):
+    """Errors of a callback are counted and the next callbacks are still executed"""
+
+    calls = []
+    errors = config.load_stats()["errors"]
+
+    @config.on_change
+    def failing(changed, current):
+        raise ValueError("callback error")
+
+    config.on_change(lambda changed, current: calls.append(changed))
+    source["LOG_LEVEL"] = "DEBUG"
+    config.reload()
+
+    assert calls == [{"LOG_LEVEL"}]
+    assert config.load_stats()["errors"] == errors + 1
+
+
+def test_background_refresh_applies_changes(source):
+    """The refresh thread reloads the configuration every TTL seconds"""
+
+    changed = threading.Event()
+    config.on_change(lambda keys, current: changed.set())
+
+    config.start_refresh(0.01)
+    source["APP_NAME"] = "refreshed"
+
+    assert changed.wait(2)
+    assert config.load()["APP_NAME"] == "refreshed"
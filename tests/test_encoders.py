@@ -0,0 +1,89 @@
+"""JSON response encoders tests"""
+
+import dataclasses
+import datetime
+import decimal
+import json
+
+import pytest
+
+import src.commons.http.encoders as encoders
+from src.commons.http.encoders import OrjsonEncoder, StdlibEncoder, orjson
+
+Point = dataclasses.make_dataclass("Point", ["x", "y"])
+
+ENCODERS = [StdlibEncoder, pytest.param(OrjsonEncoder, marks=pytest.mark.skipif(orjson is None, reason="no orjson"))]
+
+
+@pytest.mark.parametrize("encoder", ENCODERS)
+def test_extra_types(encoder):
+    """Dates and decimals are serialized by every encoder"""
+
+    data = {"date": datetime.date(2021, 3, 1), "cost": decimal.Decimal("35.5")}
+
+    assert json.loads(encoder.dumps(data)) == {"date": "2021-03-01", "cost": 35.5}
+
+
+@pytest.mark.parametrize("encoder", ENCODERS)
+def test_integers_wider_than_64_bits(encoder):
+    """Big integers are serialized as the standard library does"""
+
+    data = {"id": 2 ** 70, "ids": [1, -2 ** 65]}
+
+    assert encoder.dumps(data) == StdlibEncoder.dumps(data)
+
+
+@pytest.mark.skipif(orjson is None, reason="no orjson")
+def test_orjson_writes_nan_as_null():
+    """orjson writes non finite floats as null instead of the invalid NaN and Infinity tokens"""
+
+    assert json.loads(OrjsonEncoder.dumps({"value": float("nan"), "limit": float("inf")})) == {
+        "value": None,
+        "limit": None,
+    }
+
+
+@pytest.mark.parametrize("encoder", ENCODERS)
+def test_datetimes_keep_their_string_format(encoder):
+    """Datetimes are written as str(value), with a space between date and time, by every encoder"""
+
+    moment = datetime.datetime(2021, 3, 1, 10, 30, tzinfo=datetime.timezone.utc)
+    data = {"at": datetime.datetime(2021, 3, 1, 10, 30), "zoned": moment, "time": datetime.time(10, 30)}
+
+    assert json.loads(encoder.dumps(data)) == {
+        "at": "2021-03-01 10:30:00",
+        "zoned": "2021-03-01 10:30:00+00:00",
+        "time": "10:30:00",
+    }
+
+
+def test_encoder_is_selected_again_when_config_changes(monkeypatch):
+    """A refreshed HTTP_JSON_ENCODER replaces the active encoder"""
+
+    monkeypatch.setitem(encoders.CONFIG, "HTTP_JSON_ENCODER", "stdlib")
+    encoders._on_config_change({"HTTP_JSON_ENCODER"}, encoders.CONFIG)
+
+    assert encoders.get_encoder() is StdlibEncoder
+
+    monkeypatch.setitem(encoders.CONFIG, "HTTP_JSON_ENCODER", "custom")
+    encoders.register_encoder(type("CustomEncoder", (), {"name": "custom", "dumps": staticmethod(lambda data: b"")}))
+    encoders.get_encoder()
+    monkeypatch.setitem(encoders.CONFIG, "HTTP_JSON_ENCODER", "stdlib")
+
+    assert encoders.get_encoder().name == "custom"
+
+    encoders._on_config_change({"HTTP_JSON_ENCODER"}, encoders.CONFIG)
+
+    assert encoders.get_encoder() is StdlibEncoder
+
+    monkeypatch.undo()
+    encoders._on_config_change({"HTTP_JSON_ENCODER"}, encoders.CONFIG)
+
+
+@pytest.mark.parametrize("encoder", ENCODERS)
+def test_dataclasses_keep_their_string_format(encoder):
+    """Dataclasses are written as str(value) by every encoder"""
+
+    point = Point(1, 2)
+
+    assert json.loads(encoder.dumps({"point": point})) == {"point": str(point)}
@@ -0,0 +1,150 @@
+"""Concurrent service calls tests, against a local HTTP server"""
+
+import contextvars
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import src.commons.context as context
+import src.commons.utils as utils
+import src.commons.utils.utils as utils_module
+from src.commons.errors import HandlerError
+
+SLOW_SECONDS = 2
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Answer /ok/<n> with the request Trace-Id, /fail with a service error and /slow after SLOW_SECONDS"""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path == "/slow":
+            time.sleep(SLOW_SECONDS)
+
+        if self.path == "/fail":
+            self._send(500, {"error": "internal-error", "message": "Broken", "root_causes": None})
+            return
+
+        self._send(200, {"path": self.path, "trace_id": self.headers.get("Trace-Id")})
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(name="url")
+def fixture_url():
+    """Base URL of a running local server"""
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+    utils.reset_sessions()
+
+
+def call_before(expires_at: float, spec: dict):
+    """
+    Execute a fan out call in a copy of the current context, as the pool does, so its deadline does not leak
+    :param expires_at: time.monotonic() deadline
+    :param spec: `call_service` arguments
+    :return: Tuple of status code and json response
+    """
+
+    return contextvars.copy_context().run(utils_module._call_before, expires_at, spec)
+
+
+def test_results_keep_the_order_of_calls(url):
+    """Every call result is returned at the position of its call"""
+
+    results = utils.call_service_many([
+        {"method": "GET", "resource": f"{url}/ok/{index}", "service_name": "fanout-order"} for index in range(5)
+    ])
+
+    assert [result.body["path"] for result in results] == [f"/ok/{index}" for index in range(5)]
+    assert {result.status_code for result in results} == {200}
+
+
+def test_failed_calls_return_their_error(url):
+    """A failed call does not affect the others, its result has the raised error"""
+
+    results = utils.call_service_many([
+        {"method": "GET", "resource": f"{url}/ok/1", "service_name": "fanout-errors"},
+        {"method": "GET", "resource": f"{url}/fail", "service_name": "fanout-errors"},
+    ])
+
+    assert results[0].status_code == 200
+    assert results[0].error is None
+    assert results[1].status_code is None
+    assert results[1].error.code == 500
+
+
+def test_late_calls_return_gateway_timeout(url):
+    """Calls that do not end before the deadline are answered with a 504 error without waiting for them"""
+
+    start = time.monotonic()
+
+    results = utils.call_service_many([
+        {"method": "GET", "resource": f"{url}/ok/1", "service_name": "fanout-deadline"},
+        {"method": "GET", "resource": f"{url}/slow", "service_name": "fanout-deadline"},
+    ], deadline=0.5)
+
+    assert time.monotonic() - start < SLOW_SECONDS
+    assert results[0].status_code == 200
+    assert results[1].error.code == 504
+    assert results[1].error.message == "gateway-timeout"
+
+
+def test_late_calls_are_aborted_at_the_deadline(url):
+    """The attempts and retries of a late call end at the deadline, so the call does not keep its worker"""
+
+    start = time.monotonic()
+
+    with pytest.raises(requests.exceptions.RequestException):
+        call_before(time.monotonic() + 0.3, {"method": "GET", "resource": f"{url}/slow", "service_name": "fanout-abort"})
+
+    assert time.monotonic() - start < 0.8
+
+
+def test_calls_queued_past_the_deadline_are_not_executed(url):
+    """Calls that would start after the deadline fail without being sent"""
+
+    with pytest.raises(HandlerError) as error:
+        call_before(time.monotonic() - 1, {"method": "GET", "resource": f"{url}/ok/1"})
+
+    assert error.value.code == 504
+
+
+def test_calls_forward_the_trace_id(url):
+    """Calls executed by the pool send the Trace-Id of the calling request"""
+
+    token = context.begin()
+    context.set_value("trace_id", "trace-fanout")
+
+    try:
+        results = utils.call_service_many([
+            {"method": "GET", "resource": f"{url}/ok/{index}", "service_name": "fanout-trace"} for index in range(3)
+        ])
+    finally:
+        context.end(token)
+
+    assert [result.body["trace_id"] for result in results] == ["trace-fanout"] * 3
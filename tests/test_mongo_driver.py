@@ -0,0 +1,43 @@
+"""Mongo driver client rotation tests"""
+
+import pytest
+
+from src.commons.drivers.mongo import mongo
+
+
+@pytest.fixture(name="resets")
+def fixture_resets(monkeypatch):
+    """Count client resets"""
+
+    resets = []
+    monkeypatch.setattr(mongo, "reset_client", lambda: resets.append(True))
+
+    return resets
+
+
+@pytest.mark.parametrize("key", ["MONGO_URL", *mongo.POOL_OPTIONS])
+def test_connection_settings_rotate_the_client(resets, key):
+    """Changing the URL or any pool option opens a new client"""
+
+    mongo._on_config_change({key}, {})
+
+    assert resets == [True]
+
+
+def test_other_settings_keep_the_client(resets):
+    """Unrelated changes keep the current client"""
+
+    mongo._on_config_change({"MONGO_DB", "LOG_LEVEL"}, {})
+
+    assert not resets
+
+
+def test_pool_options(monkeypatch):
+    """Configured pool options are passed to the client, empty ones are left to pymongo defaults"""
+
+    monkeypatch.setitem(mongo.CONFIG, "MONGO_MAX_POOL_SIZE", "20")
+    monkeypatch.setitem(mongo.CONFIG, "MONGO_MIN_POOL_SIZE", "")
+    monkeypatch.setitem(mongo.CONFIG, "MONGO_WAIT_QUEUE_TIMEOUT_MS", "500")
+    monkeypatch.delitem(mongo.CONFIG, "MONGO_MAX_IDLE_TIME_MS", raising=False)
+
+    assert mongo._pool_options() == {"maxPoolSize": 20, "waitQueueTimeoutMS": 500}
@@ -0,0 +1,152 @@
+"""Connection pool tests"""
+
+import itertools
+import threading
+
+import pytest
+
+from src.commons.errors import PoolTimeoutError
+from src.commons.pool import ConnectionPool
+
+
+class Connection:
+    """Fake connection"""
+
+    _ids = itertools.count()
+
+    def __init__(self):
+        self.id = next(self._ids)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FlakyFactory:
+    """Connection factory that fails on the given calls"""
+
+    def __init__(self, failures=()):
+        self.calls = 0
+        self.failures = set(failures)
+
+    def __call__(self):
+        self.calls += 1
+
+        if self.calls in self.failures:
+            raise ConnectionError("connection refused")
+
+        return Connection()
+
+
+def test_released_connections_are_reused():
+    """The last released connection is borrowed again"""
+
+    pool = ConnectionPool(Connection, max_size=2)
+
+    first = pool.acquire()
+    pool.release(first)
+
+    assert pool.acquire() is first
+    assert pool.stats()["created"] == 1
+
+
+def test_acquire_times_out_when_exhausted():
+    """Checkouts wait for a free connection until the timeout"""
+
+    pool = ConnectionPool(Connection, max_size=1, timeout=0.01)
+    pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiting_checkout_gets_released_connection():
+    """A connection released by another thread wakes up a waiting checkout"""
+
+    pool = ConnectionPool(Connection, max_size=1, timeout=2)
+    conn = pool.acquire()
+
+    timer = threading.Timer(0.05, pool.release, args=(conn,))
+    timer.start()
+
+    assert pool.acquire() is conn
+    timer.join()
+
+
+def test_unhealthy_connections_are_replaced():
+    """Connections that fail the check are closed and a new one is opened"""
+
+    pool = ConnectionPool(Connection, check=lambda conn: False)
+
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+
+    assert second is not first
+    assert first.closed
+    assert pool.stats()["size"] == 1
+
+
+def test_failed_reset_discards_the_connection():
+    """Connections that can not be reset are closed instead of returned"""
+
+    def reset(conn):
+        raise RuntimeError("reset failed")
+
+    pool = ConnectionPool(Connection, reset=reset)
+
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert conn.closed
+    assert pool.stats()["size"] == 0
+
+
+def test_failed_create_frees_the_slot():
+    """A connection error does not consume pool capacity"""
+
+    pool = ConnectionPool(FlakyFactory(failures={1}), max_size=1, timeout=0)
+
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+
+    assert pool.acquire() is not None
+
+
+def test_failed_fill_keeps_the_pool_capacity():
+    """Slots of a fill interrupted by a connection error are given back"""
+
+    factory = FlakyFactory(failures={2})
+    pool = ConnectionPool(factory, max_size=3, min_size=3, timeout=0)
+
+    with pytest.raises(ConnectionError):
+        pool.fill()
+
+    assert pool.stats()["size"] == 1
+
+    pool.fill()
+
+    assert pool.stats()["size"] == 3
+    assert pool.stats()["idle"] == 3
+
+
+def test_close_all_closes_borrowed_connections_on_release():
+    """Connections borrowed when the pool is closed are closed when they come back"""
+
+    pool = ConnectionPool(Connection)
+
+    idle = pool.acquire()
+    borrowed = pool.acquire()
+    pool.release(idle)
+
+    pool.close_all()
+
+    assert idle.closed
+    assert not borrowed.closed
+
+    pool.release(borrowed)
+
+    assert borrowed.closed
+    assert pool.stats()["size"] == 0
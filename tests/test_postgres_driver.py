@@ -0,0 +1,85 @@
+"""Postgres driver pool usage tests"""
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+
+import src.commons.metrics as metrics
+from src.commons.drivers.postgres import postgres
+
+
+class Cursor:
+    """Fake psycopg2 cursor"""
+
+    def close(self):
+        pass
+
+
+class Connection:
+    """Fake psycopg2 connection, its cursor can be made to fail"""
+
+    def __init__(self, broken: bool = False):
+        self.broken = broken
+        self.closed = 0
+        self.autocommit = False
+        self.checked_at = 0.0
+
+    def cursor(self):
+        if self.broken:
+            self.closed = 2
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        return Cursor()
+
+    def get_transaction_status(self):
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture(name="connections")
+def fixture_connections(monkeypatch):
+    """Pool of one connection opened by a fake factory"""
+
+    connections = []
+
+    def connect():
+        connections.append(Connection(broken=len(connections) == 0))
+        return connections[-1]
+
+    monkeypatch.setattr(postgres, "_connect", connect)
+    monkeypatch.setitem(postgres.CONFIG, "DATABASE_COMMIT", "false")
+    monkeypatch.setitem(postgres.CONFIG, "POSTGRES_POOL_MAX", 1)
+    monkeypatch.setitem(postgres.CONFIG, "POSTGRES_POOL_TIMEOUT", 0)
+    postgres.reset_pool()
+
+    yield connections
+
+    postgres.reset_pool()
+
+
+def test_failed_cursor_returns_the_connection(connections):
+    """A connection whose cursor fails gives its slot back to the pool"""
+
+    with pytest.raises(psycopg2.OperationalError):
+        postgres.Postgres()
+
+    with postgres.Postgres():
+        pass
+
+    stats = postgres.pool_stats()
+
+    assert stats["size"] == 1
+    assert stats["in_use"] == 0
+
+
+def test_pool_utilization_is_exported(connections):
+    """Pool gauges follow connections borrowed and returned"""
+
+    connections.append(Connection())
+
+    with postgres.Postgres():
+        assert b'db_pool_connections{pool="postgres",state="in_use"} 1.0' in metrics.render()
+
+    assert b'db_pool_connections{pool="postgres",state="in_use"} 0.0' in metrics.render()
+    assert b'db_pool_max_connections{pool="postgres"} 1.0' in metrics.render()
@@ -0,0 +1,84 @@
+"""SQL statements log tests"""
+
+import logging
+import sqlite3
+
+import pytest
+
+import src.commons.querylog as querylog
+from src.commons.logging import logger
+from src.commons.querylog import querylog as module
+
+
+class RecordsHandler(logging.Handler):
+    """Keep emitted records"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+
+@pytest.fixture(name="records")
+def fixture_records(monkeypatch):
+    """Records emitted by the app logger, with a query log where every statement is slow"""
+
+    monkeypatch.setitem(module.CONFIG, "QUERY_LOG", "true")
+    monkeypatch.setitem(module.CONFIG, "SLOW_QUERY_MS", "0")
+    monkeypatch.setitem(module.CONFIG, "SLOW_QUERY_EXPLAIN", "true")
+    querylog.reset_stats()
+
+    handler = RecordsHandler()
+    logger.logger.addHandler(handler)
+
+    yield handler.records
+
+    logger.logger.removeHandler(handler)
+    querylog.reset_stats()
+
+
+def slow_queries(records: list):
+    """
+    Filter slow query records
+    :param records: Emitted records
+    :return: list of records
+    """
+
+    return [record for record in records if record.getMessage() == "slow query"]
+
+
+def test_statements_are_aggregated_by_shape(records):
+    """Executions with different values are counted together and slow ones are logged with their plan"""
+
+    for value in (1, 2):
+        with querylog.timed("sqlite", f"SELECT * FROM prices WHERE id = {value}", lambda: ["SCAN prices"]):
+            pass
+
+    statement = querylog.query_stats()["statements"][0]
+
+    assert statement["statement"] == "SELECT * FROM prices WHERE id = ?"
+    assert statement["count"] == 2
+    assert statement["errors"] == 0
+    assert statement["query_plan"] == ["SCAN prices"]
+    assert len(slow_queries(records)) == 2
+
+
+def test_failed_statements_are_recorded(records):
+    """Statements that raise are measured, counted as errors and logged, without capturing their plan"""
+
+    explained = []
+
+    with pytest.raises(sqlite3.OperationalError):
+        with querylog.timed("sqlite", "UPDATE prices SET cost = 1", lambda: explained.append(True)):
+            raise sqlite3.OperationalError("database is locked")
+
+    statement = querylog.query_stats(order_by="errors")["statements"][0]
+
+    assert statement["statement"] == "UPDATE prices SET cost = ?"
+    assert statement["count"] == 1
+    assert statement["errors"] == 1
+    assert statement["query_plan"] is None
+    assert not explained
+    assert slow_queries(records)[0].failed is True
@@ -0,0 +1,106 @@
+"""In memory reference tables index tests"""
+
+import os
+import pathlib
+import sqlite3
+from datetime import date
+
+import pytest
+
+import src.adapters.reference as reference
+from src.adapters.reference import reference as module
+
+ROOT = pathlib.Path(__file__).parent.parent.absolute()
+
+SCHEMA = """
+CREATE TABLE base_price (pass_id INTEGER PRIMARY KEY, type VARCHAR(255) NOT NULL UNIQUE, cost INTEGER NOT NULL);
+CREATE TABLE holidays (holiday DATE NOT NULL, description VARCHAR(255));
+INSERT INTO base_price (type, cost) VALUES ('1jour', 35), ('night', 19);
+INSERT INTO holidays (holiday, description) VALUES ('2019-02-18', 'winter'), ('2019-02-25', 'winter');
+"""
+
+
+@pytest.fixture(name="database")
+def fixture_database(tmp_path, monkeypatch):
+    """Unpooled SQLite file with the reference tables, checked for changes on every lookup"""
+
+    path = tmp_path / "lift_pass.db"
+
+    with sqlite3.connect(path) as connection:
+        connection.executescript(SCHEMA)
+
+    connection.close()
+
+    monkeypatch.setitem(module.CONFIG, "SQLITE_FILE", os.path.relpath(path, ROOT))
+    monkeypatch.setitem(module.CONFIG, "SQLITE_COMMIT", "false")
+    monkeypatch.setitem(module.CONFIG, "SQLITE_POOL_SIZE", "0")
+    monkeypatch.setitem(module.CONFIG, "REFERENCE_CACHE_CHECK_INTERVAL", "0")
+    reference.invalidate()
+
+    yield path
+
+    reference.invalidate()
+
+
+def execute(path: pathlib.Path, statement: str):
+    """
+    Change the database outside of the app and move its modification time forward
+    :param path: SQLite file
+    :param statement: SQL statement
+    """
+
+    with sqlite3.connect(path) as connection:
+        connection.execute(statement)
+
+    connection.close()
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_index_hits_and_misses(database):
+    """Loaded tables answer lookups of known and unknown keys"""
+
+    prices = reference.price_by_lift_type()
+    holidays = reference.holiday_ordinals()
+
+    assert prices["1jour"].cost == 35
+    assert prices["night"] == module.Price(pass_id=2, lift_type="night", cost=19)
+    assert prices.get("unknown") is None
+    assert date(2019, 2, 18).toordinal() in holidays
+    assert date(2019, 2, 19).toordinal() not in holidays
+    assert reference.index_stats()["prices"] == 2
+
+
+def test_tables_are_loaded_once(database):
+    """Lookups of an unchanged database reuse the loaded snapshot"""
+
+    loads = reference.index_stats()["loads"]
+
+    reference.holiday_ordinals()
+    reference.price_by_lift_type()
+
+    assert reference.index_stats()["loads"] == loads + 1
+
+
+def test_database_changes_reload_the_tables(database):
+    """A newer database file modification time loads the tables again"""
+
+    assert date(2019, 3, 4).toordinal() not in reference.holiday_ordinals()
+
+    execute(database, "INSERT INTO holidays (holiday, description) VALUES ('2019-03-04', 'winter')")
+
+    assert date(2019, 3, 4).toordinal() in reference.holiday_ordinals()
+
+
+def test_invalidate_reloads_the_tables(database):
+    """Invalidated tables are loaded again on next lookup"""
+
+    reference.price_by_lift_type()
+    loads = reference.index_stats()["loads"]
+
+    reference.invalidate()
+
+    assert "prices" not in reference.index_stats()
+    assert reference.price_by_lift_type()["1jour"].cost == 35
+    assert reference.index_stats()["loads"] == loads + 1
@@ -0,0 +1,23 @@
+"""Compiled JSON schema cache tests"""
+
+import src.commons.utils as utils
+
+SCHEMA = {"type": "object", "properties": {"age": {"type": "integer"}}}
+
+
+def test_schemas_are_compiled_once():
+    """Equal schemas share the same compiled validator"""
+
+    utils.clear_schema_cache()
+
+    assert utils.compile_schema(SCHEMA) is utils.compile_schema(dict(SCHEMA))
+    assert utils.schema_cache_stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+
+
+def test_clear_resets_validators_and_stats():
+    """Clearing the cache also resets its counters"""
+
+    utils.compile_schema(SCHEMA)
+    utils.clear_schema_cache()
+
+    assert utils.schema_cache_stats() == {"hits": 0, "misses": 0, "evictions": 0, "size": 0}
@@ -0,0 +1,51 @@
+"""JSON schema middleware tests"""
+
+import pytest
+from flask import Flask
+
+from src.middlewares.schema import json_schema
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"type": {"type": "string"}},
+    "required": ["type"],
+}
+
+
+@pytest.fixture(name="client")
+def fixture_client():
+    """Test client of an app with one validated route"""
+
+    app = Flask(__name__)
+
+    @app.route("/prices", methods=["POST"])
+    @json_schema(SCHEMA)
+    def create():
+        return "created"
+
+    return app.test_client()
+
+
+def test_valid_body_reaches_the_route(client):
+    """Valid bodies are passed to the route"""
+
+    response = client.post("/prices", json={"type": "1jour"})
+
+    assert response.status_code == 200
+
+
+def test_invalid_body_is_a_bad_request(client):
+    """Bodies that do not match the schema are rejected"""
+
+    response = client.post("/prices", json={"age": 3})
+
+    assert response.status_code == 400
+
+
+def test_malformed_json_is_a_bad_request(client):
+    """Bodies that are not JSON are rejected as client errors"""
+
+    response = client.post("/prices", data="{not json", content_type="application/json")
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "bad-request"
@@ -0,0 +1,188 @@
+"""Service calls circuit breaker tests"""
+
+import pytest
+
+import src.commons.utils.service as service_module
+import src.commons.utils.utils as utils
+from src.commons.errors import CircuitOpenError
+from src.commons.utils.service import CircuitBreaker
+
+
+class Response:
+    """Fake requests response"""
+
+    def __init__(self, status_code: int = 200, body: dict = None):
+        self.status_code = status_code
+        self.body = body if body is not None else {"data": "ok"}
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture(name="clock")
+def fixture_clock(monkeypatch):
+    """Controlled monotonic clock of the breakers"""
+
+    now = [1000.0]
+    monkeypatch.setattr("src.commons.utils.service.time.monotonic", lambda: now[0])
+
+    return now
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    """Calls are rejected once the failures threshold is reached"""
+
+    breaker = CircuitBreaker("prices", failures=2, reset_timeout=10)
+
+    breaker.before_call()
+    breaker.failure()
+    breaker.before_call()
+    breaker.failure()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    assert breaker.stats() == {"state": "open", "consecutive_failures": 2, "rejected": 1}
+
+
+def test_success_resets_consecutive_failures(clock):
+    """Only consecutive failures open the circuit"""
+
+    breaker = CircuitBreaker("prices", failures=2, reset_timeout=10)
+
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    breaker.before_call()
+
+    assert breaker.stats()["state"] == "closed"
+
+
+def test_half_open_allows_a_single_trial(clock):
+    """After the reset timeout one trial call is allowed, a successful one closes the circuit"""
+
+    breaker = CircuitBreaker("prices", failures=1, reset_timeout=10)
+    breaker.failure()
+
+    clock[0] += 10
+    breaker.before_call()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.success()
+    breaker.before_call()
+
+    assert breaker.stats()["state"] == "closed"
+
+
+def test_failed_trial_opens_the_circuit_again(clock):
+    """A failed trial call keeps rejecting calls for another reset timeout"""
+
+    breaker = CircuitBreaker("prices", failures=3, reset_timeout=10)
+
+    for _ in range(3):
+        breaker.failure()
+
+    clock[0] += 10
+    breaker.before_call()
+    breaker.failure()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+@pytest.fixture(name="service")
+def fixture_service(monkeypatch, clock):
+    """Breaker of a test service, its calls are answered by the returned list of results"""
+
+    results = []
+
+    def execute(method, options):
+        result = results.pop(0)
+
+        if isinstance(result, BaseException):
+            raise result
+
+        return result
+
+    monkeypatch.setattr(utils, "_execute_request", execute)
+    monkeypatch.setattr(utils, "get_breaker", lambda name: breaker)
+
+    breaker = CircuitBreaker("test-service", failures=1, reset_timeout=10)
+
+    return breaker, results
+
+
+def test_call_service_records_server_errors(service):
+    """5xx responses count as failures"""
+
+    breaker, results = service
+    results.append(Response(503, {"error": "unavailable", "message": "down", "root_causes": None}))
+
+    with pytest.raises(Exception):
+        utils.call_service("GET", "http://service/prices", service_name="test-service")
+
+    assert breaker.stats()["state"] == "open"
+
+
+def test_call_service_resolves_trial_on_unexpected_errors(service, clock):
+    """A trial call that fails with any error opens the circuit again instead of blocking it in half-open"""
+
+    breaker, results = service
+    breaker.failure()
+    clock[0] += 10
+
+    results.append(ValueError("bad encoding"))
+
+    with pytest.raises(ValueError):
+        utils.call_service("GET", "http://service/prices", service_name="test-service")
+
+    assert breaker.stats()["state"] == "open"
+
+    clock[0] += 10
+    results.append(Response(200))
+
+    assert utils.call_service("GET", "http://service/prices", service_name="test-service") == (200, {"data": "ok"})
+    assert breaker.stats()["state"] == "closed"
+
+
+@pytest.mark.parametrize("error", [KeyboardInterrupt(), SystemExit(), GeneratorExit()])
+def test_call_service_releases_interrupted_trials(service, clock, error):
+    """An interrupted trial call is not a failure, the next call is a trial again"""
+
+    breaker, results = service
+    breaker.failure()
+    clock[0] += 10
+
+    results.append(error)
+
+    with pytest.raises(type(error)):
+        utils.call_service("GET", "http://service/prices", service_name="test-service")
+
+    assert breaker.stats() == {"state": "open", "consecutive_failures": 1, "rejected": 0}
+
+    results.append(Response(200))
+
+    assert utils.call_service("GET", "http://service/prices", service_name="test-service") == (200, {"data": "ok"})
+    assert breaker.stats()["state"] == "closed"
+
+
+def test_interrupted_calls_are_not_failures(service):
+    """Calls interrupted on a closed circuit do not count towards opening it"""
+
+    breaker, results = service
+    results.append(KeyboardInterrupt())
+
+    with pytest.raises(KeyboardInterrupt):
+        utils.call_service("GET", "http://service/prices", service_name="test-service")
+
+    assert breaker.stats() == {"state": "closed", "consecutive_failures": 0, "rejected": 0}
+
+
+def test_sessions_block_on_a_full_pool():
+    """Session pools never open more than HTTP_POOL_SIZE connections per host"""
+
+    adapter = service_module._build_session().get_adapter("http://service/prices")
+
+    assert adapter._pool_block is True
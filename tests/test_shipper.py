@@ -0,0 +1,192 @@
+"""Asynchronous Elasticsearch log shipping tests, against a local bulk API stand-in"""
+
+import logging
+import threading
+import time
+
+import pytest
+
+from src.commons.logging.shipper import ElasticShipper
+from tests.stubs import ElasticBulkStub
+
+
+@pytest.fixture(name="elastic")
+def fixture_elastic():
+    """Running bulk API stand-in"""
+
+    with ElasticBulkStub() as stub:
+        yield stub
+
+
+@pytest.fixture(name="make_shipper")
+def fixture_make_shipper():
+    """Build shippers that are closed after the test"""
+
+    shippers = []
+
+    def make(url: str, **options):
+        shippers.append(ElasticShipper(url=url, index="logs", **options))
+        return shippers[-1]
+
+    yield make
+
+    for shipper in shippers:
+        shipper.close()
+
+
+def log(shipper: ElasticShipper, count: int = 1):
+    """
+    Emit info records to a shipper
+    :param shipper: Handler that receives the records
+    :param count: Number of records
+    """
+
+    for index in range(count):
+        shipper.handle(logging.makeLogRecord({"msg": f"record {index}", "levelno": logging.INFO, "trace_id": "t"}))
+
+
+def test_records_are_sent_as_bulk_documents(elastic, make_shipper):
+    """Records are indexed with their message, level and extra fields"""
+
+    shipper = make_shipper(elastic.url, flush_interval=0.05)
+    log(shipper)
+
+    assert elastic.wait(1)
+
+    document = elastic.documents[0]
+
+    assert document["message"] == "record 0"
+    assert document["trace_id"] == "t"
+    assert "@timestamp" in document
+
+
+def test_batches_are_sent_by_size(elastic, make_shipper):
+    """A full batch is sent without waiting for the flush interval"""
+
+    shipper = make_shipper(elastic.url, batch_size=3, flush_interval=60)
+    log(shipper, 6)
+
+    assert elastic.wait(6, timeout=2)
+    assert [len(batch) for batch in elastic.batches] == [3, 3]
+
+
+def test_partial_batches_are_sent_by_interval(elastic, make_shipper):
+    """A partial batch waits at most the flush interval"""
+
+    shipper = make_shipper(elastic.url, batch_size=100, flush_interval=0.1)
+    start = time.monotonic()
+    log(shipper, 2)
+
+    assert elastic.wait(2, timeout=2)
+    assert elastic.batches == [elastic.documents]
+    assert time.monotonic() - start < 1
+
+
+def test_interval_is_kept_while_records_keep_arriving(elastic, make_shipper):
+    """The interval is counted from the first buffered record, a steady trickle does not delay the batch"""
+
+    shipper = make_shipper(elastic.url, batch_size=1000, flush_interval=0.2)
+    start = time.monotonic()
+
+    while not elastic.batches and time.monotonic() - start < 2:
+        log(shipper)
+        time.sleep(0.01)
+
+    assert elastic.batches
+    assert time.monotonic() - start < 1
+
+
+def test_full_queue_drops_records(make_shipper):
+    """Records that do not fit in the queue are dropped and counted"""
+
+    with ElasticBulkStub(delay=0.3) as elastic:
+        shipper = make_shipper(elastic.url, queue_size=2, batch_size=1, flush_interval=0.01)
+        log(shipper, 10)
+
+        assert shipper.stats()["dropped"] > 0
+        assert shipper.flush(timeout=5)
+        assert shipper.stats()["sent"] == 10 - shipper.stats()["dropped"]
+
+
+def test_full_queue_blocks_when_configured(make_shipper):
+    """Blocking shippers wait for space in the queue instead of dropping records"""
+
+    with ElasticBulkStub(delay=0.05) as elastic:
+        shipper = make_shipper(
+            elastic.url, queue_size=1, batch_size=1, flush_interval=0.01, block=True, block_timeout=5,
+        )
+        log(shipper, 5)
+
+        assert shipper.flush(timeout=5)
+
+        stats = shipper.stats()
+
+        assert stats["dropped"] == 0
+        assert stats["sent"] == 5
+
+
+def test_flush_sends_pending_records(elastic, make_shipper):
+    """Flush ships the records of a partial batch immediately"""
+
+    shipper = make_shipper(elastic.url, batch_size=100, flush_interval=60)
+    log(shipper, 3)
+
+    assert shipper.flush(timeout=2)
+    assert len(elastic.documents) == 3
+    assert shipper.stats()["pending"] == 0
+
+
+def test_close_sends_pending_records_and_stops(elastic, make_shipper):
+    """Close ships queued records, stops the worker and ignores later records"""
+
+    shipper = make_shipper(elastic.url, batch_size=100, flush_interval=60)
+    log(shipper, 3)
+
+    shipper.close()
+    log(shipper, 2)
+
+    assert len(elastic.documents) == 3
+    assert not shipper._worker.is_alive()
+    assert shipper.stats()["queued"] == 3
+
+
+def test_close_does_not_wait_for_a_stuck_worker(make_shipper, monkeypatch):
+    """Close gives up after timeout + flush interval if the worker can not take the stop signal from a full queue"""
+
+    sending = threading.Event()
+    release = threading.Event()
+
+    def send(batch):
+        sending.set()
+        release.wait(5)
+
+    shipper = make_shipper("http://127.0.0.1:9", queue_size=1, batch_size=1, flush_interval=0.05, timeout=0.2)
+    monkeypatch.setattr(shipper, "_send", send)
+    log(shipper)
+
+    assert sending.wait(2)
+
+    log(shipper)
+    start = time.monotonic()
+    closer = threading.Thread(target=shipper.close, daemon=True)
+    closer.start()
+    closer.join(2)
+    release.set()
+
+    assert not closer.is_alive()
+    assert time.monotonic() - start < 1
+
+
+def test_failed_requests_are_counted(make_shipper):
+    """Batches rejected by Elasticsearch are counted as failed"""
+
+    with ElasticBulkStub(status=500) as elastic:
+        shipper = make_shipper(elastic.url, flush_interval=0.01)
+        log(shipper, 2)
+
+        assert shipper.flush(timeout=2)
+
+        stats = shipper.stats()
+
+        assert stats["failed"] == 2
+        assert stats["sent"] == 0
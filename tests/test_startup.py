@@ -0,0 +1,65 @@
+"""App cold start tests, src.server is imported in new interpreters"""
+
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).parent.parent.absolute()
+
+# Database and cloud clients are imported on first use, importing them with the app adds 100-200 ms to every boot
+LAZY_MODULES = ("pymongo", "psycopg2", "boto3", "dns")
+
+# Max milliseconds to import the app, it depends on the machine so it is only checked when set, see make startup-budget
+STARTUP_BUDGET_MS = os.getenv("STARTUP_BUDGET_MS")
+
+# Configure the app without external services, connections are opened lazily, and measure the import of src.server
+_IMPORT_APP = """
+import time
+start = time.perf_counter()
+import json, sys
+from src.config import load
+load().update({"REDIS_HOST": "127.0.0.1", "REDIS_PASS": ""})
+import src.server
+print(json.dumps({"ms": (time.perf_counter() - start) * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+def import_app():
+    """
+    Import the app in a new interpreter
+    :return: dict with the import milliseconds and the names of the loaded modules
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-c", _IMPORT_APP],
+        cwd=str(ROOT),
+        env=dict(os.environ, STAGE="dev"),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_drivers_are_imported_on_first_use():
+    """Importing the app does not import database and cloud clients"""
+
+    modules = set(import_app()["modules"])
+
+    assert [name for name in LAZY_MODULES if name in modules] == []
+
+
+@pytest.mark.skipif(STARTUP_BUDGET_MS is None, reason="STARTUP_BUDGET_MS is not set")
+def test_cold_start_is_within_budget():
+    """Importing the app stays under the startup budget, the best of a few runs is compared"""
+
+    elapsed = min(import_app()["ms"] for _ in range(3))
+
+    assert elapsed <= float(STARTUP_BUDGET_MS), f"cold start took {elapsed:.1f} ms, budget is {STARTUP_BUDGET_MS} ms"
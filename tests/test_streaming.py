@@ -0,0 +1,143 @@
+"""Streamed JSON responses tests"""
+
+import json
+import logging
+
+import pytest
+from flask import Flask, g, request
+
+import src.commons.context as context
+import src.commons.http.http as http
+import src.commons.utils as utils
+from src.commons.errors import HandlerError
+from src.commons.logging import logger
+
+
+class RecordsHandler(logging.Handler):
+    """Keep emitted records"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+
+@pytest.fixture(name="records")
+def fixture_records():
+    """Records emitted by the app logger"""
+
+    handler = RecordsHandler()
+    logger.logger.addHandler(handler)
+
+    yield handler.records
+
+    logger.logger.removeHandler(handler)
+
+
+@pytest.fixture(name="client")
+def fixture_client():
+    """Test client of an app with request scoped context, as src.server, streaming the records of the request"""
+
+    app = Flask(__name__)
+
+    @app.before_request
+    def begin_context():
+        g.context_token = context.begin()
+        utils.store_trace_id(request.headers)
+
+    @app.teardown_request
+    def end_context(_):
+        context.end(g.pop("context_token", None))
+
+    def records():
+        """Read the request lazily, while the response is being sent"""
+
+        for index in range(int(request.args.get("count", 2))):
+            yield {"index": index}
+
+        if request.args.get("fail"):
+            raise HandlerError(code=503, message="service-unavailable", description="Source closed")
+
+    @app.route("/array")
+    def array():
+        return http.json_stream(records())
+
+    @app.route("/lines")
+    def lines():
+        return http.ndjson_stream(records())
+
+    return app.test_client()
+
+
+def test_array_framing(client):
+    """Records are sent as the elements of a JSON array"""
+
+    res = client.get("/array?count=3")
+
+    assert res.status_code == 200
+    assert res.headers["Content-Type"] == "application/json"
+    assert res.headers["X-Accel-Buffering"] == "no"
+    assert json.loads(res.data) == [{"index": 0}, {"index": 1}, {"index": 2}]
+
+
+def test_ndjson_framing(client):
+    """Records are sent one per line"""
+
+    res = client.get("/lines?count=3")
+
+    assert res.headers["Content-Type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in res.data.splitlines()] == [{"index": 0}, {"index": 1}, {"index": 2}]
+    assert res.data.endswith(b"\n")
+
+
+def test_empty_streams(client):
+    """An empty array is still valid JSON, an empty NDJSON body has no lines"""
+
+    assert json.loads(client.get("/array?count=0").data) == []
+    assert client.get("/lines?count=0").data == b""
+
+
+def test_errors_while_streaming(client, records):
+    """A failure after the response started is logged with the request trace_id and sent as the last record"""
+
+    array = json.loads(client.get("/array?fail=1", headers={"Trace-Id": "trace-stream"}).data)
+    lines = [json.loads(line) for line in client.get("/lines?fail=1").data.splitlines()]
+
+    assert array[:2] == [{"index": 0}, {"index": 1}]
+    assert array[2]["error"] == "service-unavailable"
+    assert lines[2]["error"] == "service-unavailable"
+
+    failures = [record for record in records if record.getMessage() == "streaming request failed"]
+
+    assert failures[0].trace_id == "trace-stream"
+
+
+def test_cors_headers(client, monkeypatch):
+    """Streamed responses get the CORS headers when CORS is enabled"""
+
+    monkeypatch.setitem(http.CONFIG, "CORS", "true")
+
+    res = client.get("/lines")
+
+    assert res.headers["Access-Control-Allow-Origin"] == "*"
+    assert res.headers["Access-Control-Allow-Credentials"] == "true"
+
+
+def test_first_chunk_is_sent_right_away(monkeypatch):
+    """The first record is not held back, next small records are joined until they reach the chunk size"""
+
+    monkeypatch.setitem(http.CONFIG, "HTTP_STREAM_CHUNK_SIZE", "4")
+    monkeypatch.setitem(http.CONFIG, "HTTP_STREAM_FLUSH_INTERVAL", "60")
+
+    assert list(http._buffer(iter([b"a", b"bb", b"cc", b"d"]))) == [b"a", b"bbcc", b"d"]
+
+
+def test_chunks_are_sent_by_interval(monkeypatch):
+    """Records slower than the flush interval are sent one by one"""
+
+    monkeypatch.setitem(http.CONFIG, "HTTP_STREAM_CHUNK_SIZE", "1000")
+    monkeypatch.setitem(http.CONFIG, "HTTP_STREAM_FLUSH_INTERVAL", "0")
+
+    assert list(http._buffer(iter([b"a", b"b", b"c"]))) == [b"a", b"b", b"c"]
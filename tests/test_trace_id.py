@@ -0,0 +1,96 @@
+"""Request scoped trace_id logging tests"""
+
+import logging
+import threading
+
+import pytest
+from flask import Flask, g, request
+
+import src.commons.context as context
+import src.commons.utils as utils
+from src.commons.logging import logger
+
+
+class RecordsHandler(logging.Handler):
+    """Keep emitted records"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+
+@pytest.fixture(name="records")
+def fixture_records():
+    """Records emitted by the app logger"""
+
+    handler = RecordsHandler()
+    logger.logger.addHandler(handler)
+
+    yield handler.records
+
+    logger.logger.removeHandler(handler)
+
+
+@pytest.fixture(name="app")
+def fixture_app():
+    """App with request scoped context, as src.server, and a route that waits for a concurrent request"""
+
+    app = Flask(__name__)
+    barrier = threading.Barrier(2, timeout=5)
+
+    @app.before_request
+    def begin_context():
+        g.context_token = context.begin()
+
+    @app.teardown_request
+    def end_context(_):
+        context.end(g.pop("context_token", None))
+
+    @app.route("/trace")
+    def trace():
+        utils.store_trace_id(request.headers)
+        barrier.wait()
+        logger.warning("traced")
+        return "ok"
+
+    return app
+
+
+def test_concurrent_requests_log_their_own_trace_id(app, records):
+    """Two requests in flight at the same time do not overwrite each other trace_id"""
+
+    responses = {}
+
+    def call(trace_id):
+        responses[trace_id] = app.test_client().get("/trace", headers={"Trace-Id": trace_id}).status_code
+
+    threads = [threading.Thread(target=call, args=(trace_id,)) for trace_id in ("trace-a", "trace-b")]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert responses == {"trace-a": 200, "trace-b": 200}
+
+    traced = sorted(record.trace_id for record in records if record.getMessage() == "traced")
+
+    assert traced == ["trace-a", "trace-b"]
+
+
+def test_logs_outside_requests_have_no_request_trace_id(records):
+    """A trace_id is not leaked to logs emitted after its scope ends"""
+
+    token = context.begin()
+    utils.store_trace_id({"Trace-Id": "trace-d"})
+    context.end(token)
+
+    logger.warning("outside")
+
+    outside = [record for record in records if record.getMessage() == "outside"]
+
+    assert getattr(outside[0], "trace_id", None) != "trace-d"